@@ -0,0 +1,14 @@
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# ASGI 워커에서는 조회 경로를 async 뷰로 처리 (settings.ASYNC_API_VIEWS)
+os.environ.setdefault("ASYNC_API_VIEWS", "1")
+# ASGI 는 요청마다 다른 스레드에서 DB 연결을 만들므로 연결 유지 대신 DB 앞단 풀러(ProxySQL 등) 사용 권장
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
+django_application = get_asgi_application()
+
+# 앱 로딩(get_asgi_application) 이후에 import 해야 모델을 불러올 수 있다
+from core.async_views import route_asgi  # noqa: E402
+
+# SSE(/api/events/plays/)는 Django 요청 처리를 거치지 않는 순수 ASGI 앱으로 보낸다
+application = route_asgi(django_application)
@@ -36,6 +36,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 요청별 처리 시간 / DB / S3 서명 / serializer 계측 (core/metrics.py). 전체 구간을 재도록 맨 앞
+    "core.metrics.MetricsMiddleware",
+    # DB_REPLICA_VIEWS 조회를 replica 로, 쓰기 후에는 primary 고정 (core/db_router.py)
+    "core.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -88,6 +92,34 @@ else:
         }
     }
 
+# 연결 재사용(초, 0=요청마다 새 연결) + 재사용 전 연결 상태 확인
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+for _db in DATABASES.values():
+    _db["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    _db["CONN_HEALTH_CHECKS"] = True
+
+# 읽기 전용 replica (core/db_router.py): 쉼표로 구분, MySQL 은 host[:port] (계정/DB 이름은 primary 와 동일),
+# SQLite 는 파일 경로 (읽기 전용으로 연다)
+DB_REPLICAS = [r.strip() for r in os.getenv("DB_REPLICAS", "").split(",") if r.strip()]
+for _i, _replica in enumerate(DB_REPLICAS, 1):
+    _db = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    if _db["ENGINE"] == "django.db.backends.mysql":
+        _db["HOST"], _, _port = _replica.partition(":")
+        _db["PORT"] = _port or _db["PORT"]
+    else:
+        _db["NAME"] = f"file:{_replica}?mode=ro"
+    DATABASES[f"replica_{_i}"] = _db
+
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+# replica 에서 읽을 view (URL name, GET/HEAD 만)
+DB_REPLICA_VIEWS = (
+    "track-list", "track-detail", "track-trending", "track-similar", "me-recommendations",
+    "history-list", "history-recent",
+    "playlist-list", "playlist-detail",
+)
+# 쓰기 후 이 시간(초) 동안 그 사용자의 조회는 primary 에서 (read-your-writes, 복제 지연보다 길게)
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
 # 커스텀 유저 모델
 AUTH_USER_MODEL = "core.User"
 
@@ -123,9 +155,16 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # -------------------------------------------------------------------
 # DRF / JWT
 # -------------------------------------------------------------------
+# 1이면 access token claim(user_id/is_staff/is_active)만으로 인증 (요청마다 User 조회 없음, core/auth.py)
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "0") == "1"
+# 무효화 토큰(RevokedToken) 메모리 사본을 DB 에서 다시 읽는 주기 (다른 프로세스의 로그아웃이 반영되는 최대 지연)
+JWT_DENYLIST_REFRESH_SECONDS = int(os.getenv("JWT_DENYLIST_REFRESH_SECONDS", "5"))
+# full_user(request) 가 쓰는 User 캐시 TTL (User 저장/삭제 시 즉시 무효화)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "60"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.auth.StatelessJWTAuthentication" if JWT_STATELESS_AUTH else "core.auth.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
@@ -143,6 +182,8 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "core.auth.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.auth.ClaimsTokenRefreshSerializer",
 }
 
 # -------------------------------------------------------------------
@@ -154,6 +195,102 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 AWS_PRESIGNED_EXPIRE_SECONDS = int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600"))
 AWS_S3_AUDIO_PREFIX = os.getenv("AWS_S3_AUDIO_PREFIX", "audio/")
+# 재생 요청마다 재서명하지 않도록 presigned GET URL 을 잠시 재사용 (0이면 비활성화)
+AWS_PRESIGNED_CACHE_TTL = int(os.getenv("AWS_PRESIGNED_CACHE_TTL", "120"))
+AWS_PRESIGNED_CACHE_SIZE = int(os.getenv("AWS_PRESIGNED_CACHE_SIZE", "10000"))
+# 오디오 파일 저장소 (core/storage.py): core.storage.S3Storage / core.storage.LocalStorage
+# LocalStorage 는 서명 URL(/api/storage/<key>, 만료 = AWS_PRESIGNED_EXPIRE_SECONDS, 주소 = SITE_URL)로 GET(Range)/PUT
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "core.storage.S3Storage")
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", str(MEDIA_ROOT))
+# nginx internal location (예: /protected-media/ → alias STORAGE_LOCAL_ROOT). 지정 시 파일 전송을 X-Accel-Redirect 로 nginx 에 넘김
+STORAGE_LOCAL_ACCEL_REDIRECT = os.getenv("STORAGE_LOCAL_ACCEL_REDIRECT", "")
+# POST /api/tracks/stream_batch/ 한 번에 요청할 수 있는 최대 곡 수
+STREAM_BATCH_MAX_TRACKS = int(os.getenv("STREAM_BATCH_MAX_TRACKS", "50"))
+
+# -------------------------------------------------------------------
+# HLS 변환 (core/transcode.py, `manage.py transcode_tracks`)
+# -------------------------------------------------------------------
+# ffmpeg: 로컬 ffmpeg 로 AAC 인코딩 / stub: 순수 Python (인코딩 없이 원본을 잘라 세그먼트로, 테스트/개발용)
+TRANSCODE_CODEC = os.getenv("TRANSCODE_CODEC", "ffmpeg")
+TRANSCODE_FFMPEG = os.getenv("TRANSCODE_FFMPEG", "ffmpeg")
+# 적응형 재생용 variant 비트레이트(kbps)
+TRANSCODE_BITRATES = [int(b) for b in os.getenv("TRANSCODE_BITRATES", "64,128,256").split(",") if b.strip()]
+TRANSCODE_SEGMENT_SECONDS = int(os.getenv("TRANSCODE_SEGMENT_SECONDS", "6"))
+# 인코딩 프로세스 수 / 동시에 처리하는 곡 수 (넘치면 POST /api/tracks/{id}/transcode/ 는 503)
+TRANSCODE_WORKERS = int(os.getenv("TRANSCODE_WORKERS", "2"))
+TRANSCODE_MAX_PENDING = int(os.getenv("TRANSCODE_MAX_PENDING", "4"))
+# variant 하나의 최대 처리 시간(초)
+TRANSCODE_TIMEOUT = int(os.getenv("TRANSCODE_TIMEOUT", "600"))
+# processing 인 채로 이 시간(초)이 지난 곡은 워커가 죽은 것으로 보고 다시 pending (`transcode_tracks`)
+TRANSCODE_STALE_SECONDS = int(os.getenv("TRANSCODE_STALE_SECONDS", str(3 * TRANSCODE_TIMEOUT)))
+# 원본 분석(core/audio.py) 파형 점 개수 / GET /api/tracks/{id}/waveform/ 의 Cache-Control max-age
+WAVEFORM_POINTS = int(os.getenv("WAVEFORM_POINTS", "1000"))
+WAVEFORM_CACHE_SECONDS = int(os.getenv("WAVEFORM_CACHE_SECONDS", str(30 * 24 * 3600)))
+
+# -------------------------------------------------------------------
+# 캐시 (기본: 프로세스 로컬 메모리 / 워커가 여러 개면 redis·memcached 등 공유 백엔드 권장)
+# -------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "music-streaming"),
+    }
+}
+# 곡 목록/상세 응답 캐시 (core/cache.py). TIMEOUT=0 이면 비활성화
+CATALOG_CACHE_ALIAS = os.getenv("CATALOG_CACHE_ALIAS", "default")
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "300"))
+
+# -------------------------------------------------------------------
+# 곡 검색 백엔드 (core/search.py)
+# -------------------------------------------------------------------
+# auto: DB 에 맞게 (sqlite=FTS5, mysql=FULLTEXT ngram) / like: 기존 icontains 방식
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+# -------------------------------------------------------------------
+# 재생 기록 write-behind 파이프라인 (core/playevents.py)
+# -------------------------------------------------------------------
+# sync: 요청 안에서 즉시 저장 / async: 큐에 쌓아 백그라운드에서 bulk_create
+PLAY_EVENTS_MODE = os.getenv("PLAY_EVENTS_MODE", "sync")
+PLAY_EVENTS_BATCH_SIZE = int(os.getenv("PLAY_EVENTS_BATCH_SIZE", "500"))
+PLAY_EVENTS_FLUSH_INTERVAL = float(os.getenv("PLAY_EVENTS_FLUSH_INTERVAL", "1.0"))
+PLAY_EVENTS_MAX_QUEUE = int(os.getenv("PLAY_EVENTS_MAX_QUEUE", "10000"))
+PLAY_EVENTS_ENQUEUE_TIMEOUT = float(os.getenv("PLAY_EVENTS_ENQUEUE_TIMEOUT", "0.05"))
+# 지정 시 큐에 넣은 이벤트를 파일에 먼저 기록해 비정상 종료 후 재기동 시 재처리 (프로세스별 <path>.<pid> 파일)
+PLAY_EVENTS_SPOOL_PATH = os.getenv("PLAY_EVENTS_SPOOL_PATH", "")
+# flush 재시도 횟수 (0.5초부터 최대 30초까지 두 배씩 대기). 모두 실패한 배치는 dead letter 파일(JSON lines)로, 경로가 없으면 에러 로그로
+PLAY_EVENTS_MAX_RETRIES = int(os.getenv("PLAY_EVENTS_MAX_RETRIES", "8"))
+PLAY_EVENTS_DEAD_LETTER_PATH = os.getenv("PLAY_EVENTS_DEAD_LETTER_PATH", "")
+# async 모드에서 flush 직후 재생 수 집계(core/rollups.py)까지 수행. 끄면 `manage.py rollup_plays` 를 주기 실행
+PLAY_ROLLUP_ON_FLUSH = os.getenv("PLAY_ROLLUP_ON_FLUSH", "1") == "1"
+# 막 저장된 재생 기록은 이 시간(초)이 지난 뒤 집계 (동시 커밋 중인 더 작은 id 를 건너뛰지 않도록)
+PLAY_ROLLUP_SETTLE_SECONDS = int(os.getenv("PLAY_ROLLUP_SETTLE_SECONDS", "5"))
+# 곡 목록/상세, 스트림 URL 발급, 재생 기록 목록을 async 뷰로 처리 (core/async_views.py).
+# config/asgi.py 로 실행하면 기본값 1, WSGI(runserver/gunicorn)는 기존 DRF 뷰 그대로
+ASYNC_API_VIEWS = os.getenv("ASYNC_API_VIEWS", "0") == "1"
+# 재생 이벤트 실시간 전달 (core/events.py, GET /api/events/plays/)
+# 여러 워커에 걸쳐 전달하려면 BaseBroker 구현체로 교체
+EVENT_BROKER = os.getenv("EVENT_BROKER", "core.events.InProcessBroker")
+# 구독자별 큐 크기: 가득 차면(느린 소비자) 연결을 끊는다
+EVENT_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "100"))
+EVENT_KEEPALIVE_SECONDS = int(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+# 사용자별 최근 재생 곡 보관 개수 (/api/history/recent/)
+RECENTLY_PLAYED_LIMIT = int(os.getenv("RECENTLY_PLAYED_LIMIT", "50"))
+# 유사 곡 (core/similarity.py, `manage.py build_similar_tracks`): 곡당 이웃 수 / 계산 상태(행렬)를 저장할 저장소 key
+SIMILAR_TRACKS_TOP_K = int(os.getenv("SIMILAR_TRACKS_TOP_K", "50"))
+SIMILARITY_STATE_KEY = os.getenv("SIMILARITY_STATE_KEY", "similarity/state.npz")
+# 자동 생성 플레이리스트 (core/smart_playlists.py, `manage.py refresh_smart_playlists`):
+# 플레이리스트당 곡 수 / 장르 믹스 개수 / 사용자 shard 를 처리하는 스레드 수
+SMART_PLAYLIST_SIZE = int(os.getenv("SMART_PLAYLIST_SIZE", "50"))
+SMART_PLAYLIST_GENRES = int(os.getenv("SMART_PLAYLIST_GENRES", "3"))
+SMART_PLAYLIST_WORKERS = int(os.getenv("SMART_PLAYLIST_WORKERS", "4"))
+# `manage.py compact_history` 가 이 기간(일)보다 오래되고 집계가 끝난 PlayHistory 를 삭제
+PLAY_HISTORY_RETENTION_DAYS = int(os.getenv("PLAY_HISTORY_RETENTION_DAYS", "90"))
+
+# 요청 계측 (core/metrics.py, GET /api/metrics/ 관리자 전용 Prometheus 텍스트)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# 이 시간(ms)보다 느린 요청은 METRICS_SLOW_SAMPLE_RATE 비율로 SQL 과 함께 로그(core.metrics)에 남긴다
+METRICS_SLOW_REQUEST_MS = int(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))
+METRICS_SLOW_SAMPLE_RATE = float(os.getenv("METRICS_SLOW_SAMPLE_RATE", "0.1"))
 
 # -------------------------------------------------------------------
 # 이메일 (개발/배포 설정)
@@ -1,5 +1,18 @@
 from django.contrib import admin
-from .models import Favorite, PlayHistory, Playlist, PlaylistTrack, Track, User
+from .models import (
+    Favorite,
+    PlayHistory,
+    Playlist,
+    PlaylistTrack,
+    RecentlyPlayed,
+    RevokedToken,
+    Track,
+    TrackAnalysis,
+    TrackPlayCount,
+    User,
+    UserListeningStats,
+    Watermark,
+)
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -7,9 +20,16 @@ class UserAdmin(admin.ModelAdmin):
 
 @admin.register(Track)
 class TrackAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "artist", "genre", "is_published", "created_at")
+    list_display = ("id", "title", "artist", "genre", "is_published", "play_count", "transcode_status", "created_at")
     search_fields = ("title", "artist", "genre", "audio_s3_key")
-    list_filter = ("genre", "is_published")
+    list_filter = ("genre", "is_published", "transcode_status")
+
+@admin.register(TrackAnalysis)
+class TrackAnalysisAdmin(admin.ModelAdmin):
+    list_display = ("track", "format", "duration_ms", "bitrate", "sample_rate", "channels", "analyzed_at")
+    list_filter = ("format",)
+    raw_id_fields = ("track",)
+    exclude = ("waveform",)
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
@@ -22,12 +42,40 @@ class PlayHistoryAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "track__title")
     list_filter = ("played_at",)
 
+@admin.register(RecentlyPlayed)
+class RecentlyPlayedAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "track", "played_at", "position_sec")
+    search_fields = ("user__username", "track__title")
+    raw_id_fields = ("user", "track")
+
 class PlaylistTrackInline(admin.TabularInline):
     model = PlaylistTrack
     extra = 0
 
 @admin.register(Playlist)
 class PlaylistAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "user", "is_public", "created_at")
+    list_display = ("id", "name", "user", "kind", "is_public", "created_at")
+    list_filter = ("kind",)
     search_fields = ("name", "user__username")
     inlines = [PlaylistTrackInline]
+
+@admin.register(TrackPlayCount)
+class TrackPlayCountAdmin(admin.ModelAdmin):
+    list_display = ("id", "track", "granularity", "bucket_start", "plays")
+    list_filter = ("granularity",)
+    raw_id_fields = ("track",)
+
+@admin.register(UserListeningStats)
+class UserListeningStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "play_count", "listened_sec", "last_played_at")
+    search_fields = ("user__username",)
+    raw_id_fields = ("user",)
+
+@admin.register(Watermark)
+class WatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "last_id", "updated_at")
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ("id", "jti", "user_id", "revoked_at", "expires_at")
+    search_fields = ("jti",)
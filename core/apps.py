@@ -2,3 +2,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from . import metrics, signals  # noqa: F401
+
+        metrics.install()
@@ -0,0 +1,374 @@
+# core/async_views.py
+"""
+ASGI(config/asgi.py) 에서 이벤트 루프를 막지 않고 처리하는 async 뷰.
+
+- GET /api/events/plays/ : 재생 이벤트 SSE 스트림 (core/events.py)
+- GET /api/tracks/, GET /api/tracks/{id}/, POST /api/tracks/{id}/stream/, GET /api/history/ :
+  트래픽이 많은 조회 경로의 async 버전 (ASYNC_API_VIEWS, config/asgi.py 에서 기본 사용)
+
+조회 경로는 기존 ViewSet 의 필터/권한/직렬화/캐시를 그대로 쓰고, DB 는 async ORM 으로,
+S3 서명은 스레드 풀에서 수행한다 (워커가 DB/서명 대기 동안 다른 요청을 처리).
+URL 과 응답 형식은 DRF 뷰와 같고, async 로 처리하지 않는 메서드(관리자용 POST/PUT/DELETE 등)는 DRF 뷰에 위임한다.
+
+Django 의 ASGI 핸들러는 요청마다 sync 코드용 전용 스레드(ThreadSensitiveContext)를 만들고
+응답이 끝날 때까지 유지하므로, 오래 열려 있는 SSE 연결마다 스레드가 하나씩 묶인다.
+그래서 config/asgi.py 는 이 경로를 Django 를 거치지 않는 play_events_asgi 로 먼저 보낸다.
+(인증 DB 조회만 공용 스레드에서 잠깐 수행하고, 대기 중인 연결은 스레드를 점유하지 않는다)
+play_events 는 WSGI(runserver 등)에서도 같은 URL 이 동작하도록 둔 Django 뷰 버전이다.
+"""
+import asyncio
+import json
+import os
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework.filters import SearchFilter
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .auth import StatelessJWTAuthentication, denylist, get_authenticator
+from .events import PLAYS_CHANNEL, get_broker, user_plays_channel
+from .models import User
+from .playevents import record_play
+from .storage import get_storage
+from .transcode import hls_payload
+from .views import PlayHistoryViewSet, TrackViewSet
+
+PLAY_EVENTS_PATH = "/api/events/plays/"
+
+
+class StreamError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+async def user_from_token(raw_token: str | None):
+    """JWT 서명/만료는 DB 없이 검증하고, 사용자 상태는 claim(JWT_STATELESS_AUTH) 또는 한 번 조회."""
+    if not raw_token:
+        raise StreamError(401, "Authentication credentials were not provided.")
+    if denylist.is_stale():
+        await sync_to_async(denylist.refresh)()
+    auth = get_authenticator()
+    try:
+        token = auth.get_validated_token(raw_token)
+        if isinstance(auth, StatelessJWTAuthentication):
+            return auth.get_user(token)
+    except InvalidToken:
+        raise StreamError(401, "Given token not valid for any token type")
+    except AuthenticationFailed:
+        raise StreamError(401, "User not found or inactive.")
+    user = await (
+        User.objects.filter(pk=token.get(jwt_settings.USER_ID_CLAIM))
+        .only("id", "is_staff", "is_active")
+        .afirst()
+    )
+    if user is None or not user.is_active:
+        raise StreamError(401, "User not found or inactive.")
+    return user
+
+
+def _bearer(authorization: str | None) -> str | None:
+    if authorization:
+        parts = authorization.split()
+        if len(parts) == 2 and parts[0] in jwt_settings.AUTH_HEADER_TYPES:
+            return parts[1]
+    return None
+
+
+def resolve_channel(user, target: str | None) -> str:
+    """
+    - 일반 사용자: 자기 재생만 (여러 기기 간 '지금 재생 중' 동기화)
+    - 관리자: 전체(대시보드) 또는 ?user_id= 로 특정 사용자
+    """
+    if user.is_staff:
+        return user_plays_channel(target) if target else PLAYS_CHANNEL
+    if target and target != str(user.pk):
+        raise StreamError(403, "권한이 없습니다.")
+    return user_plays_channel(user.pk)
+
+
+def _sse(event: str | None, data) -> str:
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(channel: str):
+    keepalive = getattr(settings, "EVENT_KEEPALIVE_SECONDS", 15)
+    subscription = get_broker().subscribe(channel)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await subscription.get(timeout=keepalive)
+            except ConnectionError:
+                if subscription.dropped:
+                    yield _sse("dropped", {"detail": "slow consumer"})
+                return
+            if message is None:
+                # 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+                yield ": keepalive\n\n"
+            else:
+                yield _sse("play", message)
+    finally:
+        # 클라이언트 연결 종료 시(제너레이터 취소) 구독 해제
+        subscription.close()
+
+
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    # nginx 가 응답을 버퍼링하지 않도록
+    (b"x-accel-buffering", b"no"),
+]
+
+
+async def play_events(request):
+    """Django 뷰 버전 (WSGI 에서도 동작, 연결마다 스레드를 점유)."""
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+    try:
+        # EventSource 는 헤더를 붙일 수 없으므로 ?token= 도 허용
+        raw = _bearer(request.headers.get("Authorization")) or request.GET.get("token")
+        user = await user_from_token(raw)
+        channel = resolve_channel(user, request.GET.get("user_id"))
+    except StreamError as e:
+        return JsonResponse({"detail": e.detail}, status=e.status)
+    response = StreamingHttpResponse(event_stream(channel), content_type="text/event-stream")
+    for name, value in SSE_HEADERS[1:]:
+        response[name.decode()] = value.decode()
+    return response
+
+
+async def play_events_asgi(scope, receive, send):
+    """Django 를 거치지 않는 순수 ASGI 버전 (config/asgi.py 에서 라우팅)."""
+    if scope["method"] != "GET":
+        return await _send_json(send, 405, {"detail": "Method not allowed."})
+    query = parse_qs(scope.get("query_string", b"").decode())
+    headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+    # request_started/finished 가 없으므로 인증 조회(denylist/사용자) 전후로 직접 연결 정리 (CONN_MAX_AGE, 끊긴 연결)
+    await sync_to_async(close_old_connections)()
+    try:
+        raw = _bearer(headers.get("authorization")) or query.get("token", [None])[0]
+        user = await user_from_token(raw)
+        channel = resolve_channel(user, query.get("user_id", [None])[0])
+    except StreamError as e:
+        return await _send_json(send, e.status, {"detail": e.detail})
+    finally:
+        await sync_to_async(close_old_connections)()
+
+    await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+
+    async def pump():
+        async for chunk in event_stream(channel):
+            await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def wait_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(wait_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _send_json(send, status: int, data):
+    body = json.dumps(data).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def route_asgi(django_app):
+    """SSE 경로만 play_events_asgi 로, 나머지는 Django 로 보내는 ASGI 앱."""
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == PLAY_EVENTS_PATH:
+            return await play_events_asgi(scope, receive, send)
+        return await django_app(scope, receive, send)
+
+    return application
+
+
+# -------------------------------------------------------------------
+# 조회 경로 async 버전 (core/urls.py, ASYNC_API_VIEWS)
+# -------------------------------------------------------------------
+async def authenticate(request):
+    """
+    설정된 JWT 인증(core/auth.py)의 async 버전.
+    토큰 검증은 그대로, denylist 갱신과 사용자 조회만 async (JWT_STATELESS_AUTH 면 사용자 조회 없음).
+    """
+    auth = get_authenticator()
+    header = auth.get_header(request)
+    if header is None:
+        return None
+    raw_token = auth.get_raw_token(header)
+    if raw_token is None:
+        return None
+    if denylist.is_stale():
+        await sync_to_async(denylist.refresh)()
+    token = auth.get_validated_token(raw_token)
+    if isinstance(auth, StatelessJWTAuthentication):
+        return auth.get_user(token), token
+    try:
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_("Token contained no recognizable user identification"))
+    user = await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).afirst()
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if getattr(jwt_settings, "CHECK_REVOKE_TOKEN", False):
+        if token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+    return user, token
+
+
+async def filter_queryset(view, queryset):
+    """view.filter_queryset. 검색 백엔드(FTS5)는 filter 단계에서 쿼리를 실행하므로 검색 중일 때만 스레드에서."""
+    searching = any(issubclass(b, SearchFilter) for b in view.filter_backends) and view.request.query_params.get(
+        api_settings.SEARCH_PARAM
+    )
+    if searching:
+        return await sync_to_async(view.filter_queryset)(queryset)
+    return view.filter_queryset(queryset)
+
+
+async def get_object(view):
+    """GenericAPIView.get_object 의 async 버전."""
+    queryset = await filter_queryset(view, view.get_queryset())
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    obj = await queryset.filter(**{view.lookup_field: view.kwargs[lookup_url_kwarg]}).afirst()
+    if obj is None:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+    view.check_object_permissions(view.request, obj)
+    return obj
+
+
+async def paginated_list(view, queryset):
+    page = await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+    return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+
+async def _track_list(view, request, **kwargs):
+    async def build():
+        return await paginated_list(view, await filter_queryset(view, view.get_queryset()))
+
+    return await view.acached_response(request, "list", build)
+
+
+async def _track_detail(view, request, pk):
+    async def build():
+        return Response(view.get_serializer(await get_object(view)).data)
+
+    return await view.acached_response(request, f"detail:{pk}", build)
+
+
+async def _track_stream(view, request, pk):
+    track = await get_object(view)
+    expires = int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600"))
+    url = await get_storage().asign_get(track.audio_s3_key, expires)
+    await sync_to_async(record_play)(request.user.pk, track.pk)
+    return Response({"url": url, "expires_in": expires, **hls_payload(request, track)})
+
+
+async def _history_list(view, request, **kwargs):
+    return await paginated_list(view, view.filter_queryset(view.get_queryset()))
+
+
+def _rendered(response):
+    """
+    DRF Response 를 이벤트 루프에서 바로 렌더링해 일반 HttpResponse 로 돌려준다.
+    (render() 가 남아 있는 응답은 Django 가 스레드로 넘겨 렌더링한다)
+    """
+    response.render()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    return rendered
+
+
+def async_viewset_view(cls, actions, handlers, **initkwargs):
+    """
+    cls.as_view(actions) 와 같은 URL/응답의 async 뷰.
+    handlers({method: coroutine}) 에 있는 메서드만 async 로 처리하고 나머지는 DRF 뷰에 위임한다.
+    ViewSet 의 permission/filter/pagination/serializer 설정을 그대로 사용한다.
+    """
+    for action_name in actions.values():
+        # @action(permission_classes=...) 등 추가 액션 설정 (router 와 동일)
+        initkwargs = {**getattr(getattr(cls, action_name), "kwargs", {}), **initkwargs}
+    actions = dict(actions)
+    if "get" in actions:
+        actions.setdefault("head", actions["get"])
+        if "get" in handlers:
+            handlers = {**handlers, "head": handlers["get"]}
+    fallback = cls.as_view(actions, **initkwargs)
+
+    async def view(request, *args, **kwargs):
+        handler = handlers.get(request.method.lower())
+        if handler is None:
+            return await sync_to_async(fallback)(request, *args, **kwargs)
+
+        # ViewSet.as_view / APIView.dispatch 와 같은 순서로 준비
+        self = cls(**initkwargs)
+        self.action_map = actions
+        for method, action_name in actions.items():
+            setattr(self, method, getattr(self, action_name))
+        self.args, self.kwargs = args, kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            try:
+                user_auth = await authenticate(request)
+            except APIException:
+                request.user, request.auth = api_settings.UNAUTHENTICATED_USER(), None
+                raise
+            request.user, request.auth = user_auth or (api_settings.UNAUTHENTICATED_USER(), None)
+            self.initial(request, *args, **kwargs)
+            response = await handler(self, request, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return _rendered(self.finalize_response(request, response, *args, **kwargs))
+
+    return csrf_exempt(view)
+
+
+track_list = async_viewset_view(
+    TrackViewSet, {"get": "list", "post": "create"}, {"get": _track_list}, basename="track", detail=False
+)
+track_detail = async_viewset_view(
+    TrackViewSet,
+    {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+    {"get": _track_detail},
+    basename="track",
+    detail=True,
+)
+track_stream = async_viewset_view(
+    TrackViewSet, {"post": "stream"}, {"post": _track_stream}, basename="track", detail=True
+)
+history_list = async_viewset_view(
+    PlayHistoryViewSet, {"get": "list"}, {"get": _history_list}, basename="history", detail=False
+)
@@ -0,0 +1,284 @@
+# core/audio.py
+"""
+업로드된 원본 오디오 분석 (core/transcode.py 의 프로세스 풀에서 HLS 변환과 함께 실행).
+
+- probe(): MP3 / FLAC / OGG(Vorbis, Opus) 헤더에서 길이·비트레이트·샘플레이트·채널 수.
+  파일 앞/뒤 CHUNK_SIZE 만 읽는다 (ID3v2 태그는 건너뛰고, OGG 길이는 마지막 페이지의 granule position).
+- waveform(): 스크러버용 peak 파형. 디코딩한 PCM(ffmpeg → mono s16le pipe)을 chunk 단위로 읽어
+  NumPy 로 WAVEFORM_BIN_SECONDS 구간별 최댓값을 구하고, 마지막에 points 개로 줄여 0~255 로 정규화.
+  stub 코덱(core/codecs.py 와 같은 테스트/개발용)은 디코딩 없이 원본 바이트를 PCM 으로 간주한다.
+- 결과 파형은 pack_waveform() 의 작은 바이너리(헤더 5바이트 + 점당 1바이트)로 저장한다.
+
+codecs.py 와 마찬가지로 worker 프로세스에서 import 되므로 Django 를 import 하지 않는다.
+"""
+import os
+import struct
+import subprocess
+import tempfile
+import threading
+
+CHUNK_SIZE = 64 * 1024
+WAVEFORM_RATE = 8000
+WAVEFORM_BIN_SECONDS = 0.01
+WAVEFORM_MAGIC = b"WF"
+WAVEFORM_VERSION = 1
+_WAVEFORM_HEADER = struct.Struct("<2sBH")
+
+
+class UnsupportedAudio(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------
+# 헤더 파싱
+# -------------------------------------------------------------------
+# (version, layer) → kbps 목록 (index 1..14)
+_MP3_BITRATES = {
+    (1, 1): (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# version bits → (MPEG version 이름, 샘플레이트 목록)
+_MP3_VERSIONS = {3: (1, (44100, 48000, 32000)), 2: (2, (22050, 24000, 16000)), 0: (2.5, (11025, 12000, 8000))}
+
+
+def _info(fmt, duration, sample_rate, channels, bitrate=None, audio_bytes=0):
+    if duration <= 0:
+        raise UnsupportedAudio(f"{fmt}: could not determine duration")
+    if not bitrate:
+        bitrate = round(audio_bytes * 8 / duration / 1000)
+    return {
+        "format": fmt,
+        "duration_ms": int(round(duration * 1000)),
+        "bitrate": int(bitrate),
+        "sample_rate": int(sample_rate),
+        "channels": int(channels),
+    }
+
+
+def _id3v2_size(head: bytes) -> int:
+    """파일 앞의 ID3v2 태그 길이 (없으면 0)."""
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _mp3_frame_header(data: bytes, i: int):
+    """data[i:] 가 유효한 MPEG audio 프레임 헤더면 필드 dict, 아니면 None."""
+    if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+        return None
+    version_bits = (data[i + 1] >> 3) & 0x03
+    layer = 4 - ((data[i + 1] >> 1) & 0x03)
+    bitrate_index = data[i + 2] >> 4
+    rate_index = (data[i + 2] >> 2) & 0x03
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    version, rates = _MP3_VERSIONS[version_bits]
+    bitrate = _MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index - 1]
+    sample_rate = rates[rate_index]
+    if layer == 1:
+        samples = 384
+    elif layer == 3 and version != 1:
+        samples = 576
+    else:
+        samples = 1152
+    padding = (data[i + 2] >> 1) & 0x01
+    size = (samples // 8 * bitrate * 1000) // sample_rate + padding * (4 if layer == 1 else 1)
+    return {
+        "version": version,
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "samples": samples,
+        "channels": 1 if (data[i + 3] >> 6) == 3 else 2,
+        "size": size,
+    }
+
+
+def _probe_mp3(f, size: int, head: bytes):
+    start = _id3v2_size(head)
+    f.seek(start)
+    data = f.read(CHUNK_SIZE)
+    for i in range(len(data) - 4):
+        frame = _mp3_frame_header(data, i)
+        # 다음 프레임 위치에도 sync 가 있어야 프레임으로 인정 (오디오 데이터 속 0xFFE 오탐 방지)
+        if frame and (i + frame["size"] + 4 > len(data) or _mp3_frame_header(data, i + frame["size"])):
+            break
+    else:
+        raise UnsupportedAudio("mp3: no frame sync")
+    audio_start = start + i
+    f.seek(max(size - 128, 0))
+    audio_bytes = size - audio_start - (128 if f.read(3) == b"TAG" else 0)
+
+    # VBR: 첫 프레임 안의 Xing/Info 또는 VBRI 헤더에 전체 프레임 수
+    side_info = (32 if frame["channels"] == 2 else 17) if frame["version"] == 1 else (17 if frame["channels"] == 2 else 9)
+    frames = None
+    xing = i + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info") and struct.unpack(">I", data[xing + 4:xing + 8])[0] & 0x01:
+        frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+    elif data[i + 36:i + 40] == b"VBRI":
+        frames = struct.unpack(">I", data[i + 50:i + 54])[0]
+    if frames:
+        duration = frames * frame["samples"] / frame["sample_rate"]
+        return _info("mp3", duration, frame["sample_rate"], frame["channels"], audio_bytes=audio_bytes)
+    duration = audio_bytes * 8 / (frame["bitrate"] * 1000)
+    return _info("mp3", duration, frame["sample_rate"], frame["channels"], bitrate=frame["bitrate"])
+
+
+def _probe_flac(f, size: int, head: bytes):
+    start = _id3v2_size(head)
+    f.seek(start)
+    block = f.read(42)
+    # 'fLaC' + 첫 metadata block 은 항상 STREAMINFO (4바이트 블록 헤더 + 34바이트)
+    if block[:4] != b"fLaC" or block[4] & 0x7F != 0:
+        raise UnsupportedAudio("flac: missing STREAMINFO")
+    bits = int.from_bytes(block[18:26], "big")
+    sample_rate = bits >> 44
+    channels = ((bits >> 41) & 0x07) + 1
+    total_samples = bits & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        raise UnsupportedAudio("flac: unknown length")
+    return _info("flac", total_samples / sample_rate, sample_rate, channels, audio_bytes=size - start)
+
+
+def _probe_ogg(f, size: int, head: bytes):
+    # 첫 페이지: 헤더 27바이트 + segment table, 그 뒤 첫 패킷(codec identification header)
+    segments = head[26]
+    packet = head[27 + segments:27 + segments + 64]
+    if packet[:7] == b"\x01vorbis":
+        fmt = "vorbis"
+        channels = packet[11]
+        sample_rate = struct.unpack("<I", packet[12:16])[0]
+        granule_rate, pre_skip = sample_rate, 0
+    elif packet[:8] == b"OpusHead":
+        fmt = "opus"
+        channels = packet[9]
+        pre_skip = struct.unpack("<H", packet[10:12])[0]
+        sample_rate = struct.unpack("<I", packet[12:16])[0] or 48000
+        # Opus granule position 은 항상 48kHz 기준
+        granule_rate = 48000
+    else:
+        raise UnsupportedAudio("ogg: unsupported codec")
+
+    # 마지막 페이지의 granule position = 전체 샘플 수
+    f.seek(max(size - CHUNK_SIZE, 0))
+    tail = f.read(CHUNK_SIZE)
+    last = tail.rfind(b"OggS")
+    if last < 0 or last + 14 > len(tail):
+        raise UnsupportedAudio("ogg: last page not found")
+    granule = struct.unpack("<q", tail[last + 6:last + 14])[0]
+    return _info(fmt, (granule - pre_skip) / granule_rate, sample_rate, channels, audio_bytes=size)
+
+
+def probe(path: str) -> dict:
+    """{"format", "duration_ms", "bitrate"(kbps), "sample_rate", "channels"}. 지원하지 않는 형식이면 UnsupportedAudio."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(CHUNK_SIZE)
+        if head[:4] == b"OggS":
+            return _probe_ogg(f, size, head)
+        start = _id3v2_size(head)
+        if start:
+            f.seek(start)
+            marker = f.read(4)
+        else:
+            marker = head[:4]
+        if marker == b"fLaC":
+            return _probe_flac(f, size, head)
+        return _probe_mp3(f, size, head)
+
+
+# -------------------------------------------------------------------
+# 파형
+# -------------------------------------------------------------------
+def _pcm_chunks(source: str, codec: str, ffmpeg: str, timeout: int):
+    """mono s16le PCM 을 CHUNK_SIZE 단위로."""
+    if codec == "stub":
+        with open(source, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+        return
+    cmd = [
+        ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", source, "-vn", "-ac", "1", "-ar", str(WAVEFORM_RATE), "-f", "s16le", "-",
+    ]
+    # stderr 를 PIPE 로 두고 끝에서만 읽으면 로그가 많을 때 버퍼가 차서 ffmpeg 가 멈추므로 임시 파일로 받는다.
+    # timeout 은 읽는 동안에도 걸리도록 타이머가 프로세스를 죽인다 (막혀 있던 read 는 EOF 로 풀린다)
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            while chunk := proc.stdout.read(CHUNK_SIZE):
+                yield chunk
+            proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if proc.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"ffmpeg exited with {proc.returncode}: {stderr.read().decode(errors='replace')[-500:]}")
+
+def waveform(source: str, points: int, codec: str = "ffmpeg", ffmpeg: str = "ffmpeg", timeout: int = 600) -> bytes:
+    """points 개의 0~255 peak (곡의 최대 진폭 = 255)."""
+    # NumPy 는 파형을 계산하는 worker 프로세스에서만 필요
+    import numpy as np
+
+    bin_size = int(WAVEFORM_RATE * WAVEFORM_BIN_SECONDS)
+    peaks = []
+    carry = b""
+    for chunk in _pcm_chunks(source, codec, ffmpeg, timeout):
+        buf = carry + chunk
+        usable = len(buf) // (2 * bin_size) * (2 * bin_size)
+        carry = buf[usable:]
+        if usable:
+            samples = np.frombuffer(buf[:usable], dtype="<i2").reshape(-1, bin_size)
+            # int16 의 -32768 은 abs 가 넘치므로 int32 로
+            peaks.append(np.abs(samples.astype(np.int32)).max(axis=1))
+    if len(carry) >= 2:
+        tail = np.frombuffer(carry[: len(carry) // 2 * 2], dtype="<i2")
+        peaks.append(np.abs(tail.astype(np.int32)).max(keepdims=True))
+    if not peaks:
+        return b""
+
+    fine = np.concatenate(peaks)
+    if len(fine) > points:
+        # 구간 경계마다 최댓값 (길이가 나누어떨어지지 않아도 모든 구간을 덮는다)
+        edges = np.linspace(0, len(fine), points + 1).astype(np.int64)[:-1]
+        fine = np.maximum.reduceat(fine, edges)
+    top = int(fine.max()) or 1
+    return np.rint(fine * (255 / top)).astype(np.uint8).tobytes()
+
+
+def pack_waveform(peaks: bytes) -> bytes:
+    return _WAVEFORM_HEADER.pack(WAVEFORM_MAGIC, WAVEFORM_VERSION, len(peaks)) + peaks
+
+
+def unpack_waveform(blob: bytes) -> bytes:
+    magic, version, n = _WAVEFORM_HEADER.unpack_from(blob)
+    if magic != WAVEFORM_MAGIC or version != WAVEFORM_VERSION:
+        raise ValueError("unknown waveform blob")
+    return blob[_WAVEFORM_HEADER.size:_WAVEFORM_HEADER.size + n]
+
+
+def analyze(source: str, points: int, codec: str = "ffmpeg", ffmpeg: str = "ffmpeg", timeout: int = 600) -> dict:
+    """process pool 작업: 헤더 메타데이터 + 압축한 파형."""
+    info = probe(source)
+    info["waveform"] = pack_waveform(waveform(source, points, codec, ffmpeg, timeout))
+    return info
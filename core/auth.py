@@ -0,0 +1,239 @@
+# core/auth.py
+"""
+JWT 인증.
+
+simplejwt 의 JWTAuthentication 은 인증된 요청마다 User 행을 조회한다 (stream 등 모든 요청).
+JWT_STATELESS_AUTH=1 이면 StatelessJWTAuthentication 이 토큰 claim(user_id, is_staff, is_active)으로
+ClaimsUser 를 만들어 인증 쿼리 없이 처리한다.
+
+- claim 은 로그인/토큰 갱신 시점의 DB 값으로 넣는다 (ClaimsTokenObtainPairSerializer / ClaimsTokenRefreshSerializer)
+- 전체 User 모델이 필요한 곳(/api/me/ 등)은 full_user(request) → TTL 캐시 (User 저장/삭제 시 무효화)
+- 무효화(denylist): RevokedToken 을 프로세스 메모리에 올려두고 요청마다 메모리에서만 확인한다.
+  JWT_DENYLIST_REFRESH_SECONDS 마다 새로 추가된 행만 읽어온다.
+  · 로그아웃: 토큰(jti) 단위
+  · is_staff/is_active 변경, 사용자 삭제: 사용자 단위 (그 시각 이전에 발급된 토큰 전체) → 오래된 claim 이 남지 않는다
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import RevokedToken, User
+
+USER_CLAIMS = ("is_staff", "is_active")
+# 커밋 순서가 id 순서와 다를 수 있으므로 이 시간 안에 무효화된 행은 매번 다시 읽는다
+DENYLIST_OVERLAP = timedelta(seconds=60)
+
+
+def add_user_claims(token, user):
+    for name in USER_CLAIMS:
+        token[name] = getattr(user, name)
+    return token
+
+
+# -------------------------------------------------------------------
+# denylist
+# -------------------------------------------------------------------
+class Denylist:
+    """RevokedToken 의 메모리 사본. is_revoked() 는 갱신 주기가 지났을 때만 DB 를 읽는다."""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._jtis = {}  # jti -> 만료 시각(ts)
+        self._cutoffs = {}  # user_id -> (이 시각 이전 발급분 무효, 만료 시각(ts))
+        self._last_id = 0
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def refresh(self):
+        with self._lock:
+            if not self.is_stale():
+                return
+            rows = RevokedToken.objects.filter(
+                Q(id__gt=self._last_id) | Q(revoked_at__gte=timezone.now() - DENYLIST_OVERLAP)
+            ).values_list("id", "jti", "user_id", "revoked_at", "expires_at")
+            for row in rows:
+                self._add(*row)
+            self._prune()
+            self._loaded_at = time.monotonic()
+
+    def add(self, row: RevokedToken):
+        """이 프로세스에는 다음 갱신을 기다리지 않고 바로 반영."""
+        with self._lock:
+            self._add(row.pk, row.jti, row.user_id, row.revoked_at, row.expires_at)
+
+    def _add(self, pk, jti, user_id, revoked_at, expires_at):
+        self._last_id = max(self._last_id, pk)
+        if jti:
+            self._jtis[jti] = expires_at.timestamp()
+        elif user_id is not None:
+            # 토큰의 iat 는 초 단위 정수: 같은 초에 폐기 직후 발급된 토큰이 폐기되지 않도록 내림해서 비교
+            cutoff = int(revoked_at.timestamp())
+            current = self._cutoffs.get(user_id)
+            if current is None or cutoff > current[0]:
+                self._cutoffs[user_id] = (cutoff, expires_at.timestamp())
+
+    def _prune(self):
+        now = time.time()
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._cutoffs = {uid: v for uid, v in self._cutoffs.items() if v[1] > now}
+
+    def is_revoked(self, token) -> bool:
+        if self.is_stale():
+            self.refresh()
+        if token.get(jwt_settings.JTI_CLAIM) in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(token.get(jwt_settings.USER_ID_CLAIM))
+        return cutoff is not None and token.get("iat", 0) < cutoff[0]
+
+    def stats(self) -> dict:
+        return {"jtis": len(self._jtis), "users": len(self._cutoffs), "last_id": self._last_id}
+
+
+denylist = Denylist(getattr(settings, "JWT_DENYLIST_REFRESH_SECONDS", 5))
+
+
+def _token_expires_at(token):
+    return datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+
+
+def revoke_token(token) -> RevokedToken:
+    """토큰 하나를 만료 시각까지 무효화 (로그아웃)."""
+    row = RevokedToken.objects.create(
+        jti=token[jwt_settings.JTI_CLAIM],
+        user_id=token.get(jwt_settings.USER_ID_CLAIM),
+        expires_at=_token_expires_at(token),
+    )
+    denylist.add(row)
+    return row
+
+
+def revoke_user_tokens(user_id) -> RevokedToken:
+    """지금까지 발급된 사용자의 토큰 전체 무효화 (refresh token 수명이 지나면 필요 없으므로 그때까지만 유지)."""
+    now = timezone.now()
+    row = RevokedToken.objects.create(
+        user_id=user_id, revoked_at=now, expires_at=now + jwt_settings.REFRESH_TOKEN_LIFETIME
+    )
+    denylist.add(row)
+    return row
+
+
+def prune_revoked_tokens() -> int:
+    """만료된 무효화 기록 삭제. 삭제한 행 수를 반환."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+# -------------------------------------------------------------------
+# users
+# -------------------------------------------------------------------
+class ClaimsUser(TokenUser):
+    """토큰 claim 만으로 만든 사용자 (id / is_staff / is_active). 전체 모델은 full_user(request)."""
+
+    @cached_property
+    def is_active(self) -> bool:
+        return self.token.get("is_active", True)
+
+
+def _user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    key = _user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60))
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_cache_key(user_id))
+
+
+def full_user(request, fresh: bool = False):
+    """
+    request.user 의 User 모델 인스턴스.
+    ClaimsUser 면 TTL 캐시에서 가져오고, 저장할 인스턴스가 필요하면 fresh=True 로 DB 에서 다시 읽는다.
+    """
+    user = request.user
+    if isinstance(user, TokenUser):
+        user = User.objects.filter(pk=user.pk).first() if fresh else get_cached_user(user.pk)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    return user
+
+
+# -------------------------------------------------------------------
+# DRF authentication classes
+# -------------------------------------------------------------------
+class DenylistMixin:
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if denylist.is_revoked(token):
+            raise InvalidToken(_("Token is revoked"))
+        return token
+
+
+class JWTAuthentication(DenylistMixin, authentication.JWTAuthentication):
+    """기본: 요청마다 User 조회 (simplejwt 와 동일) + denylist."""
+
+
+class StatelessJWTAuthentication(DenylistMixin, authentication.JWTStatelessUserAuthentication):
+    """claim 으로 ClaimsUser 를 만든다 (인증 쿼리 없음)."""
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+def get_authenticator():
+    """설정(JWT_STATELESS_AUTH)에 맞는 인증 객체 (core/async_views.py 등 DRF 밖에서 사용)."""
+    if getattr(settings, "JWT_STATELESS_AUTH", False):
+        return StatelessJWTAuthentication()
+    return JWTAuthentication()
+
+
+# -------------------------------------------------------------------
+# token serializers (SIMPLE_JWT TOKEN_OBTAIN_SERIALIZER / TOKEN_REFRESH_SERIALIZER)
+# -------------------------------------------------------------------
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """무효화된 refresh token 은 거부하고, access token 의 claim 은 DB 의 현재 값으로 다시 넣는다."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if denylist.is_revoked(refresh):
+            raise InvalidToken(_("Token is revoked"))
+        user = User.objects.filter(pk=refresh.get(jwt_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(_("User not found or inactive."), code="user_inactive")
+        data = super().validate(attrs)
+        data["access"] = str(add_user_claims(AccessToken.for_user(user), user))
+        return data
@@ -0,0 +1,162 @@
+# core/cache.py
+"""
+공개 곡 카탈로그(GET /api/tracks/, /api/tracks/{id}/) 응답 캐시.
+
+- 직렬화된 응답 데이터를 정규화한 쿼리 파라미터(필터/검색/정렬/cursor) 기준으로 Django cache 에 저장
+- Track 저장/삭제 시 네임스페이스 버전을 올려 이전 항목을 한 번에 무효화 (signals.py)
+- ETag(응답 본문 해시)로 조건부 요청에 304 응답. Last-Modified 는 쓰지 않는다:
+  play_count/favorite_count/is_favorited 는 Track.updated_at 을 바꾸지 않고 삭제된 곡은 목록에서 빠질 뿐이라
+  updated_at 기준 If-Modified-Since 는 바뀐 응답에도 304 를 줄 수 있다
+- 로그인 사용자별 값(is_favorited)이 들어가는 응답은 사용자별 키 + 사용자 버전으로 분리 (즐겨찾기 변경 시 그 사용자만 무효화)
+"""
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def catalog_cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+
+def get_catalog_version() -> int:
+    cache = catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """카탈로그 캐시 전체 무효화 (이전 버전 키는 TTL 로 자연 소멸)."""
+    cache = catalog_cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 2, timeout=None)
+
+
+def _user_version_key(user_id) -> str:
+    return f"catalog:user:{user_id}:version"
+
+
+def get_user_catalog_version(user_id) -> int:
+    cache = catalog_cache()
+    key = _user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_user_catalog_version(user_id):
+    """한 사용자의 카탈로그 캐시만 무효화 (즐겨찾기 변경 등)."""
+    cache = catalog_cache()
+    key = _user_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def catalog_cache_key(request, scope: str, user_id=None) -> str:
+    """쿼리 파라미터 순서/빈 값에 상관없이 같은 요청은 같은 키가 되도록 정규화."""
+    params = sorted(
+        (name, sorted(v for v in request.query_params.getlist(name) if v != ""))
+        for name in request.query_params
+    )
+    params = [p for p in params if p[1]]
+    # next/previous 링크가 절대 URL 이므로 host 도 키에 포함
+    raw = json.dumps([request.get_host(), scope, params], separators=(",", ":"))
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    if user_id is not None:
+        scope = f"u{user_id}.{get_user_catalog_version(user_id)}:{scope}"
+    return f"catalog:v{get_catalog_version()}:{scope}:{digest}"
+
+
+def _not_modified(request, entry) -> bool:
+    """If-None-Match 로만 판단 (If-Modified-Since 는 무시하고 전체 응답)."""
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or entry["etag"] in tags or f"W/{entry['etag']}" in tags
+
+
+def _cache_entry(data):
+    body = json.dumps(data, cls=JSONEncoder)
+    return {
+        # UUID/datetime 등을 JSON 기본 타입으로 바꿔 어떤 cache 백엔드에도 저장 가능하게
+        "data": json.loads(body),
+        "etag": quote_etag(hashlib.md5(body.encode("utf-8")).hexdigest()),
+    }
+
+
+class CatalogCacheMixin:
+    """list/retrieve 응답을 캐시하고 조건부 GET 을 처리하는 ViewSet mixin."""
+
+    catalog_cache_timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+    # 응답에 로그인 사용자별 값이 들어가면 True (사용자별로 캐시)
+    catalog_cache_per_user = False
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, "list", lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        scope = f"detail:{kwargs.get(self.lookup_url_kwarg or self.lookup_field)}"
+        return self.cached_response(request, scope, lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs))
+
+    def cached_response(self, request, scope, build):
+        if self.catalog_cache_timeout <= 0:
+            return build()
+        key, entry = self._cache_lookup(request, scope)
+        if entry is None:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = _cache_entry(response.data)
+            catalog_cache().set(key, entry, self.catalog_cache_timeout)
+        else:
+            response = Response(entry["data"])
+        return self._conditional_response(request, response, entry)
+
+    async def acached_response(self, request, scope, build):
+        """cached_response 의 async 버전 (build 는 coroutine 함수, core/async_views.py)."""
+        if self.catalog_cache_timeout <= 0:
+            return await build()
+        key, entry = await sync_to_async(self._cache_lookup)(request, scope)
+        if entry is None:
+            response = await build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = _cache_entry(response.data)
+            await catalog_cache().aset(key, entry, self.catalog_cache_timeout)
+        else:
+            response = Response(entry["data"])
+        return self._conditional_response(request, response, entry)
+
+    def _cache_lookup(self, request, scope):
+        user_id = None
+        if self.catalog_cache_per_user and request.user.is_authenticated:
+            user_id = request.user.pk
+        key = catalog_cache_key(request, scope, user_id)
+        return key, catalog_cache().get(key)
+
+    def _conditional_response(self, request, response, entry):
+        if _not_modified(request, entry):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = entry["etag"]
+        if self.catalog_cache_per_user:
+            patch_vary_headers(response, ["Authorization"])
+        return response
@@ -0,0 +1,94 @@
+# core/codecs.py
+"""
+트랜스코딩 작업 함수 (core/transcode.py 의 프로세스 풀에서 실행).
+
+worker 프로세스는 spawn 으로 뜨므로 이 모듈은 Django(모델/설정)를 import 하지 않는다.
+필요한 값은 모두 인자로 받고, 결과는 로컬 디렉터리에 HLS variant 하나(index.m3u8 + 세그먼트)로 쓴다.
+
+- ffmpeg: 로컬 ffmpeg 로 AAC 인코딩 + HLS 세그먼트 분할
+- stub  : 순수 Python. 원본 바이트를 비트레이트 크기만큼 잘라 세그먼트로 쓴다 (실제 인코딩 없음, 테스트/개발용)
+"""
+import os
+import subprocess
+
+PLAYLIST_NAME = "index.m3u8"
+SEGMENT_PATTERN = "seg_%05d.ts"
+CHUNK_SIZE = 64 * 1024
+
+
+def _write_playlist(out_dir: str, segments: list[tuple[str, float]], segment_seconds: int):
+    target = max([segment_seconds] + [int(d + 0.999) for _, d in segments])
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{target}", "#EXT-X-MEDIA-SEQUENCE:0",
+             "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for name, duration in segments:
+        lines += [f"#EXTINF:{duration:.3f},", name]
+    lines.append("#EXT-X-ENDLIST")
+    with open(os.path.join(out_dir, PLAYLIST_NAME), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _read_playlist(out_dir: str) -> list[tuple[str, float]]:
+    segments, duration = [], 0.0
+    with open(os.path.join(out_dir, PLAYLIST_NAME)) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+            elif line and not line.startswith("#"):
+                segments.append((line, duration))
+    return segments
+
+
+def ffmpeg_transcode(source: str, out_dir: str, bitrate: int, segment_seconds: int, ffmpeg: str, timeout: int):
+    cmd = [
+        ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", source, "-vn", "-map", "0:a:0",
+        "-c:a", "aac", "-b:a", f"{bitrate}k", "-ac", "2",
+        "-f", "hls", "-hls_time", str(segment_seconds), "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(out_dir, SEGMENT_PATTERN),
+        os.path.join(out_dir, PLAYLIST_NAME),
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.decode(errors='replace')[-500:]}")
+    return _read_playlist(out_dir)
+
+
+def stub_transcode(source: str, out_dir: str, bitrate: int, segment_seconds: int, ffmpeg: str, timeout: int):
+    # 세그먼트 하나 = bitrate(kbps) * segment_seconds 만큼의 바이트 (chunk 단위로 읽어 메모리 사용량 고정)
+    segment_bytes = bitrate * 125 * segment_seconds
+    segments = []
+    with open(source, "rb") as src:
+        while True:
+            name = SEGMENT_PATTERN % len(segments)
+            written = 0
+            with open(os.path.join(out_dir, name), "wb") as out:
+                while written < segment_bytes:
+                    chunk = src.read(min(CHUNK_SIZE, segment_bytes - written))
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    written += len(chunk)
+            if not written:
+                os.unlink(os.path.join(out_dir, name))
+                break
+            segments.append((name, segment_seconds * written / segment_bytes))
+            if written < segment_bytes:
+                break
+    _write_playlist(out_dir, segments, segment_seconds)
+    return segments
+
+
+CODECS = {"ffmpeg": ffmpeg_transcode, "stub": stub_transcode}
+
+
+def transcode_variant(codec: str, source: str, out_dir: str, bitrate: int, segment_seconds: int,
+                      ffmpeg: str = "ffmpeg", timeout: int = 600) -> dict:
+    """variant 하나를 out_dir 에 만든다. {"bitrate", "segments": [파일명...], "duration"}."""
+    os.makedirs(out_dir, exist_ok=True)
+    segments = CODECS[codec](source, out_dir, bitrate, segment_seconds, ffmpeg, timeout)
+    return {
+        "bitrate": bitrate,
+        "segments": [name for name, _ in segments],
+        "duration": round(sum(d for _, d in segments), 3),
+    }
@@ -0,0 +1,106 @@
+# core/counters.py
+"""
+역정규화 카운터.
+
+- Track.favorite_count                          ← Favorite
+- Playlist.track_count / total_duration_sec     ← PlaylistTrack (+ Track.duration_sec, 업로드 분석으로 길이가 바뀌면 set_track_duration)
+
+변경 지점(core/favorites.py, PlaylistViewSet.add/remove)에서 같은 트랜잭션 안에 F() 로 증감하고,
+사용자 삭제(cascade)나 곡 길이 수정 등으로 생긴 오차는 `manage.py reconcile_counters` 로 chunk 단위 보정한다.
+"""
+from django.db.models import Case, Count, F, Sum, Value, When
+
+from .models import Favorite, Playlist, PlaylistTrack, Track
+
+
+def _plus(field: str, delta: int):
+    """F(field) + delta, 단 0 아래로 내려가지 않게 (MySQL UNSIGNED 컬럼은 음수 중간값도 오류)."""
+    if delta >= 0:
+        return F(field) + delta
+    return Case(When(**{f"{field}__gt": -delta}, then=F(field) + delta), default=Value(0))
+
+
+def adjust_favorite_count(track_ids, delta: int):
+    if track_ids and delta:
+        Track.objects.filter(pk__in=track_ids).update(favorite_count=_plus("favorite_count", delta))
+
+
+def adjust_playlist_totals(playlist_id, count_delta: int, duration_delta: int):
+    if count_delta or duration_delta:
+        Playlist.objects.filter(pk=playlist_id).update(
+            track_count=_plus("track_count", count_delta),
+            total_duration_sec=_plus("total_duration_sec", duration_delta),
+        )
+
+
+def set_track_duration(track_id, duration_sec: int) -> bool:
+    """
+    곡 길이를 바꾸고 그 곡이 담긴 플레이리스트의 total_duration_sec 도 같은 차이만큼 보정.
+    트랜잭션 안에서 호출, 바뀌었으면 True. Track 은 save() 하지 않으므로 캐시 무효화 등은 호출하는 쪽에서 처리.
+    """
+    old = Track.objects.select_for_update().filter(pk=track_id).values_list("duration_sec", flat=True).first()
+    if old is None or old == duration_sec:
+        return False
+    Track.objects.filter(pk=track_id).update(duration_sec=duration_sec)
+    Playlist.objects.filter(items__track_id=track_id).update(
+        total_duration_sec=_plus("total_duration_sec", duration_sec - old)
+    )
+    return True
+
+
+def _chunks(model, chunk_size):
+    """pk 순으로 chunk_size 개씩 pk 목록을 돌려준다 (OFFSET 없이 keyset 방식)."""
+    last = None
+    while True:
+        qs = model.objects.order_by("pk")
+        if last is not None:
+            qs = qs.filter(pk__gt=last)
+        ids = list(qs.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def reconcile_track_counters(chunk_size: int = 1000, dry_run: bool = False) -> int:
+    """Track.favorite_count 를 실제 값으로 보정. 틀렸던 곡 수를 반환."""
+    fixed = 0
+    for ids in _chunks(Track, chunk_size):
+        actual = dict(
+            Favorite.objects.filter(track_id__in=ids)
+            .values("track_id")
+            .annotate(n=Count("id"))
+            .values_list("track_id", "n")
+        )
+        drifted = []
+        for track in Track.objects.filter(pk__in=ids).only("id", "favorite_count"):
+            n = actual.get(track.pk, 0)
+            if track.favorite_count != n:
+                track.favorite_count = n
+                drifted.append(track)
+        if drifted and not dry_run:
+            Track.objects.bulk_update(drifted, ["favorite_count"])
+        fixed += len(drifted)
+    return fixed
+
+
+def reconcile_playlist_counters(chunk_size: int = 1000, dry_run: bool = False) -> int:
+    """Playlist.track_count / total_duration_sec 를 실제 값으로 보정. 틀렸던 플레이리스트 수를 반환."""
+    fixed = 0
+    for ids in _chunks(Playlist, chunk_size):
+        actual = {
+            row["playlist_id"]: (row["n"], row["total"] or 0)
+            for row in PlaylistTrack.objects.filter(playlist_id__in=ids)
+            .values("playlist_id")
+            .annotate(n=Count("id"), total=Sum("track__duration_sec"))
+        }
+        drifted = []
+        for playlist in Playlist.objects.filter(pk__in=ids).only("id", "track_count", "total_duration_sec"):
+            n, total = actual.get(playlist.pk, (0, 0))
+            if (playlist.track_count, playlist.total_duration_sec) != (n, total):
+                playlist.track_count, playlist.total_duration_sec = n, total
+                drifted.append(playlist)
+        if drifted and not dry_run:
+            Playlist.objects.bulk_update(drifted, ["track_count", "total_duration_sec"])
+        fixed += len(drifted)
+    return fixed
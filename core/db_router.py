@@ -0,0 +1,164 @@
+# core/db_router.py
+"""
+읽기 전용 replica 라우팅 (DATABASE_ROUTERS).
+
+- 요청 단위로만 replica 를 쓴다: ReplicaRoutingMiddleware 가 DB_REPLICA_VIEWS 에 있는 view(URL name)의
+  GET/HEAD 요청만 표시하고, 그 밖의 요청·관리 명령·백그라운드 스레드의 읽기는 모두 primary(default).
+- 요청마다 replica 하나를 골라 그 요청의 모든 읽기에 사용 (요청 안에서 서로 다른 복제 지연을 보지 않도록)
+- read-your-writes: 쓰기가 있었던 요청이 끝나면 그 사용자를 DB_REPLICA_STICKY_SECONDS 동안 primary 에 고정
+  (Django cache 사용, 워커가 여러 개면 공유 캐시 백엔드 필요). 그동안 해당 사용자의 조회는 primary 에서 읽는다.
+- 곡이 바뀐 직후 DB_REPLICA_STICKY_SECONDS 동안은 곡 조회(track-*)도 primary: 카탈로그 응답 캐시(core/cache.py)가
+  무효화 직후 아직 복제되지 않은 replica 값으로 다시 채워지지 않도록
+- primary 트랜잭션(atomic) 안의 읽기는 항상 primary
+- 마이그레이션은 primary 에만 (replica 는 복제로 스키마를 받는다)
+
+로컬에서는 SQLite 파일 두 개로 확인할 수 있다 (README 참고): DB_REPLICAS=db-replica.sqlite3
+"""
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject
+
+REPLICA_PREFIX = "replica_"
+CATALOG_PIN_KEY = "db:pin:catalog"
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def _pin_key(user_id) -> str:
+    return f"db:pin:{user_id}"
+
+
+def pin_user(user_id):
+    """이 사용자의 조회를 DB_REPLICA_STICKY_SECONDS 동안 primary 로 (복제 지연 중 자기 쓰기가 안 보이는 것 방지)."""
+    cache.set(_pin_key(user_id), 1, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user_id) -> bool:
+    return cache.get(_pin_key(user_id)) is not None
+
+
+def pin_catalog_reads():
+    """Track 저장/삭제 시 (core/signals.py): 잠시 곡 조회를 primary 에서."""
+    if replica_aliases():
+        cache.set(CATALOG_PIN_KEY, 1, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+class RequestRouting:
+    """요청 하나의 라우팅 상태. 스레드(sync_to_async)로 넘어가도 같은 객체를 공유하도록 가변 객체로 둔다."""
+
+    __slots__ = ("request", "use_replica", "replica", "pinned", "wrote")
+
+    def __init__(self, request):
+        self.request = request
+        self.use_replica = False
+        self.replica = None
+        self.pinned = None
+        self.wrote = False
+
+    def api_user_id(self):
+        """
+        DRF 인증이 끝난 사용자 id (DRF 는 인증 후 HttpRequest.user 도 바꾼다).
+        아직 인증 전(AuthenticationMiddleware 의 lazy user)이면 평가하지 않고 None.
+        """
+        user = self.request.__dict__.get("user")
+        if user is None or isinstance(user, SimpleLazyObject) or not user.is_authenticated:
+            return None
+        return user.pk
+
+
+_current = contextvars.ContextVar("db_routing", default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or not state.use_replica:
+            return None
+        if state.replica is None:
+            replicas = replica_aliases()
+            state.replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+        if state.pinned is None:
+            # 인증 조회(토큰의 사용자)는 replica 에서, 그 뒤 조회부터 사용자 고정 여부 반영
+            user_id = state.api_user_id()
+            if user_id is not None:
+                state.pinned = is_pinned(user_id)
+        if state.pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica 는 primary 의 복사본이므로 어느 쪽에서 읽은 객체끼리도 관계를 허용
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db.startswith(REPLICA_PREFIX):
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """DB_REPLICA_VIEWS 의 GET/HEAD 만 replica 로 표시하고, 쓰기가 있었던 사용자는 primary 에 고정 (sync/async 겸용)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.views = frozenset(getattr(settings, "DB_REPLICA_VIEWS", ())) if replica_aliases() else frozenset()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestRouting(request)
+        token = _current.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+            user_id = self._sticky_user(state)
+            if user_id is not None:
+                pin_user(user_id)
+
+    async def __acall__(self, request):
+        state = RequestRouting(request)
+        token = _current.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+            user_id = self._sticky_user(state)
+            if user_id is not None:
+                await cache.aset(_pin_key(user_id), 1, settings.DB_REPLICA_STICKY_SECONDS)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _current.get()
+        name = request.resolver_match.url_name
+        if state is None or request.method not in ("GET", "HEAD") or name not in self.views:
+            return
+        if name.startswith("track-") and cache.get(CATALOG_PIN_KEY) is not None:
+            return
+        state.use_replica = True
+
+    @staticmethod
+    def _sticky_user(state):
+        """쓰기가 있었던 요청의 사용자 (replica 가 없으면 고정할 필요 없음)."""
+        if state.wrote and replica_aliases():
+            user = getattr(state.request, "user", None)
+            if user is not None and user.is_authenticated:
+                return user.pk
+        return None
@@ -0,0 +1,159 @@
+# core/events.py
+"""
+재생 이벤트 실시간 전달 (pub/sub).
+
+- publish(channel, message): 동기 코드(WSGI 뷰, 스레드)에서도 호출 가능
+- subscribe(channel): asyncio 이벤트 루프 안(ASGI 뷰)에서 구독, 구독자마다 크기가 제한된 큐를 가진다
+- 큐가 가득 찬(느린) 구독자는 이벤트를 쌓아두지 않고 끊는다 → 한 구독자 때문에 메모리가 늘지 않음
+
+기본 InProcessBroker 는 같은 프로세스 안의 구독자에게만 전달한다.
+여러 워커/서버로 확장할 때는 BaseBroker 를 구현해 EVENT_BROKER 설정으로 교체한다 (예: Redis pub/sub).
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PLAYS_CHANNEL = "plays"
+
+
+def user_plays_channel(user_id) -> str:
+    return f"plays:user:{user_id}"
+
+
+class Subscription:
+    """구독자 1명. 이벤트 루프 안에서 get() 으로 메시지를 받는다."""
+
+    def __init__(self, broker, channel: str, maxsize: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+        self.closed = False
+
+    def offer(self, message):
+        """이벤트 루프 스레드에서 호출됨. 큐가 가득 차면 구독을 끊는다."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self.close()
+            logger.info("events: dropped slow subscriber on %s", self.channel)
+
+    async def get(self, timeout: float | None = None):
+        """메시지 하나. timeout 이 지나면 None, 끊긴 구독이면 ConnectionError."""
+        if self.closed and self.queue.empty():
+            raise ConnectionError("subscription closed")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            if self.closed:
+                raise ConnectionError("subscription closed")
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+            # get() 에서 대기 중인 소비자를 깨운다
+            if self.queue.empty():
+                self.queue.put_nowait(None)
+
+
+class BaseBroker:
+    queue_size = 100
+
+    def __init__(self, queue_size: int | None = None):
+        if queue_size is not None:
+            self.queue_size = queue_size
+
+    def publish(self, channel: str, message) -> int:
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InProcessBroker(BaseBroker):
+    """프로세스 내 pub/sub. 구독자별 이벤트 루프로 call_soon_threadsafe 를 통해 전달한다."""
+
+    def __init__(self, queue_size: int | None = None):
+        super().__init__(queue_size)
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def publish(self, channel: str, message) -> int:
+        with self._lock:
+            targets = list(self._subscribers.get(channel, ()))
+            self.published += 1
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, message)
+            except RuntimeError:
+                # 이벤트 루프가 이미 종료됨
+                self.unsubscribe(sub)
+        return len(targets)
+
+    def subscribe(self, channel: str) -> Subscription:
+        sub = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subs = self._subscribers.get(subscription.channel)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subscribers[subscription.channel]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+            }
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> BaseBroker:
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                cls = import_string(getattr(settings, "EVENT_BROKER", "core.events.InProcessBroker"))
+                _broker = cls(queue_size=getattr(settings, "EVENT_SUBSCRIBER_QUEUE_SIZE", 100))
+    return _broker
+
+
+def publish_plays(events):
+    """재생 이벤트를 전체 채널과 사용자별 채널에 발행 (구독자가 없으면 거의 비용 없음)."""
+    broker = get_broker()
+    for e in events:
+        message = {
+            "user_id": e.user_id,
+            "track_id": str(e.track_id),
+            "played_at": e.played_at.isoformat(),
+        }
+        broker.publish(PLAYS_CHANNEL, message)
+        broker.publish(user_plays_channel(e.user_id), message)
@@ -0,0 +1,130 @@
+# core/favorites.py
+"""
+즐겨찾기 설정/해제.
+
+- 설정은 INSERT ... SELECT (중복 무시) 한 문장: 곡이 있고 아직 없을 때만 행이 추가된다.
+  더블탭 등 동시 요청에도 unique(user, track) 충돌 예외가 나지 않는다.
+- 해제는 조건부 DELETE 한 문장.
+두 함수 모두 실제로 바뀌었는지(bool)를 반환해 이후 카운터 갱신 등에 쓸 수 있다.
+바뀐 경우 같은 트랜잭션에서 Track.favorite_count 를 증감하고(해제는 "최근 즐겨찾기" 자동 플레이리스트에서도 뺀다),
+커밋 후 그 사용자의 카탈로그 캐시(is_favorited 포함)만 무효화한다.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import bump_user_catalog_version
+from .counters import adjust_favorite_count
+from .models import Favorite, Track
+from .smart_playlists import drop_unfavorited
+
+
+def _insert_ignore_sql() -> str:
+    qn = connection.ops.quote_name
+    fav, track = Favorite._meta, Track._meta
+    verb, suffix = "INSERT", ""
+    if connection.vendor == "sqlite":
+        verb = "INSERT OR IGNORE"
+    elif connection.vendor == "mysql":
+        verb = "INSERT IGNORE"
+    else:
+        suffix = " ON CONFLICT DO NOTHING"
+    columns = ", ".join(qn(fav.get_field(name).column) for name in ("user", "track", "created_at"))
+    return (
+        f"{verb} INTO {qn(fav.db_table)} ({columns}) "
+        f"SELECT %s, {qn(track.pk.column)}, %s FROM {qn(track.db_table)} "
+        f"WHERE {qn(track.pk.column)} = %s{suffix}"
+    )
+
+
+def _changed(user_id):
+    # 커밋 전에 무효화하면 다른 요청이 이전 상태를 다시 캐시할 수 있으므로 커밋 후 실행
+    transaction.on_commit(lambda: bump_user_catalog_version(user_id))
+
+
+def _insert(user_id, track_id) -> bool | None:
+    params = [
+        user_id,
+        Favorite._meta.get_field("created_at").get_db_prep_value(timezone.now(), connection),
+        Track._meta.pk.get_db_prep_value(track_id, connection),
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(_insert_ignore_sql(), params)
+        inserted = cursor.rowcount
+    if inserted:
+        return True
+    if Favorite.objects.filter(user_id=user_id, track_id=track_id).exists():
+        return False
+    return None
+
+
+def _delete(user_id, track_id) -> bool:
+    return Favorite.objects.filter(user_id=user_id, track_id=track_id).delete()[0] > 0
+
+
+def add_favorite(user_id, track_id) -> bool | None:
+    """
+    즐겨찾기 설정. 새로 추가했으면 True, 이미 있었으면 False, 곡이 없으면 None.
+    (이미 있던 경우에만 존재 여부 확인 쿼리가 하나 더 나간다)
+    """
+    with transaction.atomic():
+        added = _insert(user_id, track_id)
+        if added:
+            adjust_favorite_count([track_id], 1)
+            _changed(user_id)
+    return added
+
+
+def remove_favorite(user_id, track_id) -> bool:
+    """즐겨찾기 해제. 실제로 지웠으면 True."""
+    with transaction.atomic():
+        removed = _delete(user_id, track_id)
+        if removed:
+            adjust_favorite_count([track_id], -1)
+            drop_unfavorited(user_id, [track_id])
+            _changed(user_id)
+    return removed
+
+
+def toggle_favorite(user_id, track_id) -> bool | None:
+    """해제를 먼저 시도하고 지운 게 없으면 설정. 최종 상태(True/False) 또는 곡이 없으면 None."""
+    with transaction.atomic():
+        if _delete(user_id, track_id):
+            adjust_favorite_count([track_id], -1)
+            drop_unfavorited(user_id, [track_id])
+            _changed(user_id)
+            return False
+        if _insert(user_id, track_id) is None:
+            return None
+        adjust_favorite_count([track_id], 1)
+        _changed(user_id)
+        return True
+
+
+def add_favorites(user_id, track_ids):
+    """여러 곡 즐겨찾기 설정 (한 트랜잭션). (추가된 id 목록, 없는 곡 id 목록) 반환."""
+    added, missing = [], []
+    with transaction.atomic():
+        for track_id in dict.fromkeys(track_ids):
+            result = _insert(user_id, track_id)
+            if result is None:
+                missing.append(track_id)
+            elif result:
+                added.append(track_id)
+        if added:
+            adjust_favorite_count(added, 1)
+            _changed(user_id)
+    return added, missing
+
+
+def remove_favorites(user_id, track_ids):
+    """여러 곡 즐겨찾기 해제. 실제로 지운 곡 id 목록 반환."""
+    with transaction.atomic():
+        qs = Favorite.objects.filter(user_id=user_id, track_id__in=set(track_ids))
+        # 동시 해제 요청과 겹쳐 카운터가 두 번 줄지 않도록 대상 행을 잠근다
+        removed = list(qs.select_for_update().values_list("track_id", flat=True))
+        if removed:
+            Favorite.objects.filter(user_id=user_id, track_id__in=removed).delete()
+            adjust_favorite_count(removed, -1)
+            drop_unfavorited(user_id, removed)
+            _changed(user_id)
+    return removed
@@ -0,0 +1,124 @@
+# core/history.py
+"""
+최근 재생 목록 / 이어듣기 위치 / PlayHistory 보존 기간 관리.
+
+- RecentlyPlayed : 사용자별로 곡당 한 행, 최근 RECENTLY_PLAYED_LIMIT 개만 유지.
+  재생 이벤트 저장(write_play_events) 시 같이 upsert 되므로 /api/history/recent/ 는 작은 테이블만 읽는다.
+- position_sec   : 클라이언트가 주기적으로 보고하는 재생 위치. 같은 곡을 다시 재생해도 유지된다.
+- compact_history: 집계(rollup)가 끝난 오래된 PlayHistory 를 id 순 chunk 로 삭제해 원본 테이블을 작게 유지.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PlayHistory, RecentlyPlayed, Watermark
+from .recommendations import SIMILARITY_WATERMARK
+from .rollups import PLAY_ROLLUP_WATERMARK, rollup_plays
+from .smart_playlists import SMART_PLAYS_WATERMARK
+
+
+def recently_played_limit() -> int:
+    return getattr(settings, "RECENTLY_PLAYED_LIMIT", 50)
+
+
+def update_recently_played(events):
+    """재생 이벤트 묶음을 RecentlyPlayed 에 반영 (사용자/곡별 가장 최근 시각만)."""
+    latest = {}
+    for e in events:
+        key = (e.user_id, e.track_id)
+        if key not in latest or e.played_at > latest[key]:
+            latest[key] = e.played_at
+    if not latest:
+        return
+    rows = [
+        RecentlyPlayed(user_id=user_id, track_id=track_id, played_at=played_at)
+        for (user_id, track_id), played_at in latest.items()
+    ]
+    # 이미 있는 곡은 played_at 만 갱신 (position_sec 은 그대로 두어 이어듣기 가능)
+    RecentlyPlayed.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["user", "track"],
+        update_fields=["played_at", "updated_at"],
+    )
+    trim_recently_played({user_id for user_id, _ in latest})
+
+
+def trim_recently_played(user_ids, limit: int | None = None) -> int:
+    """사용자별로 limit 개를 넘는 오래된 항목 삭제. 삭제한 행 수를 반환."""
+    limit = recently_played_limit() if limit is None else limit
+    stale = []
+    for user_id in user_ids:
+        # (user, -played_at) 인덱스로 limit 번째 이후만 읽는다 (대부분 빈 결과)
+        stale.extend(
+            RecentlyPlayed.objects.filter(user_id=user_id)
+            .order_by("-played_at", "-id")
+            .values_list("id", flat=True)[limit:]
+        )
+    if not stale:
+        return 0
+    return RecentlyPlayed.objects.filter(pk__in=stale).delete()[0]
+
+
+def save_position(user_id, track_id, position_sec: int) -> RecentlyPlayed:
+    """이어듣기 위치 저장 (upsert 한 번). 최근 재생 목록에 없던 곡이면 지금 재생한 것으로 추가."""
+    now = timezone.now()
+    obj = RecentlyPlayed(user_id=user_id, track_id=track_id, played_at=now, position_sec=position_sec)
+    RecentlyPlayed.objects.bulk_create(
+        [obj],
+        update_conflicts=True,
+        unique_fields=["user", "track"],
+        update_fields=["position_sec", "updated_at"],
+    )
+    # 새로 추가된 곡이면 RECENTLY_PLAYED_LIMIT 를 넘을 수 있으므로 재생 기록 반영과 같이 정리
+    trim_recently_played([user_id])
+    return obj
+
+
+def compact_history(
+    retention_days: int | None = None,
+    chunk_size: int = 5000,
+    pause: float = 0.0,
+    rollup: bool = True,
+    dry_run: bool = False,
+    progress=None,
+) -> int:
+    """
+    retention_days 보다 오래된 PlayHistory 를 삭제. 삭제한(dry_run 이면 대상) 행 수를 반환.
+    - 먼저 rollup_plays 로 남은 기록을 집계 테이블에 반영하고, watermark 이하(집계 완료) 행만 지운다
+      (build_similar_tracks / refresh_smart_playlists 를 쓰고 있으면 그 watermark 이하까지만)
+    - chunk 마다 별도 트랜잭션 + pk IN 삭제라 잠금이 짧고, pause 로 복제 지연/부하를 조절할 수 있다
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, "PLAY_HISTORY_RETENTION_DAYS", 90)
+    if rollup and not dry_run:
+        rollup_plays()
+    consumers = [SIMILARITY_WATERMARK, SMART_PLAYS_WATERMARK]
+    marks = dict(
+        Watermark.objects.filter(name__in=[PLAY_ROLLUP_WATERMARK, *consumers]).values_list("name", "last_id")
+    )
+    # 유사 곡 계산(core/similarity.py)/자동 플레이리스트(core/smart_playlists.py)에 아직 반영되지 않은 기록은 남겨 둔다
+    mark = min([marks.get(PLAY_ROLLUP_WATERMARK, 0), *(marks[name] for name in consumers if name in marks)])
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    base = PlayHistory.objects.filter(id__lte=mark, played_at__lt=cutoff)
+    if dry_run:
+        return base.count()
+
+    deleted = 0
+    last_id = 0
+    while True:
+        # 오래된 행은 id 앞쪽에 몰려 있으므로 pk 순으로 읽으면 인덱스 범위 스캔으로 끝난다
+        ids = list(base.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted += PlayHistory.objects.filter(pk__in=ids).delete()[0]
+        last_id = ids[-1]
+        if progress:
+            progress(deleted)
+        if pause:
+            time.sleep(pause)
+    return deleted
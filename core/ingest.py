@@ -0,0 +1,187 @@
+# core/ingest.py
+"""
+곡 메타데이터 일괄 등록 (JSONL / CSV).
+
+입력을 한 줄씩 읽어 chunk 단위로 검증 → audio_s3_key 기준 upsert(bulk_create ... update_conflicts) 하므로
+파일 크기와 무관하게 메모리 사용량이 chunk 크기로 고정된다.
+audio_s3_key 대신 filename 을 준 행은 새 key 와 presigned PUT URL 을 발급한다 (dry_run 이면 key 만).
+"""
+import codecs
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import bump_catalog_version
+from .models import Track
+from .search import SEARCH_FIELDS, get_search_backend
+from .storage import new_audio_key, new_audio_upload
+
+FORMATS = ("jsonl", "csv")
+UPDATE_FIELDS = ("title", "artist", "genre", "thumbnail_url", "duration_sec", "is_published")
+
+
+class TrackImportSerializer(serializers.ModelSerializer):
+    audio_s3_key = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    filename = serializers.CharField(max_length=255, required=False, allow_blank=True, write_only=True)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True, write_only=True)
+
+    class Meta:
+        model = Track
+        fields = (
+            "title",
+            "artist",
+            "genre",
+            "thumbnail_url",
+            "audio_s3_key",
+            "duration_sec",
+            "is_published",
+            "filename",
+            "content_type",
+        )
+
+    def validate(self, attrs):
+        if not attrs.get("audio_s3_key") and not attrs.get("filename"):
+            raise serializers.ValidationError("audio_s3_key 또는 filename 중 하나는 필요합니다.")
+        return attrs
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    # 응답 크기를 제한하기 위해 앞쪽 오류만 보관
+    errors: list = field(default_factory=list)
+    max_errors: int = 100
+
+    def add_error(self, line, detail):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": detail})
+
+    def as_dict(self):
+        return {
+            "total": self.total,
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def guess_format(name: str = "", content_type: str = "") -> str:
+    name, content_type = (name or "").lower(), (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    return "jsonl"
+
+
+def iter_records(stream, fmt: str):
+    """
+    (line_no, dict) 를 하나씩 돌려준다.
+    stream 은 bytes 줄 단위 iterable (바이너리 파일, UploadedFile, HttpRequest 등).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # 빈 칸은 미지정으로 취급 (serializer 기본값 사용)
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+            continue
+        yield line_no, record
+
+
+def import_tracks(records, chunk_size=1000, presign=True, dry_run=False, on_upload=None, progress=None):
+    """
+    records: iter_records() 결과. chunk 마다 한 트랜잭션으로 upsert.
+    on_upload(dict): filename 으로 받은 행의 업로드 URL 을 하나씩 전달 (응답/파일로 스트리밍)
+    progress(ImportResult): chunk 처리 후 호출
+    """
+    result = ImportResult()
+    chunk = []
+    for line_no, record in records:
+        result.total += 1
+        if isinstance(record, Exception) or not isinstance(record, dict):
+            result.add_error(line_no, {"non_field_errors": ["잘못된 JSON 행입니다."]})
+            continue
+        serializer = TrackImportSerializer(data=record)
+        if not serializer.is_valid():
+            result.add_error(line_no, serializer.errors)
+            continue
+        chunk.append((line_no, serializer.validated_data))
+        if len(chunk) >= chunk_size:
+            _flush_chunk(chunk, result, presign, dry_run, on_upload)
+            chunk = []
+            if progress:
+                progress(result)
+    if chunk:
+        _flush_chunk(chunk, result, presign, dry_run, on_upload)
+        if progress:
+            progress(result)
+    if (result.created or result.updated) and not dry_run:
+        bump_catalog_version()
+    return result
+
+
+def _flush_chunk(chunk, result, presign, dry_run, on_upload):
+    rows = {}
+    uploads = []
+    for line_no, data in chunk:
+        data = dict(data)
+        filename = data.pop("filename", "")
+        content_type = data.pop("content_type", "") or None
+        if not data.get("audio_s3_key"):
+            if not presign:
+                result.add_error(line_no, {"audio_s3_key": ["presign 이 꺼져 있으면 audio_s3_key 가 필요합니다."]})
+                continue
+            # dry_run 은 서명하지 않고 발급될 key 만 알려준다
+            upload = {"key": new_audio_key(filename)} if dry_run else new_audio_upload(filename, content_type)
+            data["audio_s3_key"] = upload["key"]
+            uploads.append({"line": line_no, **upload})
+        # 같은 chunk 안에서 key 가 중복되면 마지막 행이 우선
+        rows[data["audio_s3_key"]] = data
+
+    existing = set(Track.objects.filter(audio_s3_key__in=rows.keys()).values_list("audio_s3_key", flat=True))
+    created = sum(1 for key in rows if key not in existing)
+    if not dry_run and rows:
+        now = timezone.now()
+        # 행마다 준 필드만 갱신하므로 준 필드 조합별로 upsert 한 번씩 (보통 한 묶음).
+        # audio_s3_key unique 제약으로 INSERT ... ON CONFLICT DO UPDATE 하므로 동시에 같은 key 를 등록해도 중복되지 않는다
+        groups = {}
+        for data in rows.values():
+            fields = tuple(name for name in UPDATE_FIELDS if name in data)
+            groups.setdefault(fields, []).append(Track(**data, updated_at=now))
+        with transaction.atomic():
+            for fields, tracks in groups.items():
+                Track.objects.bulk_create(
+                    tracks,
+                    update_conflicts=True,
+                    unique_fields=["audio_s3_key"],
+                    # bulk 작업은 auto_now 를 적용하지 않으므로 updated_at 도 직접
+                    update_fields=[*fields, "updated_at"],
+                )
+            # 충돌로 갱신된 행은 기존 pk 이므로 다시 읽어서, bulk 작업이 보내지 않는 save 시그널 대신 검색 인덱스 갱신
+            get_search_backend().index_tracks(Track.objects.filter(audio_s3_key__in=rows.keys()).only(*SEARCH_FIELDS))
+    result.created += created
+    result.updated += len(rows) - created
+    if on_upload:
+        for upload in uploads:
+            on_upload(upload)
@@ -0,0 +1,355 @@
+import hashlib
+import hmac
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import playevents, s3
+from core.auth import add_user_claims
+from core.counters import reconcile_playlist_counters, reconcile_track_counters
+from core.models import Favorite, PlayHistory, Playlist, PlaylistTrack, Track, User
+from core.playlist_order import GAP
+from core.search import get_search_backend
+
+WORDS = [
+    "love", "night", "summer", "dream", "blue", "road", "light", "heart", "rain", "fire",
+    "사랑", "이별", "여름밤", "바다", "그리움", "봄날", "하늘", "눈물", "추억", "별빛",
+]
+GENRES = ["pop", "rock", "jazz", "hiphop", "발라드", "댄스", "인디"]
+SEARCHES = ["love", "사랑", "summer dream", "그리움 바다", "fire", "별빛"]
+SCENARIOS = ("track_list", "track_search", "stream", "history", "playlist_retrieve", "favorite_toggle")
+BATCH = 5000
+# 토큰을 미리 만들어 돌려 쓸 사용자 수 (요청마다 다른 사용자)
+ACTIVE_USERS = 50
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _stub_sign(key: str, expires: int) -> str:
+    """boto3 없이 같은 모양의 서명 URL 을 만드는 로컬 서명기 (HMAC-SHA256, 네트워크/자격 증명 불필요)."""
+    exp = int(time.time()) + expires
+    signature = hmac.new(b"bench", f"GET\n{key}\n{exp}".encode(), hashlib.sha256).hexdigest()
+    return f"https://bench.invalid/{quote(key)}?X-Expires={exp}&X-Signature={signature}"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "API 주요 경로 벤치마크: 합성 데이터를 bulk insert 로 시드한 뒤 시나리오별 처리량/p50/p99/쿼리 수 측정 "
+        "(현재 DATABASES 사용, SQLite 또는 DB_ENGINE=mysql. 시드 데이터는 롤백)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--tracks", type=int, default=20000)
+        parser.add_argument("--favorites", type=int, default=20, help="사용자당 즐겨찾기 수")
+        parser.add_argument("--plays", type=int, default=200000, help="전체 재생 기록 수")
+        parser.add_argument("--playlists", type=int, default=2, help="사용자당 플레이리스트 수")
+        parser.add_argument("--playlist-size", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=500, help="시나리오별 측정 요청 수")
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--only", help=f"쉼표로 구분한 시나리오 ({', '.join(SCENARIOS)})")
+        parser.add_argument("--catalog-cache", action="store_true", help="곡 목록 응답 캐시 사용 (기본: DB 경로 측정)")
+        parser.add_argument("--presigned-cache", action="store_true", help="presigned URL 캐시 사용 (기본: 매번 서명)")
+        parser.add_argument("--real-signer", action="store_true", help="로컬 stub 대신 boto3 로 서명")
+        parser.add_argument("--output", help="결과 JSON 파일 경로")
+        parser.add_argument("--baseline", help="비교할 이전 결과 JSON (처리량/p99 변화율 출력)")
+
+    def handle(self, *args, **opts):
+        only = opts["only"].split(",") if opts["only"] else list(SCENARIOS)
+        unknown = set(only) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        baseline = None
+        if opts["baseline"]:
+            with open(opts["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        report = {"meta": self._meta(opts), "results": {}}
+        try:
+            with transaction.atomic(), self._patched(opts):
+                seed_started = time.perf_counter()
+                data = self._seed(opts)
+                report["meta"]["seed_seconds"] = round(time.perf_counter() - seed_started, 2)
+                for name in only:
+                    self.stdout.write(f"running {name} ...")
+                    report["results"][name] = self._measure(getattr(self, f"_scenario_{name}")(data), opts)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self._print(report, baseline)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"wrote {opts['output']}")
+
+    def _meta(self, opts):
+        return {
+            "commit": _git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "scale": {k: opts[k] for k in ("users", "tracks", "favorites", "plays", "playlists", "playlist_size")},
+            "requests": opts["requests"],
+            "settings": {
+                "JWT_STATELESS_AUTH": getattr(settings, "JWT_STATELESS_AUTH", False),
+                "METRICS_ENABLED": getattr(settings, "METRICS_ENABLED", False),
+                "SEARCH_BACKEND": getattr(settings, "SEARCH_BACKEND", ""),
+                "catalog_cache": opts["catalog_cache"],
+                "presigned_cache": opts["presigned_cache"],
+                "signer": "boto3" if opts["real_signer"] else "stub",
+            },
+        }
+
+    # ---------------------------------------------------------------
+    # 환경
+    # ---------------------------------------------------------------
+    @contextmanager
+    def _patched(self, opts):
+        from core.views import TrackViewSet
+
+        saved = (s3._sign_get_url, s3.presigned_url_cache.ttl, TrackViewSet.catalog_cache_timeout, playevents._pipeline)
+        if not opts["real_signer"]:
+            s3._sign_get_url = _stub_sign
+        if not opts["presigned_cache"]:
+            s3.presigned_url_cache.ttl = 0
+        if not opts["catalog_cache"]:
+            TrackViewSet.catalog_cache_timeout = 0
+        # 시드 데이터가 롤백 트랜잭션 안에 있으므로 재생 기록은 같은 연결에서 즉시 저장
+        playevents._pipeline = playevents.PlayEventPipeline(mode="sync")
+        try:
+            yield
+        finally:
+            (s3._sign_get_url, s3.presigned_url_cache.ttl, TrackViewSet.catalog_cache_timeout,
+             playevents._pipeline) = saved
+
+    # ---------------------------------------------------------------
+    # 시드 (bulk insert)
+    # ---------------------------------------------------------------
+    def _seed(self, opts):
+        rng = random.Random(opts["seed"])
+        now = timezone.now()
+        self.stdout.write(
+            f"seeding {opts['users']} users, {opts['tracks']} tracks, {opts['plays']} plays, "
+            f"{opts['users'] * opts['favorites']} favorites, {opts['users'] * opts['playlists']} playlists ..."
+        )
+        users = User.objects.bulk_create(
+            (User(username=f"__bench_api__{i}", password="!", is_active=True) for i in range(opts["users"])),
+            batch_size=BATCH,
+        )
+        user_ids = [u.pk for u in users]
+
+        backend = get_search_backend()
+        track_ids = []
+        batch = []
+        for i in range(opts["tracks"]):
+            batch.append(Track(
+                title=" ".join(rng.sample(WORDS, 3)),
+                artist=f"{rng.choice(WORDS)} band {i % 2000}",
+                genre=rng.choice(GENRES),
+                duration_sec=rng.randint(90, 420),
+                audio_s3_key=f"bench/{i}.mp3",
+            ))
+            if len(batch) == BATCH or i == opts["tracks"] - 1:
+                created = Track.objects.bulk_create(batch)
+                backend.index_tracks(created)
+                track_ids.extend(t.pk for t in created)
+                batch = []
+
+        Favorite.objects.bulk_create(
+            (
+                Favorite(user_id=uid, track_id=tid)
+                for uid in user_ids
+                for tid in rng.sample(track_ids, min(opts["favorites"], len(track_ids)))
+            ),
+            batch_size=BATCH,
+        )
+        reconcile_track_counters()
+
+        month = 30 * 24 * 3600
+        PlayHistory.objects.bulk_create(
+            (
+                PlayHistory(
+                    user_id=rng.choice(user_ids),
+                    track_id=rng.choice(track_ids),
+                    played_at=now - timezone.timedelta(seconds=rng.randrange(month)),
+                )
+                for _ in range(opts["plays"])
+            ),
+            batch_size=BATCH,
+        )
+
+        playlists = Playlist.objects.bulk_create(
+            (
+                Playlist(user_id=uid, name=f"bench {j}", is_public=j == 0)
+                for uid in user_ids
+                for j in range(opts["playlists"])
+            ),
+            batch_size=BATCH,
+        )
+        size = min(opts["playlist_size"], len(track_ids))
+        PlaylistTrack.objects.bulk_create(
+            (
+                PlaylistTrack(playlist_id=p.pk, track_id=tid, order=(k + 1) * GAP)
+                for p in playlists
+                for k, tid in enumerate(rng.sample(track_ids, size))
+            ),
+            batch_size=BATCH,
+        )
+        reconcile_playlist_counters()
+
+        active = rng.sample(users, min(ACTIVE_USERS, len(users)))
+        tokens = {u.pk: f"Bearer {add_user_claims(AccessToken.for_user(u), u)}" for u in active}
+        own_playlists = {}
+        for p in playlists:
+            if p.user_id in tokens:
+                own_playlists.setdefault(p.user_id, []).append(p.pk)
+        return {
+            "rng": rng,
+            "tokens": list(tokens.items()),
+            "track_ids": track_ids,
+            "playlists": [(uid, pid) for uid, pids in own_playlists.items() for pid in pids],
+        }
+
+    # ---------------------------------------------------------------
+    # 시나리오: i 번째 요청 → (method, path, user_id, on_response)
+    # ---------------------------------------------------------------
+    def _scenario_track_list(self, data):
+        tokens = data["tokens"]
+        return lambda i: ("get", f"/api/tracks/?genre={quote(GENRES[i % len(GENRES)])}&page_size=20",
+                          tokens[i % len(tokens)][1], None)
+
+    def _scenario_track_search(self, data):
+        tokens = data["tokens"]
+        return lambda i: ("get", f"/api/tracks/?search={quote(SEARCHES[i % len(SEARCHES)])}&page_size=20",
+                          tokens[i % len(tokens)][1], None)
+
+    def _scenario_stream(self, data):
+        tokens, track_ids, rng = data["tokens"], data["track_ids"], data["rng"]
+        return lambda i: ("post", f"/api/tracks/{rng.choice(track_ids)}/stream/", tokens[i % len(tokens)][1], None)
+
+    def _scenario_history(self, data):
+        """사용자별로 첫 페이지부터 next(cursor) 를 따라 최대 5 페이지."""
+        tokens = data["tokens"]
+        state = {"user": 0, "next": None, "page": 0}
+
+        def on_response(response):
+            body = response.json()
+            state["page"] += 1
+            state["next"] = body.get("next") if state["page"] < 5 else None
+            if not state["next"]:
+                state["user"], state["page"] = state["user"] + 1, 0
+
+        def make(i):
+            path = state["next"] or "/api/history/?page_size=20"
+            return "get", path, tokens[state["user"] % len(tokens)][1], on_response
+
+        return make
+
+    def _scenario_playlist_retrieve(self, data):
+        tokens, playlists = dict(data["tokens"]), data["playlists"]
+        if not playlists:
+            raise CommandError("playlist_retrieve 에는 --playlists 1 이상이 필요합니다")
+
+        def make(i):
+            user_id, playlist_id = playlists[i % len(playlists)]
+            return "get", f"/api/playlists/{playlist_id}/", tokens[user_id], None
+
+        return make
+
+    def _scenario_favorite_toggle(self, data):
+        tokens, track_ids, rng = data["tokens"], data["track_ids"], data["rng"]
+        return lambda i: ("post", f"/api/tracks/{rng.choice(track_ids)}/toggle_favorite/",
+                          tokens[i % len(tokens)][1], None)
+
+    # ---------------------------------------------------------------
+    # 측정
+    # ---------------------------------------------------------------
+    def _measure(self, make, opts):
+        client = Client()
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        def call(i):
+            method, path, authorization, on_response = make(i)
+            t0 = time.perf_counter()
+            response = getattr(client, method)(path, HTTP_AUTHORIZATION=authorization)
+            elapsed = time.perf_counter() - t0
+            if on_response is not None and response.status_code == 200:
+                on_response(response)
+            return elapsed, response.status_code
+
+        for i in range(opts["warmup"]):
+            call(i)
+
+        latencies, errors = [], 0
+        with connection.execute_wrapper(count):
+            for i in range(opts["requests"]):
+                elapsed, status = call(opts["warmup"] + i)
+                latencies.append(elapsed * 1000)
+                errors += status >= 400
+        total = sum(latencies) / 1000
+        return {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / total, 1),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p99_ms": round(_percentile(latencies, 99), 3),
+            "max_ms": round(max(latencies), 3),
+            "queries_per_request": round(queries / len(latencies), 2),
+            "errors": errors,
+        }
+
+    def _print(self, report, baseline):
+        base = (baseline or {}).get("results", {})
+        header = f"{'scenario':<20}{'req/s':>9}{'p50 (ms)':>11}{'p99 (ms)':>11}{'queries':>9}{'errors':>8}"
+        if base:
+            header += f"{'req/s Δ':>10}{'p99 Δ':>9}"
+        self.stdout.write(header)
+        for name, r in report["results"].items():
+            line = (
+                f"{name:<20}{r['rps']:>9.1f}{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}"
+                f"{r['queries_per_request']:>9.2f}{r['errors']:>8}"
+            )
+            old = base.get(name)
+            if old:
+                line += f"{(r['rps'] / old['rps'] - 1) * 100:>+9.1f}%{(r['p99_ms'] / old['p99_ms'] - 1) * 100:>+8.1f}%"
+            self.stdout.write(line)
+        if baseline:
+            self.stdout.write(f"baseline: commit {baseline.get('meta', {}).get('commit')}")
@@ -0,0 +1,276 @@
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import PlayHistory, Track, User
+
+BENCH_USER = "__bench_async__"
+BENCH_KEY_PREFIX = "__bench_async__/"
+WORKERS = ("wsgi", "asgi")
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "WSGI(DRF 동기 뷰, 고정 스레드) vs ASGI(async 뷰) 워커 하나의 동시 요청 처리량 비교. "
+        "워커마다 별도 프로세스에서 앱을 직접 호출한다 (데이터는 끝나면 삭제)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="워커별 총 요청 수")
+        parser.add_argument("--concurrency", type=int, default=64, help="동시 클라이언트 수")
+        parser.add_argument("--threads", type=int, default=8, help="WSGI 워커 스레드 수 (gunicorn --threads)")
+        parser.add_argument("--db-latency-ms", type=float, default=5.0, help="쿼리마다 더할 지연 (DB 왕복 시간 흉내)")
+        parser.add_argument("--sign-latency-ms", type=float, default=0.0, help="S3 서명마다 더할 지연 (0=실제 boto3 서명만)")
+        parser.add_argument("--catalog-cache", action="store_true", help="곡 목록/상세 응답 캐시 사용 (기본: DB 경로 측정)")
+        parser.add_argument(
+            "--play-events-mode", choices=("sync", "async"), default="async",
+            help="stream 요청의 재생 기록 저장 방식 (PLAY_EVENTS_MODE, 운영 권장값 async)",
+        )
+        parser.add_argument("--tracks", type=int, default=500)
+        parser.add_argument("--only", choices=WORKERS, help="한쪽 워커만 측정")
+        parser.add_argument("--worker", choices=WORKERS, help="(내부용) 이 프로세스에서 해당 워커로 측정")
+
+    def handle(self, *args, **opts):
+        if opts["worker"]:
+            return self._run_worker(opts)
+
+        user, track_ids = self._seed(opts["tracks"])
+        try:
+            results = {}
+            for worker in [opts["only"]] if opts["only"] else WORKERS:
+                self.stdout.write(f"running {worker} worker ...")
+                results[worker] = self._spawn(worker, opts)
+        finally:
+            user.delete()
+            Track.objects.filter(pk__in=track_ids).delete()
+
+        self.stdout.write(
+            f"{'worker':<8}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}{'errors':>9}"
+        )
+        for worker, r in results.items():
+            self.stdout.write(
+                f"{worker:<8}{r['rps']:>10.1f}{r['p50']:>12.1f}{r['p99']:>12.1f}{r['errors']:>9}"
+            )
+
+    # ---------------------------------------------------------------
+    # parent
+    # ---------------------------------------------------------------
+    def _seed(self, n_tracks):
+        User.objects.filter(username=BENCH_USER).delete()
+        user = User.objects.create(username=BENCH_USER, is_active=True)
+        tracks = Track.objects.bulk_create(
+            Track(title=f"bench {i}", artist=f"artist {i % 50}", genre="bench", audio_s3_key=f"{BENCH_KEY_PREFIX}{i}.mp3")
+            for i in range(n_tracks)
+        )
+        now = timezone.now()
+        PlayHistory.objects.bulk_create(
+            PlayHistory(user=user, track=tracks[i % n_tracks], played_at=now - timezone.timedelta(minutes=i))
+            for i in range(200)
+        )
+        return user, [t.pk for t in tracks]
+
+    def _spawn(self, worker, opts):
+        cmd = [sys.executable, sys.argv[0], "bench_async", "--worker", worker]
+        for name in ("requests", "concurrency", "threads", "db_latency_ms", "sign_latency_ms"):
+            cmd += [f"--{name.replace('_', '-')}", str(opts[name])]
+        if opts["catalog_cache"]:
+            cmd.append("--catalog-cache")
+        env = {
+            **os.environ,
+            "ASYNC_API_VIEWS": "1" if worker == "asgi" else "0",
+            "PLAY_EVENTS_MODE": opts["play_events_mode"],
+        }
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise CommandError(f"{worker} worker failed:\n{proc.stderr[-2000:]}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # ---------------------------------------------------------------
+    # worker (child process)
+    # ---------------------------------------------------------------
+    def _run_worker(self, opts):
+        from core import s3
+        from core.views import TrackViewSet
+
+        self._install_latency(opts["db_latency_ms"] / 1000, opts["sign_latency_ms"] / 1000)
+        # 매 요청 실제 서명 비용이 들도록 presigned URL 캐시는 끈다
+        s3.presigned_url_cache.ttl = 0
+        if not opts["catalog_cache"]:
+            TrackViewSet.catalog_cache_timeout = 0
+
+        user = User.objects.get(username=BENCH_USER)
+        token = str(AccessToken.for_user(user))
+        track_ids = list(
+            Track.objects.filter(audio_s3_key__startswith=BENCH_KEY_PREFIX).values_list("pk", flat=True)[:100]
+        )
+        requests = [
+            ("GET", "/api/tracks/", "genre=bench&page_size=20"),
+            ("GET", f"/api/tracks/{track_ids[0]}/", ""),
+            ("POST", f"/api/tracks/{track_ids[1]}/stream/", ""),
+            ("GET", "/api/history/", "page_size=20"),
+        ]
+        plan = [requests[i % len(requests)] for i in range(opts["requests"])]
+
+        if opts["worker"] == "wsgi":
+            elapsed, latencies, errors = self._drive_wsgi(plan, token, opts)
+        else:
+            elapsed, latencies, errors = asyncio.run(self._drive_asgi(plan, token, opts))
+        self.stdout.write(json.dumps({
+            "rps": len(plan) / elapsed,
+            "p50": statistics.median(latencies),
+            "p99": _percentile(latencies, 99),
+            "errors": errors,
+        }))
+
+    @staticmethod
+    def _install_latency(db_delay, sign_delay):
+        from core import s3
+
+        def slow_execute(execute, sql, params, many, context):
+            time.sleep(db_delay)
+            return execute(sql, params, many, context)
+
+        def add_wrapper(sender, connection, **kwargs):
+            # 같은 DatabaseWrapper 가 요청마다 다시 연결하므로 한 번만 붙인다
+            if slow_execute not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_execute)
+
+        if db_delay:
+            connection_created.connect(add_wrapper, weak=False)
+        if sign_delay:
+            sign = s3._sign_get_url
+
+            def slow_sign(key, expires):
+                time.sleep(sign_delay)
+                return sign(key, expires)
+
+            s3._sign_get_url = slow_sign
+
+    def _drive_wsgi(self, plan, token, opts):
+        """gunicorn gthread 워커처럼 고정 스레드 풀이 요청을 처리 (동시 클라이언트는 풀 앞에서 대기)."""
+        from config.wsgi import application
+
+        def call(method, path, query):
+            environ = {
+                "REQUEST_METHOD": method,
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "SERVER_NAME": "localhost",
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": "localhost",
+                "HTTP_AUTHORIZATION": f"Bearer {token}",
+                "CONTENT_LENGTH": "0",
+                "wsgi.input": io.BytesIO(b""),
+                "wsgi.errors": sys.stderr,
+                "wsgi.url_scheme": "http",
+                "wsgi.multithread": True,
+                "wsgi.multiprocess": False,
+                "wsgi.run_once": False,
+                "wsgi.version": (1, 0),
+            }
+            status = []
+            result = application(environ, lambda s, headers, exc_info=None: status.append(s))
+            try:
+                b"".join(result)
+            finally:
+                result.close()
+            return int(status[0].split()[0])
+
+        pool = ThreadPoolExecutor(max_workers=opts["threads"])
+        latencies, errors = [], 0
+        lock = threading.Lock()
+        pending = iter(plan)
+
+        def client():
+            nonlocal errors
+            while True:
+                with lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                t0 = time.perf_counter()
+                status = pool.submit(call, *item).result()
+                with lock:
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    errors += status >= 400
+
+        start = time.perf_counter()
+        clients = [threading.Thread(target=client) for _ in range(opts["concurrency"])]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+        return elapsed, latencies, errors
+
+    async def _drive_asgi(self, plan, token, opts):
+        """이벤트 루프 하나(ASGI 워커 1개)에서 동시 클라이언트가 요청."""
+        from config.asgi import application
+
+        async def call(method, path, query):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": method,
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": query.encode(),
+                "root_path": "",
+                "headers": [(b"host", b"localhost"), (b"authorization", f"Bearer {token}".encode())],
+                "client": ("127.0.0.1", 0),
+                "server": ("localhost", 80),
+            }
+            status, body_sent = [], []
+            done = asyncio.Event()
+
+            async def receive():
+                if not body_sent:
+                    body_sent.append(True)
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                elif not message.get("more_body"):
+                    done.set()
+
+            await application(scope, receive, send)
+            return status[0]
+
+        latencies, errors = [], 0
+        pending = iter(plan)
+
+        async def client():
+            nonlocal errors
+            for item in pending:
+                t0 = time.perf_counter()
+                status = await call(*item)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                errors += status >= 400
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(opts["concurrency"])))
+        return time.perf_counter() - start, latencies, errors
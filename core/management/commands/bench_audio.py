@@ -0,0 +1,89 @@
+import os
+import resource
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.audio import UnsupportedAudio, analyze, pack_waveform, probe, waveform
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo, padding 없음 → 프레임 417 바이트 / 1152 샘플
+_MP3_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x40])
+_MP3_FRAME_SIZE = 144 * 128000 // 44100
+_MP3_FRAME_SAMPLES = 1152
+
+
+def _rss_mb() -> float:
+    # Linux: KB 단위 최대 RSS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_synthetic_mp3(path: str, seconds: int):
+    """CBR MP3 프레임 헤더 + 임의 payload (stub 코덱 파형 계산용, 실제로 재생 가능한 오디오는 아님)."""
+    frames = -(-seconds * 44100 // _MP3_FRAME_SAMPLES)
+    payload = os.urandom(_MP3_FRAME_SIZE - len(_MP3_FRAME_HEADER))
+    with open(path, "wb") as f:
+        for _ in range(frames):
+            f.write(_MP3_FRAME_HEADER)
+            f.write(payload)
+
+
+class Command(BaseCommand):
+    help = "원본 분석(core/audio.py): 헤더 파싱 + 파형 계산 시간과 최대 RSS 측정 (기본: 합성 10분 CBR MP3)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=None, help="측정할 오디오 파일 (기본: 합성 MP3 생성)")
+        parser.add_argument("--seconds", type=int, default=600, help="합성 MP3 길이(초)")
+        parser.add_argument(
+            "--codec", choices=("ffmpeg", "stub"), default=None,
+            help="파형 PCM 디코딩 (기본: --file 이면 settings.TRANSCODE_CODEC, 합성 파일이면 stub)",
+        )
+        parser.add_argument("--points", type=int, default=settings.WAVEFORM_POINTS)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        with tempfile.TemporaryDirectory(prefix="bench-audio-") as tmp:
+            path = opts["file"]
+            codec = opts["codec"] or (settings.TRANSCODE_CODEC if path else "stub")
+            if path is None:
+                path = os.path.join(tmp, "synthetic.mp3")
+                write_synthetic_mp3(path, opts["seconds"])
+            elif not os.path.exists(path):
+                raise CommandError(f"{path}: not found")
+            size = os.path.getsize(path)
+            self.stdout.write(f"file: {path} ({size / 1024 / 1024:.1f} MB), codec={codec}, points={opts['points']}")
+
+            try:
+                info = probe(path)
+            except UnsupportedAudio as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(
+                f"  probe: {info['format']} {info['duration_ms'] / 1000:.1f}s "
+                f"{info['bitrate']}kbps {info['sample_rate']}Hz {info['channels']}ch"
+            )
+
+            rss_before = _rss_mb()
+            probe_ms = self._time(lambda: probe(path), opts["repeat"])
+            args = (path, opts["points"], codec, settings.TRANSCODE_FFMPEG, settings.TRANSCODE_TIMEOUT)
+            peaks = waveform(*args)
+            wave_ms = self._time(lambda: waveform(*args), opts["repeat"])
+            analyze_ms = self._time(lambda: analyze(*args), opts["repeat"])
+
+        self.stdout.write(f"  probe    {probe_ms:9.2f} ms")
+        self.stdout.write(f"  waveform {wave_ms:9.2f} ms ({len(peaks)} points, blob {len(pack_waveform(peaks))} bytes)")
+        self.stdout.write(f"  analyze  {analyze_ms:9.2f} ms")
+        # 파일 전체를 메모리에 올리지 않으면 파일 크기와 무관하게 거의 늘지 않는다
+        self.stdout.write(
+            self.style.SUCCESS(f"  peak RSS {_rss_mb():.1f} MB (+{_rss_mb() - rss_before:.1f} MB while analyzing)")
+        )
+
+    @staticmethod
+    def _time(fn, repeat: int) -> float:
+        samples = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import PlayHistory, Track, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "재생기록 목록에서 PageNumber(OFFSET) vs Keyset(cursor) 페이지 지연시간 비교 (데이터는 롤백)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=10000, help="측정할 깊은 페이지 번호")
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self._run(opts)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, opts):
+        from rest_framework.pagination import PageNumberPagination
+        from core.views import PlayHistoryViewSet
+
+        page_size, deep = opts["page_size"], opts["pages"]
+        rows = page_size * deep
+        self.stdout.write(f"seeding {rows} play events ...")
+        user = User.objects.create(username="__bench_pagination__")
+        track = Track.objects.create(title="bench", artist="bench", audio_s3_key="bench.mp3")
+        now = timezone.now()
+        PlayHistory.objects.bulk_create(
+            (
+                PlayHistory(user=user, track=track, played_at=now - timezone.timedelta(seconds=i))
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        def measure(url):
+            samples = []
+            for _ in range(opts["repeat"]):
+                start = time.perf_counter()
+                resp = client.get(url)
+                samples.append((time.perf_counter() - start) * 1000)
+                assert resp.status_code == 200, resp.content[:200]
+            return statistics.median(samples)
+
+        # keyset: 깊은 페이지의 cursor 는 해당 위치의 행으로 직접 만든다
+        row = PlayHistory.objects.filter(user=user).order_by("-played_at", "-pk")[(deep - 1) * page_size - 1]
+        paginator = PlayHistoryViewSet.pagination_class()
+        paginator.base_url = "/api/history/"
+        paginator.ordering = ("-played_at", "-pk")
+        deep_cursor_url = paginator.encode_cursor(row)
+        keyset = (measure(f"/api/history/?page_size={page_size}"), measure(deep_cursor_url))
+
+        PlayHistoryViewSet.pagination_class = PageNumberPagination
+        try:
+            offset = (measure("/api/history/?page=1"), measure(f"/api/history/?page={deep}"))
+        finally:
+            PlayHistoryViewSet.pagination_class = paginator.__class__
+
+        self.stdout.write(f"{'pagination':<12}{'page 1 (ms)':>14}{f'page {deep} (ms)':>20}")
+        self.stdout.write(f"{'offset':<12}{offset[0]:>14.2f}{offset[1]:>20.2f}")
+        self.stdout.write(f"{'keyset':<12}{keyset[0]:>14.2f}{keyset[1]:>20.2f}")
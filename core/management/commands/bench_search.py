@@ -0,0 +1,72 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Track
+from core.search import LikeSearchBackend, get_search_backend
+
+WORDS = [
+    "love", "night", "summer", "dream", "blue", "road", "light", "heart", "rain", "fire",
+    "사랑", "이별", "여름밤", "바다", "그리움", "봄날", "하늘", "눈물", "추억", "별빛",
+]
+GENRES = ["pop", "rock", "jazz", "hiphop", "발라드", "댄스", "인디"]
+# 앞쪽은 흔한 단어(매칭 다수), 뒤쪽은 선택도가 높은 검색어
+QUERIES = ["love", "사랑", "여름", "fir", "별", "summer dream", "그리움 바다", "band 4321", "rain band 17"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "LIKE(icontains) 검색 vs 전문 검색 백엔드 지연시간 비교 (시드 데이터는 롤백)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tracks", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self._run(opts)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, opts):
+        rng = random.Random(42)
+        backend = get_search_backend()
+        self.stdout.write(f"seeding {opts['tracks']} tracks ...")
+        batch = []
+        for i in range(opts["tracks"]):
+            batch.append(Track(
+                title=" ".join(rng.sample(WORDS, 3)),
+                artist=f"{rng.choice(WORDS)} band {i % 5000}",
+                genre=rng.choice(GENRES),
+                audio_s3_key=f"bench/{i}.mp3",
+            ))
+            if len(batch) == 5000:
+                backend.index_tracks(Track.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            backend.index_tracks(Track.objects.bulk_create(batch))
+
+        candidates = [("like", LikeSearchBackend())]
+        if not isinstance(backend, LikeSearchBackend):
+            candidates.append((backend.__class__.__name__, backend))
+
+        self.stdout.write(f"{'query':<16}" + "".join(f"{name:>24}" for name, _ in candidates))
+        for query in QUERIES:
+            row = f"{query:<16}"
+            for _, b in candidates:
+                ordering = ("-search_rank", "-pk") if b.ranked else ("-created_at", "-pk")
+                samples = []
+                for _ in range(opts["repeat"]):
+                    start = time.perf_counter()
+                    list(b.filter(Track.objects.all(), query).order_by(*ordering)[:20])
+                    samples.append((time.perf_counter() - start) * 1000)
+                row += f"{statistics.median(samples):>21.2f} ms"
+            self.stdout.write(row)
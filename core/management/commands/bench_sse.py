@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import resource
+import statistics
+import threading
+import time
+import uuid
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.auth import add_user_claims
+from core.events import get_broker, publish_plays
+from core.models import User
+from core.playevents import PlayEvent
+
+BENCH_USER = "__bench_sse__"
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _rss_mb() -> float:
+    # Linux: KB 단위 최대 RSS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _Client:
+    """ASGI 앱에 직접 연결하는 SSE 구독자 (네트워크 없이 워커 하나의 한계를 측정)."""
+
+    def __init__(self, app, token):
+        self.app = app
+        self.token = token
+        self.status = None
+        self.received = 0
+        self.connected = asyncio.Event()
+        self.got_event = asyncio.Event()
+        self.disconnect = asyncio.Event()
+        self.task = None
+
+    async def _receive(self):
+        if not hasattr(self, "_sent_body"):
+            self._sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            if body.startswith(b"retry:"):
+                self.connected.set()
+            n = body.count(b"event: play")
+            if n:
+                self.received += n
+                self.got_event.set()
+            if not message.get("more_body"):
+                self.connected.set()
+
+    def start(self):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/events/plays/",
+            "raw_path": b"/api/events/plays/",
+            "query_string": f"token={self.token}".encode(),
+            "root_path": "",
+            "headers": [(b"host", b"localhost"), (b"accept", b"text/event-stream")],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        self.task = asyncio.ensure_future(self.app(scope, self._receive, self._send))
+
+
+class Command(BaseCommand):
+    help = (
+        "SSE 재생 이벤트: 워커(프로세스/이벤트 루프) 하나로 유휴 구독자 N 명 유지 + fan-out 지연 측정 "
+        "(config.asgi 사용, 벤치 사용자는 롤백)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=2000)
+        parser.add_argument("--events", type=int, default=20)
+
+    def handle(self, *args, **opts):
+        if User.objects.filter(username=BENCH_USER).exists():
+            raise CommandError(f"user {BENCH_USER!r} already exists; remove it before running the benchmark")
+        try:
+            with transaction.atomic(), self._patched():
+                user = User.objects.create(username=BENCH_USER, is_staff=True, is_active=True)
+                # async_to_sync 안에서는 ASGI 앱의 DB 접근(thread_sensitive sync_to_async)이 이 스레드에서 실행되어
+                # 커밋하지 않은 벤치 사용자를 같은 트랜잭션으로 본다. 사용자 삭제(토큰 무효화 기록 포함)는 롤백으로 대신한다
+                # 로그인 토큰처럼 claim 포함 (JWT_STATELESS_AUTH 에서도 staff 로 전체 채널 구독)
+                token = add_user_claims(AccessToken.for_user(user), user)
+                async_to_sync(self._run)(str(token), opts)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    @contextlib.contextmanager
+    def _patched(self):
+        from core import async_views
+
+        # SSE 엔드포인트는 인증 전후로 close_old_connections 를 부르는데, 트랜잭션 안(autocommit 꺼짐)이면 연결을 닫아 버린다.
+        # 벤치 동안은 Django 테스트 클라이언트처럼 끈다
+        saved = async_views.close_old_connections
+        async_views.close_old_connections = lambda **kwargs: None
+        try:
+            yield
+        finally:
+            async_views.close_old_connections = saved
+
+    async def _run(self, token, opts):
+        from config.asgi import application as app
+
+        n = opts["subscribers"]
+        rss_before, threads_before = _rss_mb(), threading.active_count()
+
+        start = time.perf_counter()
+        clients = [_Client(app, token) for _ in range(n)]
+        for c in clients:
+            c.start()
+        await asyncio.gather(*(c.connected.wait() for c in clients))
+        connect_s = time.perf_counter() - start
+        ok = sum(1 for c in clients if c.status == 200)
+        self.stdout.write(
+            f"connected {ok}/{n} subscribers in {connect_s:.2f}s "
+            f"(threads {threads_before} -> {threading.active_count()}, "
+            f"max RSS {rss_before:.0f} -> {_rss_mb():.0f} MB, broker {get_broker().stats()})"
+        )
+
+        # 재생 이벤트는 동기 뷰(스레드)에서 발행되므로 별도 스레드에서 publish
+        latencies = []
+        for _ in range(opts["events"]):
+            for c in clients:
+                c.got_event.clear()
+            event = PlayEvent(user_id=0, track_id=uuid.uuid4(), played_at=timezone.now())
+            t0 = time.perf_counter()
+            await asyncio.to_thread(publish_plays, [event])
+            await asyncio.gather(*(c.got_event.wait() for c in clients))
+            latencies.append((time.perf_counter() - t0) * 1000)
+        delivered = sum(c.received for c in clients)
+        self.stdout.write(
+            f"fan-out to {n}: p50 {statistics.median(latencies):.1f} ms, "
+            f"max {max(latencies):.1f} ms, delivered {delivered}/{n * opts['events']}"
+        )
+
+        for c in clients:
+            c.disconnect.set()
+        await asyncio.wait([c.task for c in clients], timeout=30)
+        self.stdout.write(f"after disconnect: broker {get_broker().stats()}")
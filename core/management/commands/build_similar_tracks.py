@@ -0,0 +1,40 @@
+import resource
+
+from django.core.management.base import BaseCommand
+
+from core.rollups import rollup_plays
+from core.similarity import build_similar_tracks
+
+
+class Command(BaseCommand):
+    help = (
+        "재생 기록/즐겨찾기/플레이리스트로 곡별 유사 곡 상위 K 개 계산 (NumPy/SciPy). "
+        "지난 실행 이후 변경된 곡만 다시 계산하므로 주기적으로 실행 (겹치지 않게)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=None, help="곡당 이웃 수, 기본 SIMILAR_TRACKS_TOP_K")
+        parser.add_argument("--chunk-size", type=int, default=200_000, help="DB 에서 한 번에 읽는 행(id 구간) 수")
+        parser.add_argument("--block-size", type=int, default=256, help="유사도를 한 번에 계산하는 곡 수 (메모리 ∝ block × 곡 수)")
+        parser.add_argument("--all-tracks", action="store_true", help="변경 여부와 관계없이 모든 곡을 다시 계산")
+        parser.add_argument("--reset", action="store_true", help="저장된 행렬을 버리고 현재 테이블로 처음부터")
+        parser.add_argument("--skip-rollup", action="store_true", help="먼저 rollup_plays 를 실행하지 않음")
+
+    def handle(self, *args, **opts):
+        if not opts["skip_rollup"]:
+            # 집계가 끝난(rollup watermark 이하) 재생 기록까지만 반영하므로 먼저 집계
+            rollup_plays()
+        stats = build_similar_tracks(
+            top_k=opts["top_k"],
+            chunk_size=opts["chunk_size"],
+            block_size=opts["block_size"],
+            all_tracks=opts["all_tracks"],
+            reset=opts["reset"],
+            progress=lambda msg: self.stdout.write(f"  {msg}"),
+        )
+        # Linux: KB 단위 최대 RSS
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f"updated neighbours of {stats['updated_tracks']}/{stats['tracks']} tracks "
+            f"(plays up to id {stats['last_play_id']}) in {stats['seconds']:.1f}s, peak RSS {rss_mb:.0f} MB"
+        ))
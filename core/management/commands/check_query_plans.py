@@ -0,0 +1,144 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import Favorite, PlayHistory, Playlist, PlaylistTrack, RecentlyPlayed, Track, User
+from core.pagination import KeysetPagination
+from core.views import FavoriteViewSet, PlayHistoryViewSet, PlaylistViewSet, TrackViewSet
+
+# (이름, viewset, action, query params)
+VIEW_CASES = [
+    ("track-list", TrackViewSet, "list", {}),
+    ("track-list genre", TrackViewSet, "list", {"genre": "pop"}),
+    ("track-list artist", TrackViewSet, "list", {"artist": "IU"}),
+    ("track-list is_published", TrackViewSet, "list", {"is_published": "true"}),
+    ("track-list title", TrackViewSet, "list", {"ordering": "title"}),
+    ("track-list -play_count", TrackViewSet, "list", {"ordering": "-play_count"}),
+    ("track-list -favorite_count", TrackViewSet, "list", {"ordering": "-favorite_count"}),
+    ("track-list favorite_count__gte", TrackViewSet, "list", {"favorite_count__gte": "10", "ordering": "-favorite_count"}),
+    ("favorite-list", FavoriteViewSet, "list", {}),
+    ("history-list", PlayHistoryViewSet, "list", {}),
+    ("playlist-list", PlaylistViewSet, "list", {}),
+]
+
+# 이름(cursor 조건 포함)별로 사용해야 하는 인덱스: (모델, 인덱스 필드) 중 하나
+EXPECTED_INDEXES = {
+    "track-list": [(Track, ["created_at", "id"])],
+    "track-list genre": [(Track, ["genre", "created_at", "id"])],
+    "track-list artist": [(Track, ["artist", "created_at", "id"])],
+    # 통계가 없으면 SQLite 는 정렬을 피하려고 created_at 인덱스를 고르기도 한다
+    "track-list is_published": [(Track, ["is_published", "created_at", "id"]), (Track, ["created_at", "id"])],
+    "track-list title": [(Track, ["title", "id"])],
+    "track-list -play_count": [(Track, ["play_count", "id"])],
+    "track-list -favorite_count": [(Track, ["favorite_count", "id"])],
+    "track-list favorite_count__gte": [(Track, ["favorite_count", "id"])],
+    "favorite-list": [(Favorite, ["user", "created_at"])],
+    "history-list": [(PlayHistory, ["user", "played_at"])],
+    "playlist-list": [(Playlist, ["user", "created_at"])],
+    "history-recent": [(RecentlyPlayed, ["user", "-played_at", "-id"])],
+    "playlist items prefetch": [(PlaylistTrack, ["playlist", "order", "added_at"])],
+}
+
+
+def _sample_value(model, name):
+    """cursor 조건을 만들기 위한 필드 타입별 임의 값 (EXPLAIN 만 하므로 실제 값은 상관없다)."""
+    field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+    kind = field.get_internal_type()
+    if kind == "DateTimeField":
+        return timezone.now()
+    if kind == "UUIDField":
+        return uuid.uuid4()
+    if kind in ("CharField", "TextField"):
+        return ""
+    if kind == "BooleanField":
+        return True
+    return 0
+
+
+def _index_name(model, fields) -> str:
+    return next(index.name for index in model._meta.indexes if list(index.fields) == list(fields))
+
+
+def plan_problems(plan: str, name: str | None = None) -> list[str]:
+    """
+    SQLite EXPLAIN QUERY PLAN 에서 전체 테이블 스캔 / 정렬용 임시 B-tree(filesort) 줄,
+    그리고 EXPECTED_INDEXES 의 인덱스를 쓰지 않으면 그 내용.
+    """
+    problems = []
+    for line in plan.splitlines():
+        if " SCAN " in f" {line} " and "USING" not in line:
+            problems.append(line.strip())
+        elif "USE TEMP B-TREE" in line:
+            problems.append(line.strip())
+    expected = EXPECTED_INDEXES.get((name or "").removesuffix(" (cursor)"))
+    if expected:
+        names = [_index_name(model, fields) for model, fields in expected]
+        if not any(f" INDEX {index} " in f"{line} " for line in plan.splitlines() for index in names):
+            problems.append(f"expected index {' or '.join(names)} not used")
+    return problems
+
+
+def plan_queries():
+    """(이름, queryset): 주요 목록 조회와 그 다음 페이지(cursor) 조회."""
+    # 저장하지 않은 사용자: 실행 계획만 보므로 행이 없어도 된다
+    user = User(pk=1, is_active=True)
+    factory = APIRequestFactory()
+    for name, viewset, action, params in VIEW_CASES:
+        request = Request(factory.get("/", params))
+        request.user = user
+        view = viewset(action=action, request=request, args=(), kwargs={}, format_kwarg=None)
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        if isinstance(paginator, KeysetPagination):
+            page, _ = paginator._prepare(queryset, request, view)
+            yield name, page
+            # 다음 페이지(cursor) 조건
+            order = list(paginator.ordering)
+            values = [_sample_value(queryset.model, f.lstrip("-")) for f in order]
+            yield f"{name} (cursor)", queryset.order_by(*order).filter(paginator._after(order, values))[:20]
+        else:
+            yield name, queryset[:20]
+
+    yield "history-recent", (
+        RecentlyPlayed.objects.filter(user_id=user.pk).select_related("track").order_by("-played_at", "-id")[:50]
+    )
+    # PlaylistViewSet 상세 응답의 items prefetch (목록은 여러 플레이리스트를 IN 으로 묶어 페이지 크기만큼만 정렬)
+    yield "playlist items prefetch", (
+        PlaylistTrack.objects.filter(playlist_id__in=[uuid.uuid4()]).select_related("track")
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "주요 목록 조회(TrackViewSet/FavoriteViewSet/PlaylistViewSet/PlayHistoryViewSet)의 "
+        "SQLite 실행 계획에 전체 테이블 스캔이나 정렬용 임시 B-tree 가 없고 의도한 인덱스를 쓰는지 확인 (아니면 실패)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="모든 실행 계획 출력")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite":
+            self.stdout.write(f"skipped: query plan checks support SQLite only (current: {connection.vendor})")
+            return
+
+        failures = 0
+        for name, queryset in plan_queries():
+            plan = queryset.explain()
+            problems = plan_problems(plan, name)
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {name}"))
+                for line in problems:
+                    self.stdout.write(f"    {line}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok   {name}"))
+            if opts["verbose_plans"]:
+                self.stdout.write("\n".join(f"    | {line}" for line in plan.splitlines()))
+        if failures:
+            raise CommandError(f"{failures} queries use full scans, temporary sorts or unexpected indexes")
+
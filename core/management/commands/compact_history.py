@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core.history import compact_history
+
+
+class Command(BaseCommand):
+    help = "집계가 끝난 오래된 PlayHistory 를 chunk 단위로 삭제 (먼저 rollup_plays 를 실행해 집계 테이블에 반영)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="보존 기간(일), 기본 PLAY_HISTORY_RETENTION_DAYS")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--pause", type=float, default=0.0, help="chunk 사이 대기(초)")
+        parser.add_argument("--skip-rollup", action="store_true")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        total = compact_history(
+            retention_days=opts["days"],
+            chunk_size=opts["chunk_size"],
+            pause=opts["pause"],
+            rollup=not opts["skip_rollup"],
+            dry_run=opts["dry_run"],
+            progress=lambda n: self.stdout.write(f"deleted {n}"),
+        )
+        if opts["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{total} play history rows would be deleted"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"deleted {total} play history rows"))
@@ -0,0 +1,63 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ingest import FORMATS, guess_format, import_tracks, iter_records
+
+
+class Command(BaseCommand):
+    help = "JSONL/CSV 파일로 곡 메타데이터 일괄 등록 (audio_s3_key 기준 upsert)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="입력 파일 경로 ('-' 이면 stdin)")
+        parser.add_argument("--format", choices=FORMATS, default=None, help="기본: 확장자로 추정")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="검증만 하고 저장하지 않음")
+        parser.add_argument("--no-presign", action="store_true", help="filename 행에 업로드 URL 을 발급하지 않음")
+        parser.add_argument(
+            "--uploads-out",
+            default=None,
+            help="filename 행의 업로드 URL 을 JSONL 로 기록할 파일 (기본: stdout)",
+        )
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+        fmt = opts["format"] or guess_format(path)
+        try:
+            source = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as e:
+            raise CommandError(str(e))
+
+        out = open(opts["uploads_out"], "w", encoding="utf-8") if opts["uploads_out"] else self.stdout
+
+        def on_upload(upload):
+            out.write(json.dumps(upload, ensure_ascii=False) + "\n")
+
+        def progress(result):
+            self.stderr.write(
+                f"  {result.total} rows: created={result.created} updated={result.updated} "
+                f"errors={result.error_count}"
+            )
+
+        try:
+            result = import_tracks(
+                iter_records(source, fmt),
+                chunk_size=opts["chunk_size"],
+                presign=not opts["no_presign"],
+                dry_run=opts["dry_run"],
+                on_upload=on_upload,
+                progress=progress,
+            )
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+            if out is not self.stdout:
+                out.close()
+
+        for error in result.errors:
+            self.stderr.write(f"  line {error['line']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stderr.write(self.style.SUCCESS(
+            f"done: {result.total} rows, created={result.created}, updated={result.updated}, "
+            f"errors={result.error_count}{' (dry run)' if opts['dry_run'] else ''}"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.auth import prune_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "만료 시각이 지난 RevokedToken 삭제 (해당 토큰은 이미 만료되어 denylist 에 둘 필요가 없다)"
+
+    def handle(self, *args, **opts):
+        deleted = prune_revoked_tokens()
+        self.stdout.write(self.style.SUCCESS(f"deleted {deleted} revoked token rows"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Track 검색 인덱스(TrackSearchDocument + FTS) 전체 재색인"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--backend", default=None, help="auto/sqlite/mysql/like (기본: SEARCH_BACKEND)")
+
+    def handle(self, *args, **opts):
+        backend = get_search_backend(opts["backend"])
+        total = backend.rebuild(
+            batch_size=opts["batch_size"],
+            progress=lambda n: self.stdout.write(f"  indexed {n} tracks", ending="\r"),
+        )
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"{backend.__class__.__name__}: {total} tracks indexed"))
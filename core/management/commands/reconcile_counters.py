@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.counters import reconcile_playlist_counters, reconcile_track_counters
+
+
+class Command(BaseCommand):
+    help = "Track.favorite_count / Playlist.track_count, total_duration_sec 를 실제 값과 비교해 chunk 단위로 보정"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--only", choices=["tracks", "playlists"], default=None)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        verb = "would fix" if opts["dry_run"] else "fixed"
+        if opts["only"] in (None, "tracks"):
+            n = reconcile_track_counters(opts["chunk_size"], opts["dry_run"])
+            self.stdout.write(self.style.SUCCESS(f"tracks: {verb} {n}"))
+        if opts["only"] in (None, "playlists"):
+            n = reconcile_playlist_counters(opts["chunk_size"], opts["dry_run"])
+            self.stdout.write(self.style.SUCCESS(f"playlists: {verb} {n}"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.rollups import rollup_plays
+from core.smart_playlists import refresh_smart_playlists
+
+
+class Command(BaseCommand):
+    help = (
+        "이번 달 많이 들은 곡 / 최근 즐겨찾기 / 장르 믹스 플레이리스트 갱신. "
+        "지난 실행 이후 재생·즐겨찾기 기록이 생긴 사용자만 다시 계산하므로 주기적으로 실행 (겹치지 않게)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="사용자 shard 수(스레드), 기본 SMART_PLAYLIST_WORKERS")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--user", type=int, action="append", default=[], help="새 기록과 관계없이 다시 계산할 사용자 id (여러 번 지정 가능)")
+        parser.add_argument("--skip-rollup", action="store_true", help="먼저 rollup_plays 를 실행하지 않음")
+
+    def handle(self, *args, **opts):
+        if not opts["skip_rollup"]:
+            # 집계가 끝난(rollup watermark 이하) 재생 기록까지만 반영하므로 먼저 집계
+            rollup_plays()
+        stats = refresh_smart_playlists(
+            workers=opts["workers"],
+            batch_size=opts["batch_size"],
+            user_ids=opts["user"],
+            progress=lambda msg: self.stdout.write(f"  {msg}"),
+        )
+        detail = ", ".join(f"{k} {v}" for k, v in sorted(stats.items()) if k not in ("users", "failed"))
+        self.stdout.write(self.style.SUCCESS(
+            f"refreshed smart playlists of {stats['users']} users ({detail or 'no changes'})"
+        ))
+        if stats["failed"]:
+            self.stderr.write(self.style.ERROR(f"{stats['failed']} users failed (see log)"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.rollups import rollup_plays
+
+
+class Command(BaseCommand):
+    help = "PlayHistory 를 watermark 이후부터 재생 수 집계 테이블에 반영 (중단 후 다시 실행하면 이어서 처리)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--settle-seconds", type=int, default=None)
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **opts):
+        total = rollup_plays(
+            batch_size=opts["batch_size"],
+            settle_seconds=opts["settle_seconds"],
+            max_batches=opts["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"rolled up {total} play events"))
@@ -0,0 +1,55 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from core.models import Track
+from core.transcode import enqueue, reset_stale_processing, shutdown_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "HLS 변환 대기(transcode_status=pending) 곡을 프로세스 풀로 변환 "
+        "(--watch 로 워커처럼 계속 실행, 중단 후 다시 실행하면 남은 곡부터)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 처리할 최대 곡 수")
+        parser.add_argument("--retry-failed", action="store_true", help="failed 상태 곡도 다시 변환")
+        parser.add_argument("--track", action="append", default=[], help="지정한 곡만 (상태와 무관, 여러 번 지정 가능)")
+        parser.add_argument("--codec", choices=("ffmpeg", "stub"), default=None, help="기본: settings.TRANSCODE_CODEC")
+        parser.add_argument("--watch", type=float, default=None, help="이 간격(초)으로 대기 곡을 계속 확인")
+
+    def handle(self, *args, **opts):
+        statuses = [Track.TRANSCODE_PENDING] + ([Track.TRANSCODE_FAILED] if opts["retry_failed"] else [])
+        try:
+            while True:
+                # 워커가 죽어 processing 으로 남은 곡은 다시 대기열로
+                reset = reset_stale_processing()
+                if reset:
+                    self.stdout.write(self.style.WARNING(f"reset {reset} stale processing tracks to pending"))
+                if opts["track"]:
+                    ids = list(Track.objects.filter(pk__in=opts["track"]).values_list("pk", flat=True))
+                else:
+                    ids = list(
+                        Track.objects.filter(transcode_status__in=statuses)
+                        .order_by("created_at")
+                        .values_list("pk", flat=True)[: opts["limit"]]
+                    )
+                if ids:
+                    self._run(ids, opts["codec"])
+                if opts["watch"] is None or opts["track"]:
+                    break
+                time.sleep(opts["watch"])
+        finally:
+            shutdown_pool()
+
+    def _run(self, ids, codec):
+        started = time.perf_counter()
+        # 자리가 날 때까지 기다리며 제출 (동시에 TRANSCODE_MAX_PENDING 곡까지)
+        futures = [enqueue(track_id, block=True, codec=codec) for track_id in ids]
+        results = Counter(f.result() for f in futures)
+        summary = ", ".join(f"{status} {n}" for status, n in sorted(results.items()))
+        self.stdout.write(
+            self.style.SUCCESS(f"transcoded {len(ids)} tracks in {time.perf_counter() - started:.1f}s ({summary})")
+        )
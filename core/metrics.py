@@ -0,0 +1,293 @@
+# core/metrics.py
+"""
+요청별 성능 계측 (MetricsMiddleware) + Prometheus 텍스트 출력 (GET /api/metrics/, 관리자 전용).
+
+요청마다 view action(URL name, 예: track-stream / playlist-list) 단위로 기록:
+- 전체 처리 시간
+- DB 쿼리 수 / 시간: 모든 DB 연결에 붙인 execute_wrapper 가 현재 요청(contextvar)에 누적
+- S3 서명 시간: core/s3.py 의 서명 구간 (timer("s3"))
+- serializer 시간: serializer.data 평가 구간 (install() 에서 BaseSerializer.data 를 감싼다)
+
+집계는 프로세스 메모리의 고정 버킷 histogram (요청당 버킷 탐색 몇 번 수준이라 운영에서도 켜둘 수 있다).
+워커가 여러 개면 워커별로 수집된다 (Prometheus 가 워커별로 scrape 해서 합산).
+
+METRICS_SLOW_REQUEST_MS 보다 느린 요청은 METRICS_SLOW_SAMPLE_RATE 비율로 실행한 SQL 과 함께 로그에 남긴다.
+"""
+import bisect
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+# 느린 요청 로그에 남길 최대 SQL 수 (요청마다 메모리가 늘지 않도록)
+MAX_CAPTURED_QUERIES = 50
+
+
+class RequestMetrics:
+    __slots__ = ("db_queries", "db_time", "s3_time", "serializer_time", "queries", "serializer_depth")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.s3_time = 0.0
+        self.serializer_time = 0.0
+        self.queries = []  # (sql, seconds)
+        self.serializer_depth = 0
+
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+def current() -> RequestMetrics | None:
+    return _current.get()
+
+
+@contextmanager
+def timer(name: str):
+    """현재 요청의 <name>_time 에 구간 시간 누적 (요청 밖이면 아무것도 하지 않음)."""
+    m = _current.get()
+    if m is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        attr = f"{name}_time"
+        setattr(m, attr, getattr(m, attr) + time.perf_counter() - t0)
+
+
+# -------------------------------------------------------------------
+# histograms
+# -------------------------------------------------------------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra="") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames, buckets):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), series):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: int = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            snapshot = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+LABELS = ("endpoint", "method")
+
+requests_total = Counter("api_requests_total", "Requests by view action and status.", LABELS + ("status",))
+request_seconds = Histogram("api_request_duration_seconds", "Wall time per request.", LABELS, SECONDS_BUCKETS)
+db_queries = Histogram("api_request_db_queries", "DB queries per request.", LABELS, COUNT_BUCKETS)
+db_seconds = Histogram("api_request_db_seconds", "DB time per request.", LABELS, SECONDS_BUCKETS)
+s3_seconds = Histogram("api_request_s3_sign_seconds", "S3 URL signing time per request.", LABELS, SECONDS_BUCKETS)
+serializer_seconds = Histogram(
+    "api_request_serializer_seconds", "Serializer (.data) time per request.", LABELS, SECONDS_BUCKETS
+)
+REGISTRY = (requests_total, request_seconds, db_queries, db_seconds, s3_seconds, serializer_seconds)
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.reset()
+
+
+# -------------------------------------------------------------------
+# 계측 지점
+# -------------------------------------------------------------------
+def _db_wrapper(execute, sql, params, many, context):
+    m = _current.get()
+    if m is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - t0
+        m.db_queries += 1
+        m.db_time += elapsed
+        if len(m.queries) < MAX_CAPTURED_QUERIES:
+            m.queries.append((sql, elapsed))
+
+
+def _add_db_wrapper(sender, connection, **kwargs):
+    # 같은 DatabaseWrapper 가 재연결마다 signal 을 보내므로 한 번만 붙인다
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+def _timed_data(fget):
+    def data(self):
+        m = _current.get()
+        if m is None or m.serializer_depth:
+            return fget(self)
+        # SerializerMethodField 등에서 다른 serializer.data 를 불러도 바깥 구간만 센다
+        m.serializer_depth += 1
+        t0 = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            m.serializer_time += time.perf_counter() - t0
+            m.serializer_depth -= 1
+
+    return data
+
+
+_installed = False
+
+
+def install():
+    """CoreConfig.ready 에서 호출: DB 연결마다 execute_wrapper, serializer.data 계측."""
+    global _installed
+    if _installed or not getattr(settings, "METRICS_ENABLED", True):
+        return
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(_add_db_wrapper, weak=False)
+    BaseSerializer.data = property(_timed_data(BaseSerializer.data.fget))
+    _installed = True
+
+
+# -------------------------------------------------------------------
+# middleware
+# -------------------------------------------------------------------
+def _endpoint(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.route or "unnamed"
+
+
+def _record(request, response, m: RequestMetrics, elapsed: float):
+    labels = (_endpoint(request), request.method)
+    requests_total.inc(labels + (str(response.status_code),))
+    request_seconds.observe(labels, elapsed)
+    db_queries.observe(labels, m.db_queries)
+    db_seconds.observe(labels, m.db_time)
+    s3_seconds.observe(labels, m.s3_time)
+    serializer_seconds.observe(labels, m.serializer_time)
+
+    if elapsed * 1000 >= settings.METRICS_SLOW_REQUEST_MS and random.random() < settings.METRICS_SLOW_SAMPLE_RATE:
+        sql = "\n".join(f"  [{t * 1000:.1f} ms] {s}" for s, t in m.queries)
+        if m.db_queries > len(m.queries):
+            sql += f"\n  ... {m.db_queries - len(m.queries)} more"
+        logger.warning(
+            "slow request %s %s (%s) %d %.1f ms: db %d queries %.1f ms, s3 sign %.1f ms, serializer %.1f ms\n%s",
+            request.method, request.get_full_path(), labels[0], response.status_code, elapsed * 1000,
+            m.db_queries, m.db_time * 1000, m.s3_time * 1000, m.serializer_time * 1000, sql,
+        )
+
+
+class MetricsMiddleware:
+    """sync/async 모두 지원 (ASGI 에서 스레드 전환 없이 동작)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        m = RequestMetrics()
+        token = _current.set(m)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        _record(request, response, m, time.perf_counter() - t0)
+        return response
+
+    async def __acall__(self, request):
+        m = RequestMetrics()
+        token = _current.set(m)
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        _record(request, response, m, time.perf_counter() - t0)
+        return response
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_track_fts USING fts5(
+        body,
+        content='core_tracksearchdocument',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_track_fts_ai AFTER INSERT ON core_tracksearchdocument BEGIN
+        INSERT INTO core_track_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_track_fts_ad AFTER DELETE ON core_tracksearchdocument BEGIN
+        INSERT INTO core_track_fts(core_track_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_track_fts_au AFTER UPDATE ON core_tracksearchdocument BEGIN
+        INSERT INTO core_track_fts(core_track_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO core_track_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_track_fts_au",
+    "DROP TRIGGER IF EXISTS core_track_fts_ad",
+    "DROP TRIGGER IF EXISTS core_track_fts_ai",
+    "DROP TABLE IF EXISTS core_track_fts",
+]
+MYSQL_FORWARD = [
+    "ALTER TABLE core_tracksearchdocument ADD FULLTEXT INDEX core_track_ft_body (body) WITH PARSER ngram",
+]
+MYSQL_BACKWARD = [
+    "ALTER TABLE core_tracksearchdocument DROP INDEX core_track_ft_body",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_playlist_favorite_playhistory_playlisttrack'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.TextField(blank=True)),
+                ('track', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='core.track')),
+            ],
+        ),
+        # 검색 인덱스: SQLite=FTS5 (external content + 트리거), MySQL=FULLTEXT ngram
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "mysql": MYSQL_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "mysql": MYSQL_BACKWARD}),
+        ),
+    ]
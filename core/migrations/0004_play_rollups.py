@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_tracksearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='play_count',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='UserListeningStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('play_count', models.PositiveBigIntegerField(default=0)),
+                ('listened_sec', models.PositiveBigIntegerField(default=0)),
+                ('last_played_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='listening_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrackPlayCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('h', 'hour'), ('d', 'day')], max_length=1)),
+                ('bucket_start', models.DateTimeField()),
+                ('plays', models.PositiveIntegerField(default=0)),
+                ('track', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='play_counts', to='core.track')),
+            ],
+            options={
+                'unique_together': {('granularity', 'bucket_start', 'track')},
+            },
+        ),
+    ]
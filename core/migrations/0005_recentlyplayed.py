@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_play_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecentlyPlayed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('position_sec', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('track', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.track')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recently_played', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-played_at'],
+                'indexes': [models.Index(fields=['user', '-played_at'], name='core_recent_user_id_cba15f_idx')],
+                'unique_together': {('user', 'track')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:02
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Track = apps.get_model("core", "Track")
+    Favorite = apps.get_model("core", "Favorite")
+    Playlist = apps.get_model("core", "Playlist")
+    PlaylistTrack = apps.get_model("core", "PlaylistTrack")
+
+    favorites = Favorite.objects.filter(track=OuterRef("pk")).order_by().values("track")
+    Track.objects.update(favorite_count=Coalesce(
+        Subquery(favorites.annotate(n=Count("pk")).values("n"), output_field=IntegerField()), 0,
+    ))
+    items = PlaylistTrack.objects.filter(playlist=OuterRef("pk")).order_by().values("playlist")
+    Playlist.objects.update(
+        track_count=Coalesce(Subquery(items.annotate(n=Count("pk")).values("n"), output_field=IntegerField()), 0),
+        total_duration_sec=Coalesce(
+            Subquery(items.annotate(total=Sum("track__duration_sec")).values("total"), output_field=IntegerField()), 0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_recentlyplayed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playlist',
+            name='total_duration_sec',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='track_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='favorite_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
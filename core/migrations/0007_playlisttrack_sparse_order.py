@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+GAP = 1 << 20
+
+
+def spread_orders(apps, schema_editor):
+    """기존 순서(order, added_at)를 유지한 채 GAP 간격으로 다시 매긴다."""
+    PlaylistTrack = apps.get_model("core", "PlaylistTrack")
+    rows = list(
+        PlaylistTrack.objects.order_by("playlist_id", "order", "added_at", "id").values_list("id", "playlist_id")
+    )
+    batch, current, index = [], None, 0
+    for pk, playlist_id in rows:
+        if playlist_id != current:
+            current, index = playlist_id, 0
+        index += 1
+        batch.append(PlaylistTrack(id=pk, order=GAP * index))
+        if len(batch) >= 2000:
+            PlaylistTrack.objects.bulk_update(batch, ["order"])
+            batch = []
+    if batch:
+        PlaylistTrack.objects.bulk_update(batch, ["order"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='playlisttrack',
+            name='order',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', 'order'], name='core_playli_playlis_5cd816_idx'),
+        ),
+        migrations.RunPython(spread_orders, migrations.RunPython.noop),
+    ]
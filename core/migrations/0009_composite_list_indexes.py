@@ -0,0 +1,79 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='favorite',
+            name='core_favori_user_id_abd2c5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='playlisttrack',
+            name='core_playli_playlis_5cd816_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recentlyplayed',
+            name='core_recent_user_id_cba15f_idx',
+        ),
+        migrations.AlterField(
+            model_name='track',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='track',
+            name='play_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', 'created_at'], name='core_favori_user_id_70210b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlist',
+            index=models.Index(fields=['user', 'created_at'], name='core_playli_user_id_8e25e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', 'order', 'added_at'], name='core_playli_playlis_f042de_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recentlyplayed',
+            index=models.Index(fields=['user', '-played_at', '-id'], name='core_recent_user_id_9dcbc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['created_at', 'id'], name='core_track_created_779175_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['genre', 'created_at', 'id'], name='core_track_genre_b60409_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['artist', 'created_at', 'id'], name='core_track_artist_6f9b25_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['is_published', 'created_at', 'id'], name='core_track_is_publ_294e35_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['title', 'id'], name='core_track_title_19d564_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['play_count', 'id'], name='core_track_play_co_46cb27_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['favorite_count', 'id'], name='core_track_favorit_c79267_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_composite_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='hls_manifest_key',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='hls_variants',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='transcode_status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('ready', 'ready'), ('failed', 'failed')], default='pending', editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['transcode_status'], name='core_track_transco_060de1_idx'),
+        ),
+    ]
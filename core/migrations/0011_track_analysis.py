@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_track_hls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackAnalysis',
+            fields=[
+                ('track', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analysis', serialize=False, to='core.track')),
+                ('source_key', models.CharField(max_length=255)),
+                ('format', models.CharField(max_length=10)),
+                ('duration_ms', models.PositiveIntegerField()),
+                ('bitrate', models.PositiveIntegerField(help_text='kbps')),
+                ('sample_rate', models.PositiveIntegerField()),
+                ('channels', models.PositiveSmallIntegerField()),
+                ('waveform', models.BinaryField()),
+                ('analyzed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_track_analysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarTrack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='core.track')),
+                ('track', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.track')),
+            ],
+            options={
+                'unique_together': {('track', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_similar_tracks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTrackPlayCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('plays', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='playlist',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='genre',
+            field=models.CharField(blank=True, editable=False, max_length=80),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='kind',
+            field=models.CharField(choices=[('user', 'user'), ('most_played', 'most played this month'), ('recent_favorites', 'recently favorited'), ('genre_mix', 'genre mix')], default='user', editable=False, max_length=20),
+        ),
+        migrations.AlterUniqueTogether(
+            name='playlist',
+            unique_together={('user', 'kind', 'name')},
+        ),
+        migrations.AddIndex(
+            model_name='playlist',
+            index=models.Index(fields=['kind', 'updated_at'], name='core_playli_kind_6e9019_idx'),
+        ),
+        migrations.AddField(
+            model_name='usertrackplaycount',
+            name='track',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.track'),
+        ),
+        migrations.AddField(
+            model_name='usertrackplaycount',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='usertrackplaycount',
+            index=models.Index(fields=['month'], name='core_usertr_month_da6144_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='usertrackplaycount',
+            unique_together={('user', 'month', 'track')},
+        ),
+    ]
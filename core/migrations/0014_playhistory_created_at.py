@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_smart_playlists'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playhistory',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_playhistory_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='transcode_started_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
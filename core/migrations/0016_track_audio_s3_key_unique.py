@@ -0,0 +1,84 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:37
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+# (모델, 곡 외 unique 키, 겹칠 때 더할 카운터)
+MERGED = (
+    ("Favorite", ("user_id",), None),
+    ("RecentlyPlayed", ("user_id",), None),
+    ("PlaylistTrack", ("playlist_id",), None),
+    ("TrackPlayCount", ("granularity", "bucket_start"), "plays"),
+    ("UserTrackPlayCount", ("user_id", "month"), "plays"),
+)
+
+
+def _merge_rows(model, keep_id, other_id, keys, counter):
+    """other_id 곡의 행을 keep_id 로 옮긴다. keep_id 에 이미 같은 키가 있으면 카운터만 더하고 버린다."""
+    taken = set(model.objects.filter(track_id=keep_id).values_list(*keys))
+    for row in model.objects.filter(track_id=other_id):
+        key = tuple(getattr(row, k) for k in keys)
+        if key not in taken:
+            model.objects.filter(pk=row.pk).update(track_id=keep_id)
+            taken.add(key)
+        elif counter:
+            model.objects.filter(track_id=keep_id, **dict(zip(keys, key))).update(
+                **{counter: F(counter) + getattr(row, counter)}
+            )
+
+
+def dedupe_audio_keys(apps, schema_editor):
+    """
+    같은 audio_s3_key 의 곡이 여럿이면 가장 먼저 만든 곡만 남긴다.
+    즐겨찾기/최근 재생/플레이리스트/재생 기록/재생 수 집계는 남는 곡으로 합치고,
+    분석·추천·검색 문서 등 다시 만들 수 있는 데이터는 지워지는 곡과 함께 삭제된다.
+    """
+    Track = apps.get_model("core", "Track")
+    Favorite = apps.get_model("core", "Favorite")
+    Playlist = apps.get_model("core", "Playlist")
+    PlaylistTrack = apps.get_model("core", "PlaylistTrack")
+    PlayHistory = apps.get_model("core", "PlayHistory")
+
+    keys = (
+        Track.objects.values("audio_s3_key").annotate(n=Count("pk")).filter(n__gt=1).values_list("audio_s3_key", flat=True)
+    )
+    playlist_ids = set()
+    for key in list(keys):
+        keep, *others = Track.objects.filter(audio_s3_key=key).order_by("created_at", "pk")
+        other_ids = [t.pk for t in others]
+        playlist_ids.update(PlaylistTrack.objects.filter(track_id__in=other_ids).values_list("playlist_id", flat=True))
+        PlayHistory.objects.filter(track_id__in=other_ids).update(track_id=keep.pk)
+        for other_id in other_ids:
+            for name, unique_keys, counter in MERGED:
+                _merge_rows(apps.get_model("core", name), keep.pk, other_id, unique_keys, counter)
+        Track.objects.filter(pk=keep.pk).update(
+            play_count=F("play_count") + sum(t.play_count for t in others),
+            favorite_count=Favorite.objects.filter(track_id=keep.pk).count(),
+        )
+        Track.objects.filter(pk__in=other_ids).delete()
+
+    # 겹쳐서 버린 플레이리스트 항목이 있으면 합계가 달라지므로 다시 계산 (0006 과 같은 방식)
+    items = PlaylistTrack.objects.filter(playlist=OuterRef("pk")).order_by().values("playlist")
+    Playlist.objects.filter(pk__in=playlist_ids).update(
+        track_count=Coalesce(Subquery(items.annotate(n=Count("pk")).values("n"), output_field=IntegerField()), 0),
+        total_duration_sec=Coalesce(
+            Subquery(items.annotate(total=Sum("track__duration_sec")).values("total"), output_field=IntegerField()), 0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_track_transcode_started_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_audio_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='track',
+            name='audio_s3_key',
+            field=models.CharField(help_text='S3 object key (e.g., audio/uuid.mp3)', max_length=255, unique=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -10,6 +11,13 @@ class User(AbstractUser):
     def __str__(self):
         return self.username or f"User#{self.pk}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 시 토큰 claim(is_staff/is_active) 변경 여부를 추가 쿼리 없이 판단하기 위해 로드 시점 값 보관
+        instance._loaded_claims = (instance.__dict__.get("is_staff"), instance.__dict__.get("is_active"))
+        return instance
+
 
 class Track(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -17,21 +25,109 @@ class Track(models.Model):
     artist = models.CharField(max_length=120)
     genre = models.CharField(max_length=80, blank=True)
     thumbnail_url = models.URLField(blank=True)
+    # 곡 일괄 등록(core/ingest.py)은 이 key 기준으로 upsert (INSERT ... ON CONFLICT)
     audio_s3_key = models.CharField(
         max_length=255,
+        unique=True,
         help_text="S3 object key (e.g., audio/uuid.mp3)"
     )
     duration_sec = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=True)
+    # PlayHistory rollup(core/rollups.py)이 갱신하는 누적 재생 수
+    play_count = models.PositiveBigIntegerField(default=0, editable=False)
+    # Favorite 추가/삭제 시 같은 트랜잭션에서 증감 (core/counters.py)
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # HLS 변환 상태 (core/transcode.py). audio_s3_key 가 바뀌면 다시 pending
+    TRANSCODE_PENDING = "pending"
+    TRANSCODE_PROCESSING = "processing"
+    TRANSCODE_READY = "ready"
+    TRANSCODE_FAILED = "failed"
+    TRANSCODE_STATUS_CHOICES = [
+        (TRANSCODE_PENDING, "pending"),
+        (TRANSCODE_PROCESSING, "processing"),
+        (TRANSCODE_READY, "ready"),
+        (TRANSCODE_FAILED, "failed"),
+    ]
+    transcode_status = models.CharField(
+        max_length=12, choices=TRANSCODE_STATUS_CHOICES, default=TRANSCODE_PENDING, editable=False
+    )
+    # processing 으로 바뀐 시각: 워커가 죽어 processing 으로 남은 곡을 찾는 데 사용
+    transcode_started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # 저장소 key (예: hls/<id>/<version>/master.m3u8), 변환 전이면 빈 값
+    hls_manifest_key = models.CharField(max_length=255, blank=True, editable=False)
+    # [{"bitrate": 128, "bandwidth": 140800}, ...]
+    hls_variants = models.JSONField(default=list, blank=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        # 목록 API(KeysetPagination)는 정렬 필드 + pk tie-breaker 로 정렬하므로 pk 까지 포함한 복합 인덱스.
+        # 필터(genre/artist/is_published) + 기본 정렬은 필터 컬럼을 앞에 둔다 (core/management/commands/check_query_plans.py)
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["genre", "created_at", "id"]),
+            models.Index(fields=["artist", "created_at", "id"]),
+            models.Index(fields=["is_published", "created_at", "id"]),
+            models.Index(fields=["title", "id"]),
+            models.Index(fields=["play_count", "id"]),
+            models.Index(fields=["favorite_count", "id"]),
+            models.Index(fields=["transcode_status"]),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.artist}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 시 audio_s3_key 변경 여부를 추가 쿼리 없이 판단하기 위해 로드 시점 값 보관
+        instance._loaded_audio_s3_key = instance.__dict__.get("audio_s3_key")
+        return instance
+
+
+class TrackAnalysis(models.Model):
+    """
+    업로드된 원본 분석 결과 (core/audio.py, HLS 변환과 함께 실행).
+    곡 목록 조회에 파형 blob 이 딸려오지 않도록 Track 과 분리 (GET /api/tracks/{id}/waveform/ 에서만 읽는다).
+    """
+    track = models.OneToOneField(Track, on_delete=models.CASCADE, primary_key=True, related_name="analysis")
+    # 분석한 원본 key: Track.audio_s3_key 와 다르면 이전 원본의 결과
+    source_key = models.CharField(max_length=255)
+    format = models.CharField(max_length=10)
+    duration_ms = models.PositiveIntegerField()
+    bitrate = models.PositiveIntegerField(help_text="kbps")
+    sample_rate = models.PositiveIntegerField()
+    channels = models.PositiveSmallIntegerField()
+    # core.audio.pack_waveform (헤더 5바이트 + WAVEFORM_POINTS 개의 0~255 peak)
+    waveform = models.BinaryField()
+    analyzed_at = models.DateTimeField(auto_now=True)
+
+
+class SimilarTrack(models.Model):
+    """
+    곡별 유사 곡 상위 K 개 (core/similarity.py 가 오프라인으로 계산, `manage.py build_similar_tracks`).
+    (track, rank) unique 인덱스 하나로 GET /api/tracks/{id}/similar/ 를 조회한다 (core/recommendations.py).
+    """
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="+")
+    neighbor = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="similar_to")
+    rank = models.PositiveSmallIntegerField()
+    # cosine 유사도 (0~1)
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ("track", "rank")
+
+
+class TrackSearchDocument(models.Model):
+    """
+    Track 검색용 문서 (core/search.py 참고).
+    SQLite 는 FTS5 가상 테이블(core_track_fts)이 트리거로, MySQL 은 FULLTEXT(ngram) 인덱스가 이 테이블을 색인한다.
+    """
+    track = models.OneToOneField(Track, on_delete=models.CASCADE, related_name="search_document")
+    body = models.TextField(blank=True)
+
 
 class Favorite(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="favorites")
@@ -40,30 +136,75 @@ class Favorite(models.Model):
 
     class Meta:
         unique_together = ("user", "track")
-        indexes = [models.Index(fields=["user", "track"])]
+        # (user, track) 조회는 unique 인덱스로 충분, 목록(-created_at) 정렬용 인덱스만 따로 둔다
+        indexes = [models.Index(fields=["user", "created_at"])]
 
 
 class PlayHistory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="play_histories")
     track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="play_histories")
-    played_at = models.DateTimeField(auto_now_add=True)
+    # write-behind 배치 저장 시에도 실제 재생 시각을 유지하도록 auto_now_add 대신 default 사용
+    played_at = models.DateTimeField(default=timezone.now)
+    # 저장 시각: 집계 watermark 의 settle 판단용 (배치/spool 재생으로 played_at 이 늦게 저장될 수 있음)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-played_at"]
         indexes = [models.Index(fields=["user", "played_at"])]
 
 
+class RecentlyPlayed(models.Model):
+    """
+    사용자별 최근 재생 곡 (곡당 한 행, RECENTLY_PLAYED_LIMIT 개까지만 유지) + 이어듣기 위치.
+    PlayHistory 는 전체 로그, 이 테이블은 화면 표시/이어듣기용 작은 테이블 (core/history.py 참고).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recently_played")
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="+")
+    played_at = models.DateTimeField(default=timezone.now)
+    position_sec = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user", "track")
+        ordering = ["-played_at"]
+        indexes = [models.Index(fields=["user", "-played_at", "-id"])]
+
+
 class Playlist(models.Model):
+    # user: 사용자가 직접 만든 플레이리스트 / 그 밖: 자동 생성(core/smart_playlists.py), API 로는 수정할 수 없다
+    KIND_USER = "user"
+    KIND_MOST_PLAYED = "most_played"
+    KIND_RECENT_FAVORITES = "recent_favorites"
+    KIND_GENRE_MIX = "genre_mix"
+    KIND_CHOICES = [
+        (KIND_USER, "user"),
+        (KIND_MOST_PLAYED, "most played this month"),
+        (KIND_RECENT_FAVORITES, "recently favorited"),
+        (KIND_GENRE_MIX, "genre mix"),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="playlists")
     name = models.CharField(max_length=100)
     is_public = models.BooleanField(default=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_USER, editable=False)
+    # kind=genre_mix 의 Track.genre
+    genre = models.CharField(max_length=80, blank=True, editable=False)
+    # PlaylistTrack 추가/삭제 시 같은 트랜잭션에서 증감 (core/counters.py)
+    track_count = models.PositiveIntegerField(default=0, editable=False)
+    total_duration_sec = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ("user", "name")
+        # 자동 생성 플레이리스트 이름이 사용자가 만든 플레이리스트 이름과 겹쳐도 되도록 kind 포함
+        unique_together = ("user", "kind", "name")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            # 월이 바뀐 뒤 아직 갱신되지 않은 "이번 달 많이 들은 곡" 찾기
+            models.Index(fields=["kind", "updated_at"]),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.user})"
@@ -72,9 +213,74 @@ class Playlist(models.Model):
 class PlaylistTrack(models.Model):
     playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE, related_name="items")
     track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="in_playlists")
-    order = models.PositiveIntegerField(default=0)
+    # 희소 정수 순서 (core/playlist_order.py): 사이 삽입/이동 시 행 하나만 갱신
+    order = models.BigIntegerField(default=0)
     added_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("playlist", "track")
         ordering = ["order", "added_at"]
+        indexes = [models.Index(fields=["playlist", "order", "added_at"])]
+
+
+class Watermark(models.Model):
+    """증분 배치 작업이 어디까지 처리했는지 기록 (예: PlayHistory rollup 의 마지막 id)"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}@{self.last_id}"
+
+
+class TrackPlayCount(models.Model):
+    """곡별 시간/일 단위 재생 수 (PlayHistory rollup)"""
+    HOUR = "h"
+    DAY = "d"
+    GRANULARITY_CHOICES = [(HOUR, "hour"), (DAY, "day")]
+
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="play_counts")
+    granularity = models.CharField(max_length=1, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    plays = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("granularity", "bucket_start", "track")
+
+
+class UserListeningStats(models.Model):
+    """사용자별 누적 청취 통계 (PlayHistory rollup)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="listening_stats")
+    play_count = models.PositiveBigIntegerField(default=0)
+    listened_sec = models.PositiveBigIntegerField(default=0)
+    last_played_at = models.DateTimeField(null=True, blank=True)
+
+
+class UserTrackPlayCount(models.Model):
+    """사용자별 곡 재생 수 (이번 달만 유지, core/smart_playlists.py 가 PlayHistory 에서 증분 집계)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="+")
+    # TIME_ZONE 기준 그 달 1일
+    month = models.DateField()
+    plays = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "month", "track")
+        indexes = [models.Index(fields=["month"])]
+
+
+class RevokedToken(models.Model):
+    """
+    만료 전에 무효화한 JWT (core/auth.py 메모리 denylist 의 원본).
+    - jti 가 있으면 그 토큰 하나 (로그아웃)
+    - jti 가 비어 있으면 user_id 사용자의 revoked_at 이전 발급 토큰 전체 (권한/활성 상태 변경, 탈퇴)
+    expires_at 이 지나면 해당 토큰들은 어차피 만료되므로 `manage.py prune_revoked_tokens` 로 삭제한다.
+    """
+    jti = models.CharField(max_length=64, blank=True)
+    # 사용자 삭제 후에도 남아 있어야 하므로 FK 가 아니다
+    user_id = models.BigIntegerField(null=True, blank=True)
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti or f"user#{self.user_id}<{self.revoked_at:%Y-%m-%d %H:%M:%S}"
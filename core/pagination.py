@@ -0,0 +1,250 @@
+# core/pagination.py
+"""
+Keyset(cursor) 페이지네이션.
+
+PageNumberPagination 은 매 요청마다 COUNT(*) + OFFSET 스캔을 하므로 깊은 페이지일수록 느려진다.
+여기서는 정렬 키 값(+ pk tie-breaker)을 불투명한 cursor 로 넘겨
+`WHERE (created_at, id) < (:v, :id) ORDER BY created_at DESC, id DESC LIMIT n` 형태로 조회한다.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    page_size = getattr(settings, "REST_FRAMEWORK", {}).get("PAGE_SIZE", 20)
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    # 기본 정렬 (view.ordering / ?ordering= 이 없을 때)
+    ordering = ("-created_at",)
+    # ?approx_total=1 일 때만 X-Approximate-Total 헤더 제공 (상한까지만 센다)
+    approx_total_query_param = "approx_total"
+    approx_total_cap = 10000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_qs, cursor = self._prepare(queryset, request, view)
+        if self._wants_approx_total(request):
+            self.approx_total = self.get_approx_total(queryset)
+        return self._set_page(list(page_qs), cursor)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset 의 async 버전 (core/async_views.py, async ORM 으로 조회)."""
+        page_qs, cursor = self._prepare(queryset, request, view)
+        if self._wants_approx_total(request):
+            count = await queryset.order_by()[: self.approx_total_cap + 1].acount()
+            self.approx_total = self._approx_total_label(count)
+        return self._set_page([row async for row in page_qs], cursor)
+
+    def _prepare(self, queryset, request, view):
+        """이번 페이지(+1행)를 가져올 queryset 과 decode 한 cursor."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.approx_total = None
+
+        cursor = self.decode_cursor(request)
+        if cursor:
+            cursor["v"] = self._cursor_values(queryset, cursor["v"])
+        reverse = bool(cursor and cursor.get("r"))
+        order = [self._flip(f) for f in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*order)
+        if cursor:
+            queryset = queryset.filter(self._after(order, cursor["v"]))
+        return queryset[: self.page_size + 1], cursor
+
+    def _set_page(self, rows, cursor):
+        reverse = bool(cursor and cursor.get("r"))
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        response = Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+        if self.approx_total is not None:
+            response["X-Approximate-Total"] = self.approx_total
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # ---------------------------------------------------------------
+    # ordering
+    # ---------------------------------------------------------------
+    def get_ordering(self, request, queryset, view):
+        """OrderingFilter(?ordering=) 결과를 따르고, 마지막에 pk tie-breaker 를 붙인다."""
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, "ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = list(ordering)
+        if not any(f.lstrip("-") in ("pk", "id") for f in ordering):
+            ordering.append("-pk" if ordering[-1].startswith("-") else "pk")
+        return tuple(ordering)
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(order, values):
+        """(f1, f2, ...) 가 cursor 값보다 '뒤'에 있는 행 조건 (정렬 방향별 lt/gt)."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(order, values):
+            name = field.lstrip("-")
+            op = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{op}": value})
+            equal &= Q(**{name: value})
+        # 첫 정렬 키에 대한 범위 조건을 중복으로 붙여 DB 가 인덱스 range seek 를 쓰도록 한다
+        first = order[0]
+        op = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{op}": values[0]}) & condition
+
+    def _cursor_values(self, queryset, values):
+        """cursor 값을 정렬 필드 타입으로 변환 (변조된 값이 쿼리 실행 중 500 이 되지 않도록)."""
+        converted = []
+        for field, value in zip(self.ordering, values):
+            if isinstance(value, (dict, list)):
+                raise NotFound(self.invalid_cursor_message)
+            model_field = self._sort_field(queryset, field.lstrip("-"))
+            if model_field is not None and value is not None:
+                try:
+                    value = model_field.to_python(value)
+                except (ValidationError, TypeError, ValueError):
+                    raise NotFound(self.invalid_cursor_message)
+            converted.append(value)
+        return converted
+
+    @staticmethod
+    def _sort_field(queryset, path):
+        """정렬 키의 필드: annotate 값(search_rank 등)은 output_field, 'track__created_at' 같은 경로는 모델 필드."""
+        if path in queryset.query.annotations:
+            return queryset.query.annotations[path].output_field
+        model, field = queryset.model, None
+        for name in path.split("__"):
+            if model is None:
+                return None
+            try:
+                field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        return field
+
+    def _position(self, obj):
+        values = []
+        for field in self.ordering:
+            value = obj
+            for attr in field.lstrip("-").split("__"):
+                value = getattr(value, attr)
+            values.append(_encode_value(value))
+        return values
+
+    # ---------------------------------------------------------------
+    # cursor
+    # ---------------------------------------------------------------
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            values = cursor["v"]
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # 정렬 조건이 바뀐 cursor 는 사용할 수 없다
+        if cursor.get("o") != list(self.ordering) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, obj, reverse=False):
+        cursor = {"v": self._position(obj), "o": list(self.ordering)}
+        if reverse:
+            cursor["r"] = 1
+        raw = json.dumps(cursor, separators=(",", ":")).encode("utf-8")
+        encoded = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # ---------------------------------------------------------------
+    # helpers
+    # ---------------------------------------------------------------
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def _wants_approx_total(self, request):
+        value = request.query_params.get(self.approx_total_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    def get_approx_total(self, queryset):
+        """상한(approx_total_cap)까지만 세는 COUNT. 넘으면 '10000+' 형태로 반환."""
+        return self._approx_total_label(queryset.order_by()[: self.approx_total_cap + 1].count())
+
+    def _approx_total_label(self, count):
+        if count > self.approx_total_cap:
+            return f"{self.approx_total_cap}+"
+        return str(count)
@@ -11,8 +11,9 @@ class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
-        owner = getattr(obj, "user", None)
-        return owner == request.user or (request.user and request.user.is_staff)
+        # obj.user 를 로드하지 않고 id 로 비교 (request.user 가 ClaimsUser 여도 동일하게 동작)
+        owner_id = getattr(obj, "user_id", None)
+        return (owner_id is not None and owner_id == request.user.pk) or (request.user and request.user.is_staff)
 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
@@ -26,5 +27,6 @@ class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
-        owner = getattr(obj, "user", None)
-        return owner == request.user or (request.user and request.user.is_staff)
+        # obj.user 를 로드하지 않고 id 로 비교 (request.user 가 ClaimsUser 여도 동일하게 동작)
+        owner_id = getattr(obj, "user_id", None)
+        return (owner_id is not None and owner_id == request.user.pk) or (request.user and request.user.is_staff)
@@ -0,0 +1,481 @@
+# core/playevents.py
+"""
+재생 이벤트(write-behind) 파이프라인.
+
+stream 요청마다 PlayHistory INSERT 를 하는 대신, 이벤트를 프로세스 내 큐에 넣고
+백그라운드 flusher 가 크기/시간 단위 배치로 bulk_create 한다.
+
+- PLAY_EVENTS_MODE=sync  : 요청 안에서 즉시 저장 (테스트/개발 기본값)
+- PLAY_EVENTS_MODE=async : 큐 + 백그라운드 flush
+- PLAY_EVENTS_SPOOL_PATH : 지정 시 append-only 파일에 먼저 기록해 프로세스 비정상 종료 시 재처리.
+                           워커 프로세스마다 `<path>.<pid>` 파일을 따로 쓰고, 기동 시 종료된 프로세스의 파일을 재처리 후 삭제
+"""
+import atexit
+import fcntl
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .events import publish_plays
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PlayEvent:
+    user_id: int
+    track_id: uuid.UUID
+    played_at: datetime = field(default_factory=timezone.now)
+    seq: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "seq": self.seq,
+            "user_id": self.user_id,
+            "track_id": str(self.track_id),
+            "played_at": self.played_at.isoformat(),
+        })
+
+    @classmethod
+    def from_json(cls, line: str) -> "PlayEvent":
+        data = json.loads(line)
+        return cls(
+            user_id=data["user_id"],
+            track_id=uuid.UUID(data["track_id"]),
+            played_at=datetime.fromisoformat(data["played_at"]),
+            seq=data["seq"],
+        )
+
+
+def write_play_events(events):
+    """이벤트 묶음을 PlayHistory 로 저장하고 최근 재생 목록을 갱신. 저장된 행 수를 반환."""
+    from .history import update_recently_played
+    from .models import PlayHistory
+
+    if not events:
+        return 0
+    rows = [
+        PlayHistory(user_id=e.user_id, track_id=e.track_id, played_at=e.played_at)
+        for e in events
+    ]
+
+    def save(rows):
+        # 재시도 시 PlayHistory 가 중복 저장되지 않도록 최근 재생 목록 갱신까지 한 트랜잭션으로
+        with transaction.atomic():
+            PlayHistory.objects.bulk_create(rows)
+            update_recently_played(rows)
+
+    try:
+        save(rows)
+    except IntegrityError:
+        # 큐에 있는 동안 곡/사용자가 삭제된 경우: 유효한 이벤트만 다시 저장
+        # (SQLite 는 FK 검사가 커밋 시점이므로 트랜잭션 전체를 다시 수행)
+        rows = _drop_orphans([PlayHistory(user_id=r.user_id, track_id=r.track_id, played_at=r.played_at) for r in rows])
+        save(rows)
+    return len(rows)
+
+
+def _drop_orphans(rows):
+    from .models import Track, User
+
+    track_ids = set(
+        Track.objects.filter(pk__in={r.track_id for r in rows}).values_list("pk", flat=True)
+    )
+    user_ids = set(
+        User.objects.filter(pk__in={r.user_id for r in rows}).values_list("pk", flat=True)
+    )
+    kept = [r for r in rows if r.track_id in track_ids and r.user_id in user_ids]
+    if len(kept) != len(rows):
+        logger.warning("play events: dropped %d orphan events", len(rows) - len(kept))
+    return kept
+
+
+# -------------------------------------------------------------------
+# Spool (내구성 보장용 로그)
+# -------------------------------------------------------------------
+class NullSpool:
+    """기록하지 않는 기본 spool."""
+
+    def next_seq(self) -> int:
+        return 0
+
+    def append(self, event: PlayEvent):
+        pass
+
+    def commit(self, seq: int):
+        pass
+
+    def replay(self):
+        return []
+
+    def orphans(self):
+        return []
+
+
+class FileSpool(NullSpool):
+    """
+    append-only JSON lines 파일 + checkpoint 파일. 한 파일은 한 프로세스만 쓴다.
+    - append: 큐에 넣은 이벤트를 한 줄씩 기록
+    - commit: DB 저장이 끝난 마지막 seq 를 checkpoint 에 기록, 밀린 것이 없으면 파일을 비움
+    - replay: checkpoint 이후의 이벤트를 돌려준다 (재시작 시)
+    - orphans: 같은 base 경로를 쓰던 프로세스 중 종료된 것들의 spool (기동 시 재처리 후 remove)
+
+    파일은 여는 동안 flock(LOCK_EX) 으로 잠가 둔다. 잠금은 프로세스가 죽으면 풀리므로
+    잠글 수 있는 다른 프로세스의 spool 은 고아이고, 잠글 수 없으면 아직 쓰는 중이다.
+    """
+
+    def __init__(self, path, fsync: bool = False, base_path=None):
+        self.path = str(path)
+        self.base_path = str(base_path or path)
+        self.checkpoint_path = f"{self.path}.ckpt"
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._fh = open(self.path, "a", encoding="utf-8")
+        try:
+            # 다른 프로세스가 쓰는 중이면 BlockingIOError
+            fcntl.flock(self._fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._fh.close()
+            raise
+        self._committed = self._read_checkpoint()
+        self._seq = max(self._committed, self._last_seq_in_file())
+        self._appended = self._seq
+
+    @classmethod
+    def for_process(cls, base_path, fsync: bool = False) -> "FileSpool":
+        """이 프로세스 전용 spool (`<base_path>.<pid>`)."""
+        return cls(f"{base_path}.{os.getpid()}", fsync=fsync, base_path=base_path)
+
+    def _read_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _last_seq_in_file(self) -> int:
+        last = 0
+        for event in self._iter_file():
+            last = max(last, event.seq)
+        return last
+
+    def _iter_file(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield PlayEvent.from_json(line)
+                    except (ValueError, KeyError):
+                        # 비정상 종료로 잘린 마지막 줄 등은 건너뛴다
+                        logger.warning("play events: skipped corrupt spool line")
+        except FileNotFoundError:
+            return
+
+    def next_seq(self) -> int:
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def append(self, event: PlayEvent):
+        with self._lock:
+            self._fh.write(event.to_json() + "\n")
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            self._appended = max(self._appended, event.seq)
+
+    def commit(self, seq: int):
+        with self._lock:
+            if seq <= self._committed:
+                return
+            self._committed = seq
+            tmp = f"{self.checkpoint_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(str(seq))
+            os.replace(tmp, self.checkpoint_path)
+            if self._committed >= self._appended:
+                # 모두 반영됨: 로그를 비워 파일이 무한히 커지지 않게 한다
+                self._fh.truncate(0)
+                self._fh.seek(0)
+
+    def replay(self):
+        return [e for e in self._iter_file() if e.seq > self._committed]
+
+    def orphans(self):
+        """잠글 수 있는(=쓰던 프로세스가 종료된) 다른 spool. 이전 버전의 pid 없는 base_path 파일도 포함."""
+        directory, base = os.path.split(os.path.abspath(self.base_path))
+        pattern = re.compile(rf"{re.escape(base)}(\.\d+)?")
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(directory, name)
+            if not pattern.fullmatch(name) or os.path.abspath(path) == os.path.abspath(self.path):
+                continue
+            try:
+                yield FileSpool(path, base_path=self.base_path)
+            except BlockingIOError:
+                # 살아 있는 워커가 쓰는 중
+                continue
+
+    def remove(self):
+        """재처리가 끝난 spool 파일과 checkpoint 를 삭제 (잠금을 쥔 채로 지워 다른 프로세스가 다시 집지 않도록)."""
+        with self._lock:
+            for path in (self.path, self.checkpoint_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._fh.close()
+
+
+# -------------------------------------------------------------------
+# Pipeline
+# -------------------------------------------------------------------
+class PlayEventPipeline:
+    def __init__(
+        self,
+        mode: str = "sync",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        enqueue_timeout: float = 0.05,
+        spool=None,
+        rollup_on_flush: bool = False,
+        max_retries: int = 8,
+        dead_letter_path: str = "",
+    ):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.spool = spool or NullSpool()
+        self.rollup_on_flush = rollup_on_flush
+        # flush 가 max_retries 번 연속 실패한 배치는 dead_letter_path 로 옮기고 다음 배치로 넘어간다
+        self.max_retries = max(max_retries, 1)
+        self.dead_letter_path = dead_letter_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        # spool 에 기록했지만 아직 DB 에 저장되지 않은 seq (큐 순서가 seq 순서와 다를 수 있으므로 따로 추적)
+        self._inflight = set()
+        self._last_seq = 0
+        self.overflowed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_async(self) -> bool:
+        return self.mode == "async"
+
+    def start(self):
+        if not self.is_async or self._thread is not None:
+            return
+        # 이전 프로세스가 남긴 미반영 이벤트 먼저 저장 (같은 pid 로 재기동한 경우 + 종료된 다른 워커의 spool)
+        pending = self.spool.replay()
+        if pending:
+            write_play_events(pending)
+            self.spool.commit(max(e.seq for e in pending))
+            logger.info("play events: replayed %d spooled events", len(pending))
+        for orphan in self.spool.orphans():
+            pending = orphan.replay()
+            if pending:
+                write_play_events(pending)
+                logger.info("play events: replayed %d events from %s", len(pending), orphan.path)
+            orphan.remove()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="play-event-flusher", daemon=True)
+        self._thread.start()
+
+    def record(self, user_id, track_id, played_at=None):
+        event = PlayEvent(user_id=user_id, track_id=track_id, played_at=played_at or timezone.now())
+        if not self.is_async:
+            write_play_events([event])
+            return event
+        # seq 발급과 spool 기록만 잠금 안에서 (spool 파일이 seq 순서가 되도록), 기다릴 수 있는 put 은 밖에서
+        with self._lock:
+            event.seq = self.spool.next_seq()
+            self.spool.append(event)
+            if event.seq:
+                self._inflight.add(event.seq)
+                self._last_seq = event.seq
+        try:
+            # 큐가 가득 차면 enqueue_timeout 만큼 기다렸다가(backpressure) 동기 저장으로 전환
+            self._queue.put(event, timeout=self.enqueue_timeout)
+            return event
+        except queue.Full:
+            pass
+        logger.warning("play events: queue full, writing synchronously")
+        self.overflowed += 1
+        write_play_events([event])
+        self._commit([event])
+        return event
+
+    def _commit(self, events):
+        """
+        저장이 끝난 이벤트를 spool checkpoint 에 반영.
+        아직 저장되지 않은 가장 작은 seq 바로 앞까지만 commit 한다 (재시작 시 큐에 남아 있던 이벤트를 잃지 않도록).
+        """
+        with self._lock:
+            self._inflight.difference_update(e.seq for e in events)
+            safe = min(self._inflight) - 1 if self._inflight else self._last_seq
+        if safe:
+            self.spool.commit(safe)
+
+    def record_many(self, user_id, track_ids, played_at=None):
+        """한 사용자의 여러 재생을 기록. sync 모드에서는 INSERT 한 번으로 저장."""
+        played_at = played_at or timezone.now()
+        if not self.is_async:
+            events = [PlayEvent(user_id=user_id, track_id=t, played_at=played_at) for t in track_ids]
+            write_play_events(events)
+            return events
+        return [self.record(user_id, t, played_at) for t in track_ids]
+
+    def _drain(self):
+        """배치 하나를 모은다. batch_size 에 도달하거나 flush_interval 이 지나면 반환."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and batch:
+                break
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0.01)))
+            except queue.Empty:
+                if batch or self._stop.is_set():
+                    break
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _write(self, batch):
+        delay = 0.5
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    close_old_connections()
+                    write_play_events(batch)
+                    break
+                except Exception:
+                    if self._stop.is_set():
+                        # 종료 중에는 spool 에 남겨두고 다음 기동 시 재처리
+                        logger.exception("play events: flush failed during shutdown, leaving %d events in spool", len(batch))
+                        return
+                    if attempt == self.max_retries:
+                        logger.exception("play events: flush failed %d times, quarantining %d events", attempt, len(batch))
+                        self._dead_letter(batch)
+                        break
+                    logger.exception("play events: flush failed, retrying in %.1fs", delay)
+                    time.sleep(delay)
+                    delay = min(delay * 2, 30)
+            # 저장했거나 dead letter 로 옮긴 배치: spool 에서 다시 재처리하지 않는다
+            self._commit(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+        if self.rollup_on_flush:
+            self._rollup()
+
+    def _dead_letter(self, batch):
+        """재시도를 다 쓴 배치를 dead letter 파일(JSON lines, spool 과 같은 형식)에 남긴다. 경로가 없거나 쓰기 실패 시 로그로."""
+        lines = "".join(e.to_json() + "\n" for e in batch)
+        if self.dead_letter_path:
+            try:
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                return
+            except OSError:
+                logger.exception("play events: could not write dead letter file %s", self.dead_letter_path)
+        logger.error("play events: dropped batch\n%s", lines)
+
+    def _rollup(self):
+        from .rollups import rollup_plays
+
+        try:
+            rollup_plays()
+        except Exception:
+            # 집계 실패는 재생 기록 저장에 영향을 주지 않는다 (다음 flush / rollup_plays 명령에서 이어서 처리)
+            logger.exception("play events: rollup failed")
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._drain()
+            if batch:
+                self._write(batch)
+        close_old_connections()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """큐가 빌 때까지 대기. 시간 안에 비웠으면 True."""
+        if not self.is_async or self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout: float = 10.0):
+        """남은 이벤트를 모두 저장하고 flusher 종료 (atexit 에서 호출)."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "queued": self._queue.qsize(), "overflowed": self.overflowed}
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> PlayEventPipeline:
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                spool_path = getattr(settings, "PLAY_EVENTS_SPOOL_PATH", "")
+                pipeline = PlayEventPipeline(
+                    mode=getattr(settings, "PLAY_EVENTS_MODE", "sync"),
+                    batch_size=getattr(settings, "PLAY_EVENTS_BATCH_SIZE", 500),
+                    flush_interval=getattr(settings, "PLAY_EVENTS_FLUSH_INTERVAL", 1.0),
+                    max_queue=getattr(settings, "PLAY_EVENTS_MAX_QUEUE", 10000),
+                    enqueue_timeout=getattr(settings, "PLAY_EVENTS_ENQUEUE_TIMEOUT", 0.05),
+                    spool=FileSpool.for_process(spool_path) if spool_path else None,
+                    rollup_on_flush=getattr(settings, "PLAY_ROLLUP_ON_FLUSH", False),
+                    max_retries=getattr(settings, "PLAY_EVENTS_MAX_RETRIES", 8),
+                    dead_letter_path=getattr(settings, "PLAY_EVENTS_DEAD_LETTER_PATH", ""),
+                )
+                pipeline.start()
+                atexit.register(pipeline.shutdown)
+                _pipeline = pipeline
+    return _pipeline
+
+
+def record_play(user_id, track_id, played_at=None) -> PlayEvent:
+    """stream 등에서 재생 1회를 기록하고 실시간 구독자(core/events.py)에게 알린다."""
+    event = get_pipeline().record(user_id, track_id, played_at)
+    publish_plays([event])
+    return event
+
+
+def record_plays(user_id, track_ids, played_at=None):
+    """stream_batch 등에서 여러 곡의 재생을 한 번에 기록한다."""
+    events = get_pipeline().record_many(user_id, track_ids, played_at)
+    publish_plays(events)
+    return events
@@ -0,0 +1,149 @@
+# core/playlist_order.py
+"""
+플레이리스트 곡 순서 (PlaylistTrack.order).
+
+order 는 GAP 간격의 희소 정수다.
+- 맨 뒤/맨 앞 추가: 마지막(첫) 값 ± GAP
+- 두 곡 사이 삽입/이동: 양옆 값의 중간 → 행 하나만 쓴다
+- 간격이 다 떨어졌을 때만 해당 플레이리스트 전체를 GAP 간격으로 다시 매긴다 (rebalance, 드물게 O(n))
+
+모든 변경은 플레이리스트 행을 잠근 트랜잭션 안에서 수행하므로 같은 플레이리스트에 대한
+동시 추가/이동이 같은 위치를 계산하거나 카운터(core/counters.py)가 어긋나지 않는다.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from .counters import adjust_playlist_totals
+from .models import Playlist, PlaylistTrack, Track
+
+GAP = 1 << 20
+MAX_BATCH = 500
+
+
+class PlaylistOrderError(ValueError):
+    """잘못된 기준 곡(after/before) 등 요청 오류."""
+
+
+def _lock(playlist_id):
+    list(Playlist.objects.select_for_update().filter(pk=playlist_id).values_list("pk", flat=True))
+
+
+def _items(playlist_id):
+    return PlaylistTrack.objects.filter(playlist_id=playlist_id)
+
+
+def _order_of(playlist_id, track_id):
+    order = _items(playlist_id).filter(track_id=track_id).values_list("order", flat=True).first()
+    if order is None:
+        raise PlaylistOrderError(f"플레이리스트에 없는 곡: {track_id}")
+    return order
+
+
+def _bounds(playlist_id, after=None, before=None, exclude=None):
+    """새 위치 양옆의 order 값 (lo, hi). None 은 그쪽 끝."""
+    qs = _items(playlist_id)
+    if exclude is not None:
+        qs = qs.exclude(track_id=exclude)
+    if after is not None:
+        lo = _order_of(playlist_id, after)
+        hi = qs.filter(order__gt=lo).order_by("order").values_list("order", flat=True).first()
+    elif before is not None:
+        hi = _order_of(playlist_id, before)
+        lo = qs.filter(order__lt=hi).order_by("-order").values_list("order", flat=True).first()
+    else:
+        lo, hi = qs.aggregate(last=Max("order"))["last"], None
+    return lo, hi
+
+
+def _spread(lo, hi, count):
+    """lo 와 hi 사이에 count 개의 위치. 간격이 모자라면 None."""
+    if lo is None and hi is None:
+        return [GAP * (i + 1) for i in range(count)]
+    if hi is None:
+        return [lo + GAP * (i + 1) for i in range(count)]
+    if lo is None:
+        return [hi - GAP * (count - i) for i in range(count)]
+    step = (hi - lo) // (count + 1)
+    if step < 1:
+        return None
+    return [lo + step * (i + 1) for i in range(count)]
+
+
+def rebalance(playlist_id) -> int:
+    """현재 순서를 유지한 채 order 를 GAP 간격으로 다시 매긴다. 갱신한 행 수를 반환."""
+    items = list(_items(playlist_id).order_by("order", "added_at", "id").only("id", "order"))
+    for i, item in enumerate(items):
+        item.order = GAP * (i + 1)
+    PlaylistTrack.objects.bulk_update(items, ["order"], batch_size=1000)
+    return len(items)
+
+
+def positions(playlist_id, count, after=None, before=None, exclude=None):
+    """after/before 기준 위치(둘 다 없으면 맨 뒤)에 들어갈 order 값 count 개."""
+    if after is not None and before is not None:
+        raise PlaylistOrderError("after 와 before 는 함께 쓸 수 없습니다.")
+    lo, hi = _bounds(playlist_id, after, before, exclude)
+    spots = _spread(lo, hi, count)
+    if spots is None:
+        rebalance(playlist_id)
+        lo, hi = _bounds(playlist_id, after, before, exclude)
+        spots = _spread(lo, hi, count)
+    return spots
+
+
+def add_tracks(playlist_id, track_ids, after=None, before=None):
+    """
+    여러 곡을 after/before 위치(기본: 맨 뒤)에 요청 순서대로 추가.
+    이미 있는 곡은 건너뛰고, 없는 곡이 하나라도 있으면 아무것도 추가하지 않는다.
+    반환: (추가한 id 목록, 이미 있던 id 목록)
+    """
+    wanted = list(dict.fromkeys(track_ids))
+    if len(wanted) > MAX_BATCH:
+        raise PlaylistOrderError(f"한 번에 최대 {MAX_BATCH}곡까지 추가할 수 있습니다.")
+    with transaction.atomic():
+        _lock(playlist_id)
+        existing = set(_items(playlist_id).filter(track_id__in=wanted).values_list("track_id", flat=True))
+        new = [t for t in wanted if t not in existing]
+        durations = dict(Track.objects.filter(pk__in=new).values_list("pk", "duration_sec"))
+        missing = [t for t in new if t not in durations]
+        if missing:
+            raise PlaylistOrderError(f"존재하지 않는 곡: {', '.join(str(t) for t in missing)}")
+        if new:
+            spots = positions(playlist_id, len(new), after, before)
+            PlaylistTrack.objects.bulk_create(
+                [PlaylistTrack(playlist_id=playlist_id, track_id=t, order=o) for t, o in zip(new, spots)]
+            )
+            adjust_playlist_totals(playlist_id, len(new), sum(durations[t] for t in new))
+    return new, [t for t in wanted if t in existing]
+
+
+def remove_tracks(playlist_id, track_ids):
+    """여러 곡 제거. 실제로 제거한 id 목록을 반환."""
+    with transaction.atomic():
+        _lock(playlist_id)
+        rows = list(
+            _items(playlist_id).filter(track_id__in=set(track_ids))
+            .values_list("pk", "track_id", "track__duration_sec")
+        )
+        if rows:
+            PlaylistTrack.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+            adjust_playlist_totals(playlist_id, -len(rows), -sum(d for _, _, d in rows))
+    return [track_id for _, track_id, _ in rows]
+
+
+def move_tracks(playlist_id, moves):
+    """
+    moves: [{"track_id": ..., "after": ... | None, "before": ... | None}, ...] 를 순서대로 적용.
+    이동마다 행 하나만 갱신한다 (간격이 다 떨어진 경우에만 rebalance).
+    """
+    if len(moves) > MAX_BATCH:
+        raise PlaylistOrderError(f"한 번에 최대 {MAX_BATCH}개까지 이동할 수 있습니다.")
+    with transaction.atomic():
+        _lock(playlist_id)
+        for move in moves:
+            track_id, after, before = move["track_id"], move.get("after"), move.get("before")
+            if track_id in (after, before):
+                raise PlaylistOrderError(f"track {track_id} 를 자기 자신 기준으로 이동할 수 없습니다.")
+            _order_of(playlist_id, track_id)
+            [spot] = positions(playlist_id, 1, after, before, exclude=track_id)
+            _items(playlist_id).filter(track_id=track_id).update(order=spot)
@@ -0,0 +1,44 @@
+# core/recommendations.py
+"""
+유사 곡 / 개인 추천 조회 (온라인 단계).
+
+곡마다 미리 계산한 상위 K 개 유사 곡(SimilarTrack, core/similarity.py 의 `manage.py build_similar_tracks`)만 읽는다.
+- similar_tracks(): (track, rank) 인덱스 조회 한 번 + 최근 재생한 곡 제외 (RecentlyPlayed 의 (user, track) unique 인덱스)
+- recommended_track_ids(): 사용자의 최근 재생 곡 + 즐겨찾기 곡을 seed 로 이웃 점수를 합산 (쿼리 한 번)
+  seed 가 없거나 이웃이 없으면(신규 사용자) 빈 목록이므로 호출하는 쪽에서 트렌딩으로 대체
+
+NumPy/SciPy 는 오프라인 계산에서만 필요하므로 이 모듈은 import 하지 않는다.
+"""
+from django.db.models import Exists, F, OuterRef, Q, Sum
+
+from .models import Favorite, RecentlyPlayed, SimilarTrack, Track
+
+# core/similarity.py 가 재생 수 행렬에 반영한 마지막 PlayHistory id (compact_history 는 이 이하만 삭제)
+SIMILARITY_WATERMARK = "similarity"
+
+
+def similar_tracks(track_id, user_id=None, limit: int = 20):
+    """track_id 와 비슷한 공개 곡 (유사도 순, 각 Track 에 similarity 속성). user_id 가 있으면 최근 재생한 곡 제외."""
+    qs = (
+        Track.objects.filter(similar_to__track_id=track_id, is_published=True)
+        .annotate(similarity=F("similar_to__score"))
+        .order_by("similar_to__rank")
+    )
+    if user_id is not None:
+        qs = qs.filter(~Exists(RecentlyPlayed.objects.filter(user_id=user_id, track_id=OuterRef("pk"))))
+    return list(qs[:limit])
+
+
+def recommended_track_ids(user_id, limit: int = 20):
+    """[(track_id, score), ...]: 최근 재생/즐겨찾기 곡의 이웃 중 아직 듣지 않은 공개 곡."""
+    recent = RecentlyPlayed.objects.filter(user_id=user_id).values("track_id")
+    favorites = Favorite.objects.filter(user_id=user_id).values("track_id")
+    return list(
+        SimilarTrack.objects.filter(Q(track_id__in=recent) | Q(track_id__in=favorites), neighbor__is_published=True)
+        .exclude(neighbor_id__in=recent)
+        .exclude(neighbor_id__in=favorites)
+        .values("neighbor_id")
+        .annotate(score=Sum("score"))
+        .order_by("-score", "neighbor_id")
+        .values_list("neighbor_id", "score")[:limit]
+    )
@@ -0,0 +1,166 @@
+# core/rollups.py
+"""
+PlayHistory 증분 집계.
+
+PlayHistory 를 id 순으로 watermark 이후만 읽어 다음 테이블에 누적한다.
+- TrackPlayCount : 곡별 시간(h)/일(d) 단위 재생 수 → 인기/트렌딩
+- Track.play_count : 곡별 누적 재생 수 → ?ordering=-play_count
+- UserListeningStats : 사용자별 누적 재생 수/청취 시간
+
+watermark 행을 잠근 트랜잭션 안에서 처리하므로 여러 프로세스가 동시에 돌려도 중복 집계되지 않는다.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import PlayHistory, Track, TrackPlayCount, UserListeningStats, Watermark
+
+PLAY_ROLLUP_WATERMARK = "play_rollup"
+TRENDING_WINDOWS = {
+    "24h": (TrackPlayCount.HOUR, timedelta(hours=24)),
+    "7d": (TrackPlayCount.DAY, timedelta(days=7)),
+}
+
+
+def hour_bucket(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(dt):
+    """TIME_ZONE 기준 자정."""
+    local = timezone.localtime(dt)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_plays(batch_size: int = 5000, settle_seconds: int | None = None, max_batches: int | None = None) -> int:
+    """
+    watermark 이후 PlayHistory 를 batch_size 씩 집계. 처리한 행 수를 반환.
+    settle_seconds: 막 저장된 행(아직 커밋 안 된 더 작은 id 가 있을 수 있음)은 다음 실행으로 미룬다.
+    재생 시각(played_at)이 아니라 저장 시각(created_at)으로 판단한다: write-behind 배치/spool 재생은
+    오래전 played_at 을 큰 id 로 늦게 저장하므로 played_at 으로는 그 앞의 미커밋 행을 놓칠 수 있다.
+    """
+    if settle_seconds is None:
+        settle_seconds = getattr(settings, "PLAY_ROLLUP_SETTLE_SECONDS", 5)
+    processed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+        with transaction.atomic():
+            mark, _ = Watermark.objects.get_or_create(name=PLAY_ROLLUP_WATERMARK)
+            mark = Watermark.objects.select_for_update().get(pk=mark.pk)
+            rows = list(
+                PlayHistory.objects.filter(id__gt=mark.last_id)
+                .order_by("id")
+                .values_list("id", "user_id", "track_id", "played_at", "track__duration_sec", "created_at")[:batch_size]
+            )
+            # 최근 저장된 행을 만나면 거기서 멈춘다 (watermark 가 그 앞의 미커밋 행을 건너뛰지 않도록)
+            for i, row in enumerate(rows):
+                if row[5] >= cutoff:
+                    rows = rows[:i]
+                    break
+            rows = [row[:5] for row in rows]
+            if not rows:
+                break
+            apply_rollup(rows)
+            mark.last_id = rows[-1][0]
+            mark.save(update_fields=["last_id", "updated_at"])
+        processed += len(rows)
+        batches += 1
+    return processed
+
+
+def apply_rollup(rows):
+    """rows: (id, user_id, track_id, played_at, duration_sec) 목록을 집계 테이블에 더한다."""
+    buckets = Counter()
+    per_track = Counter()
+    per_user = defaultdict(lambda: [0, 0, None])
+    for _, user_id, track_id, played_at, duration in rows:
+        buckets[(TrackPlayCount.HOUR, hour_bucket(played_at), track_id)] += 1
+        buckets[(TrackPlayCount.DAY, day_bucket(played_at), track_id)] += 1
+        per_track[track_id] += 1
+        stats = per_user[user_id]
+        stats[0] += 1
+        stats[1] += duration or 0
+        stats[2] = played_at if stats[2] is None else max(stats[2], played_at)
+
+    _add_bucket_counts(buckets)
+    _add_track_play_counts(per_track)
+    _add_user_stats(per_user)
+
+
+def _add_bucket_counts(buckets):
+    existing = {}
+    for granularity in (TrackPlayCount.HOUR, TrackPlayCount.DAY):
+        keys = [k for k in buckets if k[0] == granularity]
+        if not keys:
+            continue
+        qs = TrackPlayCount.objects.filter(
+            granularity=granularity,
+            bucket_start__in={k[1] for k in keys},
+            track_id__in={k[2] for k in keys},
+        )
+        for obj in qs:
+            existing[(obj.granularity, obj.bucket_start, obj.track_id)] = obj
+
+    to_update, to_create = [], []
+    for key, plays in buckets.items():
+        obj = existing.get(key)
+        if obj is None:
+            to_create.append(TrackPlayCount(granularity=key[0], bucket_start=key[1], track_id=key[2], plays=plays))
+        else:
+            obj.plays += plays
+            to_update.append(obj)
+    TrackPlayCount.objects.bulk_create(to_create, batch_size=1000)
+    TrackPlayCount.objects.bulk_update(to_update, ["plays"], batch_size=1000)
+
+
+def _add_track_play_counts(per_track):
+    # 곡별 증가분을 묶음당 UPDATE 한 번으로 반영 (updated_at 은 건드리지 않는다)
+    items = list(per_track.items())
+    for i in range(0, len(items), 500):
+        chunk = items[i:i + 500]
+        Track.objects.filter(pk__in=[pk for pk, _ in chunk]).update(
+            play_count=F("play_count") + Case(
+                *[When(pk=pk, then=Value(n)) for pk, n in chunk],
+                default=Value(0),
+            )
+        )
+
+
+def _add_user_stats(per_user):
+    existing = {s.user_id: s for s in UserListeningStats.objects.filter(user_id__in=per_user.keys())}
+    to_update, to_create = [], []
+    for user_id, (plays, seconds, last_played) in per_user.items():
+        stats = existing.get(user_id)
+        if stats is None:
+            to_create.append(UserListeningStats(
+                user_id=user_id, play_count=plays, listened_sec=seconds, last_played_at=last_played,
+            ))
+            continue
+        stats.play_count += plays
+        stats.listened_sec += seconds
+        if stats.last_played_at is None or last_played > stats.last_played_at:
+            stats.last_played_at = last_played
+        to_update.append(stats)
+    UserListeningStats.objects.bulk_create(to_create, batch_size=1000)
+    UserListeningStats.objects.bulk_update(
+        to_update, ["play_count", "listened_sec", "last_played_at"], batch_size=1000
+    )
+
+
+def trending_track_ids(window: str = "24h", limit: int = 20):
+    """최근 window 동안 재생 수 상위 곡: [(track_id, plays), ...]"""
+    granularity, span = TRENDING_WINDOWS[window]
+    since = timezone.now() - span
+    since = hour_bucket(since) if granularity == TrackPlayCount.HOUR else day_bucket(since)
+    return list(
+        TrackPlayCount.objects.filter(granularity=granularity, bucket_start__gte=since)
+        .values("track_id")
+        .annotate(plays=Sum("plays"))
+        .order_by("-plays", "track_id")
+        .values_list("track_id", "plays")[:limit]
+    )
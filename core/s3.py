@@ -1,7 +1,14 @@
 # core/s3.py
 import os
 import mimetypes
+import threading
+import time
+from collections import OrderedDict
+
 import boto3
+from asgiref.sync import sync_to_async
+
+from . import metrics
 
 AWS_REGION = os.getenv("AWS_REGION", "")
 AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET", "")
@@ -9,6 +16,13 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 AWS_PRESIGNED_EXPIRE_SECONDS = int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600"))
 AWS_S3_AUDIO_PREFIX = os.getenv("AWS_S3_AUDIO_PREFIX", "").strip()
+# 서명된 GET URL 재사용 구간(초). 0이면 캐시 비활성화
+AWS_PRESIGNED_CACHE_TTL = int(os.getenv("AWS_PRESIGNED_CACHE_TTL", "120"))
+AWS_PRESIGNED_CACHE_SIZE = int(os.getenv("AWS_PRESIGNED_CACHE_SIZE", "10000"))
+
+_client = None
+_client_lock = threading.Lock()
+
 
 def _full_key(key: str) -> str:
     """환경변수에 prefix가 있으면 붙여준다 (예: 'audio/')."""
@@ -16,25 +30,161 @@ def _full_key(key: str) -> str:
         return f"{AWS_S3_AUDIO_PREFIX.rstrip('/')}/{key.lstrip('/')}"
     return key.lstrip("/")
 
+
 def _s3():
-    return boto3.client(
-        "s3",
-        region_name=AWS_REGION or None,
-        aws_access_key_id=AWS_ACCESS_KEY_ID or None,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY or None,
-    )
-
-def create_presigned_get_url(key: str, expires: int | None = None) -> str:
+    """
+    프로세스(워커)당 하나의 S3 클라이언트를 재사용한다.
+    boto3 클라이언트 자체는 thread-safe 하지만 생성 과정(세션/모델 로딩)은 아니므로 락으로 보호.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = boto3.client(
+                    "s3",
+                    region_name=AWS_REGION or None,
+                    aws_access_key_id=AWS_ACCESS_KEY_ID or None,
+                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY or None,
+                )
+    return _client
+
+
+def reset_client():
+    """자격증명 교체/fork 이후 등 클라이언트를 다시 만들어야 할 때 호출."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+class PresignedUrlCache:
+    """
+    (key, 만료시간, 시간 구간) 단위로 서명된 GET URL을 보관하는 TTL + LRU 캐시.
+    - 같은 구간 안의 반복 재생은 재서명 없이 캐시된 URL을 돌려준다.
+    - URL은 `expires + ttl` 로 서명하므로, 캐시에서 꺼낸 URL도 최소 `expires` 초는 유효하다.
+    """
+
+    def __init__(self, ttl: int, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def _bucket(self, now: float) -> int:
+        return int(now // self.ttl)
+
+    def get(self, key: str, expires: int, now: float) -> str | None:
+        """캐시된 URL (없으면 None, miss 로 집계)."""
+        cache_key = (key, expires, self._bucket(now))
+        with self._lock:
+            entry = self._data.get(cache_key)
+            if entry is not None and entry[1] > now:
+                self._data.move_to_end(cache_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return None
+
+    def put(self, key: str, expires: int, url: str, now: float):
+        """`expires + ttl` 로 서명한 URL 을 now 가 속한 구간에 저장."""
+        cache_key = (key, expires, self._bucket(now))
+        with self._lock:
+            self._data[cache_key] = (url, now + self.ttl)
+            self._data.move_to_end(cache_key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_sign(self, key: str, expires: int, sign) -> str:
+        now = time.time()
+        url = self.get(key, expires, now)
+        if url is None:
+            # 서명은 락 밖에서 수행 (동시 miss 시 중복 서명은 허용)
+            url = sign(expires + self.ttl)
+            self.put(key, expires, url, now)
+        return url
+
+    def invalidate(self, key: str) -> int:
+        """특정 S3 key 에 대한 모든 캐시 항목 제거. 제거한 개수를 반환."""
+        with self._lock:
+            stale = [k for k in self._data if k[0] == key]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+presigned_url_cache = PresignedUrlCache(AWS_PRESIGNED_CACHE_TTL, AWS_PRESIGNED_CACHE_SIZE)
+
+
+def _sign_get_url(key: str, expires: int) -> str:
+    with metrics.timer("s3"):
+        return _s3().generate_presigned_url(
+            ClientMethod="get_object",
+            Params={"Bucket": AWS_S3_BUCKET, "Key": _full_key(key)},
+            ExpiresIn=expires,
+            HttpMethod="GET",
+        )
+
+
+def create_presigned_get_url(key: str, expires: int | None = None, use_cache: bool = True) -> str:
     """
     S3 객체에 대한 presigned GET URL 생성.
+    - 캐시가 켜져 있으면 같은 구간 안에서는 이전에 서명한 URL을 재사용한다.
     """
     exp = int(expires or AWS_PRESIGNED_EXPIRE_SECONDS)
-    return _s3().generate_presigned_url(
-        ClientMethod="get_object",
-        Params={"Bucket": AWS_S3_BUCKET, "Key": _full_key(key)},
-        ExpiresIn=exp,
-        HttpMethod="GET",
-    )
+    if not (use_cache and presigned_url_cache.enabled):
+        return _sign_get_url(key, exp)
+    return presigned_url_cache.get_or_sign(key, exp, lambda e: _sign_get_url(key, e))
+
+
+async def acreate_presigned_get_url(key: str, expires: int | None = None, use_cache: bool = True) -> str:
+    """
+    create_presigned_get_url 의 async 버전 (core/async_views.py).
+    - 캐시 hit 은 이벤트 루프에서 바로 반환
+    - 서명(boto3, CPU 작업)은 스레드 풀에서 수행해 이벤트 루프를 막지 않는다
+    """
+    exp = int(expires or AWS_PRESIGNED_EXPIRE_SECONDS)
+    sign = sync_to_async(_sign_get_url, thread_sensitive=False)
+    if not (use_cache and presigned_url_cache.enabled):
+        return await sign(key, exp)
+    now = time.time()
+    url = presigned_url_cache.get(key, exp, now)
+    if url is None:
+        url = await sign(key, exp + presigned_url_cache.ttl)
+        presigned_url_cache.put(key, exp, url, now)
+    return url
+
+
+def invalidate_presigned_get_url(key: str) -> int:
+    """Track.audio_s3_key 변경/삭제 시 이전 key 로 서명된 URL 캐시를 비운다."""
+    if not key:
+        return 0
+    return presigned_url_cache.invalidate(key)
+
+
+def presigned_cache_stats() -> dict:
+    return presigned_url_cache.stats()
+
 
 def create_presigned_put_url(
     key: str,
@@ -62,9 +212,11 @@ def create_presigned_put_url(
     if acl:
         params["ACL"] = acl
 
-    return _s3().generate_presigned_url(
-        ClientMethod="put_object",
-        Params=params,
-        ExpiresIn=exp,
-        HttpMethod="PUT",
-    )
+    with metrics.timer("s3"):
+        return _s3().generate_presigned_url(
+            ClientMethod="put_object",
+            Params=params,
+            ExpiresIn=exp,
+            HttpMethod="PUT",
+        )
+
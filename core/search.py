@@ -0,0 +1,251 @@
+# core/search.py
+"""
+Track 전문 검색.
+
+기존 SearchFilter 는 `?search=` 를 title/artist/genre 에 대한 LIKE '%term%' OR 조건으로 바꾸므로
+곡 수가 늘면 전체 테이블 스캔이 된다. 여기서는 TrackSearchDocument 를 DB 별 전문 검색 인덱스로 색인하고
+같은 `?search=` 파라미터 뒤에서 백엔드를 교체할 수 있게 한다.
+
+- sqlite : FTS5 (core_track_fts, 트리거로 동기화). 한글/한자/가나는 2-gram 으로 미리 쪼개서 저장
+- mysql  : FULLTEXT ... WITH PARSER ngram
+- like   : 기존 icontains 방식 (그 외 DB 또는 SEARCH_BACKEND=like)
+
+검색 결과에는 `search_rank`(클수록 관련도 높음)가 annotate 되며, 정렬 파라미터가 없으면 관련도순으로 정렬된다.
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+# 한글(음절/자모), CJK 통합 한자, 히라가나/가타카나: 공백 단위 분리가 의미 없으므로 n-gram 으로 색인
+_CJK = "ᄀ-ᇿ㄰-㆏가-힣一-鿿぀-ヿ"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W{_CJK}]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+NGRAM_SIZE = 2
+SEARCH_FIELDS = ("title", "artist", "genre")
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text: str):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def ngrams(token: str, n: int = NGRAM_SIZE):
+    if not _CJK_RE.match(token) or len(token) <= n:
+        return [token]
+    return [token[i:i + n] for i in range(len(token) - n + 1)]
+
+
+def document_text(track) -> str:
+    return " ".join(getattr(track, f) or "" for f in SEARCH_FIELDS)
+
+
+# -------------------------------------------------------------------
+# Backends
+# -------------------------------------------------------------------
+class BaseSearchBackend:
+    ranked = True
+
+    def prepare(self, text: str) -> str:
+        """TrackSearchDocument.body 에 저장할 문자열."""
+        return normalize(text)
+
+    def filter(self, queryset, text: str):
+        raise NotImplementedError
+
+    def index_tracks(self, tracks):
+        """Track 목록의 검색 문서를 생성/갱신 (bulk). 처리한 개수를 반환."""
+        from .models import TrackSearchDocument
+
+        tracks = list(tracks)
+        if not tracks:
+            return 0
+        existing = {
+            doc.track_id: doc
+            for doc in TrackSearchDocument.objects.filter(track__in=tracks)
+        }
+        to_create, to_update = [], []
+        for track in tracks:
+            body = self.prepare(document_text(track))
+            doc = existing.get(track.pk)
+            if doc is None:
+                to_create.append(TrackSearchDocument(track=track, body=body))
+            elif doc.body != body:
+                doc.body = body
+                to_update.append(doc)
+        TrackSearchDocument.objects.bulk_create(to_create)
+        TrackSearchDocument.objects.bulk_update(to_update, ["body"])
+        return len(tracks)
+
+    def rebuild(self, batch_size: int = 2000, progress=None):
+        """전체 Track 을 pk 순으로 나눠 다시 색인한다."""
+        from .models import Track
+
+        done = 0
+        last_pk = None
+        while True:
+            qs = Track.objects.order_by("pk").only(*SEARCH_FIELDS)
+            if last_pk is not None:
+                qs = qs.filter(pk__gt=last_pk)
+            batch = list(qs[:batch_size])
+            if not batch:
+                break
+            done += self.index_tracks(batch)
+            last_pk = batch[-1].pk
+            if progress:
+                progress(done)
+        self.optimize()
+        return done
+
+    def optimize(self):
+        pass
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """기존 동작: 각 단어가 title/artist/genre 중 하나에 포함 (icontains)."""
+
+    ranked = False
+
+    def filter(self, queryset, text: str):
+        for term in text.split():
+            cond = Q()
+            for field in SEARCH_FIELDS:
+                cond |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(cond)
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_tracks(self, tracks):
+        return 0
+
+    def rebuild(self, batch_size: int = 2000, progress=None):
+        return 0
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    table = "core_track_fts"
+
+    def prepare(self, text: str) -> str:
+        return " ".join(g for token in tokenize(text) for g in ngrams(token))
+
+    def build_query(self, text: str) -> str:
+        """마지막 단어는 prefix 검색(타이핑 중 자동완성), 나머지는 AND."""
+        tokens = tokenize(text)
+        parts = []
+        for i, token in enumerate(tokens):
+            grams = ngrams(token)
+            quoted = [f'"{g}"' for g in grams]
+            if i == len(tokens) - 1:
+                quoted[-1] += "*"
+            parts.extend(quoted)
+        return " ".join(parts)
+
+    def filter(self, queryset, text: str):
+        """
+        FTS5 테이블을 같은 쿼리 안에서 조인하고 rank 를 search_rank 로 annotate 한다.
+        페이지의 ORDER BY search_rank / LIMIT 이 그대로 SQL 에 적용되므로 id 목록을 주고받지 않고 결과 수 상한도 없다.
+        """
+        query = self.build_query(text)
+        if not query:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        # search_document__isnull=False 가 core_tracksearchdocument 를 INNER JOIN 하고, FTS 행은 그 id(rowid)로 붙인다
+        return queryset.filter(search_document__isnull=False).extra(
+            tables=[self.table],
+            where=[f"{self.table}.rowid = core_tracksearchdocument.id", f"{self.table} MATCH %s"],
+            params=[query],
+        ).annotate(
+            # bm25 rank 는 작을수록 관련도가 높다
+            search_rank=RawSQL(f"-{self.table}.rank", (), output_field=FloatField())
+        )
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')")
+
+
+class MySQLFulltextBackend(BaseSearchBackend):
+    def build_query(self, text: str) -> str:
+        tokens = tokenize(text)
+        parts = [f"+{t}" for t in tokens]
+        if parts:
+            parts[-1] += "*"
+        return " ".join(parts)
+
+    def filter(self, queryset, text: str):
+        query = self.build_query(text)
+        if not query:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        match = "MATCH (core_tracksearchdocument.body) AGAINST (%s IN BOOLEAN MODE)"
+        return queryset.filter(
+            search_document__isnull=False,
+        ).filter(
+            RawSQL(match, (query,), output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(match, (query,), output_field=FloatField())
+        )
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute("OPTIMIZE TABLE core_tracksearchdocument")
+
+
+BACKENDS = {
+    "like": LikeSearchBackend,
+    "sqlite": SQLiteFTS5Backend,
+    "mysql": MySQLFulltextBackend,
+}
+
+
+def get_search_backend(name: str | None = None) -> BaseSearchBackend:
+    """SEARCH_BACKEND=auto 이면 DB 종류에 맞는 백엔드, 지원하지 않는 DB 는 like."""
+    name = name or getattr(settings, "SEARCH_BACKEND", "auto")
+    if name == "auto":
+        name = connection.vendor
+    return BACKENDS.get(name, LikeSearchBackend)()
+
+
+# -------------------------------------------------------------------
+# DRF filters
+# -------------------------------------------------------------------
+class TrackSearchFilter(SearchFilter):
+    """`?search=` 를 검색 백엔드로 위임한다."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        backend = get_search_backend()
+        return backend.filter(queryset, " ".join(terms))
+
+
+class RankedOrderingFilter(OrderingFilter):
+    """검색 중이고 ?ordering= 이 없으면 관련도순(-search_rank). 검색 중일 때만 search_rank 정렬 허용."""
+
+    rank_field = "search_rank"
+
+    def _is_ranked_search(self, request):
+        return bool(request.query_params.get(self.search_param_name(), "").strip()) and get_search_backend().ranked
+
+    @staticmethod
+    def search_param_name():
+        return settings.REST_FRAMEWORK.get("SEARCH_PARAM", "search")
+
+    def get_default_ordering(self, view):
+        request = getattr(view, "request", None)
+        if request is not None and self._is_ranked_search(request):
+            return [f"-{self.rank_field}"]
+        return super().get_default_ordering(view)
+
+    def get_valid_fields(self, queryset, view, context={}):
+        fields = super().get_valid_fields(queryset, view, context)
+        request = context.get("request") or getattr(view, "request", None)
+        fields = [f for f in fields if f[0] != self.rank_field]
+        if request is not None and self._is_ranked_search(request):
+            fields.append((self.rank_field, self.rank_field))
+        return fields
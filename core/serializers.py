@@ -3,7 +3,8 @@ from django.core import signing
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
-from .models import Favorite, PlayHistory, Playlist, PlaylistTrack, Track, User
+from .favorites import add_favorite
+from .models import Favorite, PlayHistory, Playlist, PlaylistTrack, RecentlyPlayed, Track, User
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -56,10 +57,24 @@ class TrackSerializer(serializers.ModelSerializer):
             "audio_s3_key",
             "duration_sec",
             "is_published",
+            "play_count",
+            "favorite_count",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "created_at", "updated_at")
+        read_only_fields = ("id", "play_count", "favorite_count", "created_at", "updated_at")
+
+
+class CatalogTrackSerializer(TrackSerializer):
+    """곡 목록/상세 응답용: 로그인 사용자의 즐겨찾기 여부 포함 (TrackViewSet 의 Exists annotate 값)"""
+
+    is_favorited = serializers.SerializerMethodField()
+
+    class Meta(TrackSerializer.Meta):
+        fields = TrackSerializer.Meta.fields + ("is_favorited",)
+
+    def get_is_favorited(self, obj):
+        return bool(getattr(obj, "is_favorited", False))
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
@@ -72,9 +87,22 @@ class FavoriteSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at")
 
     def create(self, validated_data):
-        track_id = validated_data.pop("track_id")
-        track = Track.objects.get(pk=track_id)
-        return Favorite.objects.create(user=self.context["request"].user, track=track)
+        # 카운터 증감까지 한 트랜잭션으로 처리하는 core/favorites.py 경유 (이미 있으면 그대로 반환)
+        user = self.context["request"].user
+        track_id = validated_data["track_id"]
+        if add_favorite(user.pk, track_id) is None:
+            raise serializers.ValidationError({"track_id": ["존재하지 않는 곡입니다."]})
+        return Favorite.objects.select_related("track").get(user_id=user.pk, track_id=track_id)
+
+
+class FavoriteBulkSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.UUIDField(), required=False, default=list, max_length=100)
+    remove = serializers.ListField(child=serializers.UUIDField(), required=False, default=list, max_length=100)
+
+    def validate(self, attrs):
+        if not attrs["add"] and not attrs["remove"]:
+            raise serializers.ValidationError("add 또는 remove 중 하나는 필요합니다.")
+        return attrs
 
 
 class PlayHistorySerializer(serializers.ModelSerializer):
@@ -85,6 +113,18 @@ class PlayHistorySerializer(serializers.ModelSerializer):
         fields = ("id", "track", "played_at")
 
 
+class RecentlyPlayedSerializer(serializers.ModelSerializer):
+    track = TrackSerializer(read_only=True)
+
+    class Meta:
+        model = RecentlyPlayed
+        fields = ("track", "played_at", "position_sec", "updated_at")
+
+
+class PlaybackPositionSerializer(serializers.Serializer):
+    position_sec = serializers.IntegerField(min_value=0)
+
+
 class PlaylistItemSerializer(serializers.ModelSerializer):
     track = TrackSerializer(read_only=True)
     track_id = serializers.UUIDField(write_only=True)
@@ -92,7 +132,55 @@ class PlaylistItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = PlaylistTrack
         fields = ("id", "track", "track_id", "order", "added_at")
-        read_only_fields = ("id", "added_at")
+        read_only_fields = ("id", "order", "added_at")
+
+
+class PlaylistPlacementSerializer(serializers.Serializer):
+    """after/before: 기준 곡 id (둘 다 없으면 맨 뒤)"""
+    after = serializers.UUIDField(required=False, allow_null=True)
+    before = serializers.UUIDField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs.get("after") and attrs.get("before"):
+            raise serializers.ValidationError("after 와 before 는 함께 쓸 수 없습니다.")
+        return attrs
+
+
+class PlaylistAddSerializer(PlaylistPlacementSerializer):
+    track_id = serializers.UUIDField(required=False)
+    track_ids = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=500)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        track_ids = list(attrs.get("track_ids") or [])
+        if attrs.get("track_id"):
+            track_ids.insert(0, attrs["track_id"])
+        if not track_ids:
+            raise serializers.ValidationError("track_id 또는 track_ids 가 필요합니다.")
+        attrs["track_ids"] = track_ids
+        return attrs
+
+
+class PlaylistRemoveSerializer(serializers.Serializer):
+    track_id = serializers.UUIDField(required=False)
+    track_ids = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=500)
+
+    def validate(self, attrs):
+        track_ids = list(attrs.get("track_ids") or [])
+        if attrs.get("track_id"):
+            track_ids.insert(0, attrs["track_id"])
+        if not track_ids:
+            raise serializers.ValidationError("track_id 또는 track_ids 가 필요합니다.")
+        attrs["track_ids"] = track_ids
+        return attrs
+
+
+class PlaylistMoveSerializer(PlaylistPlacementSerializer):
+    track_id = serializers.UUIDField()
+
+
+class PlaylistReorderSerializer(serializers.Serializer):
+    moves = PlaylistMoveSerializer(many=True, allow_empty=False, max_length=500)
 
 
 class PlaylistSerializer(serializers.ModelSerializer):
@@ -100,9 +188,46 @@ class PlaylistSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Playlist
-        fields = ("id", "name", "is_public", "created_at", "updated_at", "tracks")
-        read_only_fields = ("id", "created_at", "updated_at")
+        fields = (
+            "id",
+            "name",
+            "is_public",
+            "kind",
+            "genre",
+            "track_count",
+            "total_duration_sec",
+            "created_at",
+            "updated_at",
+            "tracks",
+        )
+        read_only_fields = ("id", "kind", "genre", "track_count", "total_duration_sec", "created_at", "updated_at")
 
     def get_tracks(self, obj):
-        items = obj.items.select_related("track").all()
+        # PlaylistViewSet 에서 prefetch 한 items(+track)를 그대로 사용 (추가 쿼리 없음)
+        items = obj.items.all()
         return TrackSerializer([it.track for it in items], many=True).data
+
+
+class CompactPlaylistSerializer(serializers.ModelSerializer):
+    """?view=compact: 곡 상세 대신 track id 목록 + 곡 수/총 재생시간(역정규화 컬럼)만 반환"""
+
+    track_ids = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Playlist
+        fields = (
+            "id",
+            "name",
+            "is_public",
+            "kind",
+            "genre",
+            "created_at",
+            "updated_at",
+            "track_ids",
+            "track_count",
+            "total_duration_sec",
+        )
+        read_only_fields = ("id", "kind", "genre", "track_count", "total_duration_sec", "created_at", "updated_at")
+
+    def get_track_ids(self, obj):
+        return [it.track_id for it in obj.items.all()]
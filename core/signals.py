@@ -0,0 +1,69 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .auth import invalidate_cached_user, revoke_user_tokens
+from .cache import bump_catalog_version
+from .db_router import pin_catalog_reads
+from .models import Track, User
+from .s3 import invalidate_presigned_get_url
+from .search import SEARCH_FIELDS, get_search_backend
+
+
+@receiver(pre_save, sender=Track)
+def track_source_changed(sender, instance, **kwargs):
+    """원본(audio_s3_key)이 바뀌면 이전 HLS 결과는 버리고 다시 변환 대기 (core/transcode.py)"""
+    old_key = getattr(instance, "_loaded_audio_s3_key", None)
+    if old_key and old_key != instance.audio_s3_key:
+        instance.transcode_status = Track.TRANSCODE_PENDING
+        instance.hls_manifest_key = ""
+        instance.hls_variants = []
+
+
+@receiver(post_save, sender=Track)
+def track_saved(sender, instance, created, **kwargs):
+    """audio_s3_key 가 바뀌면 이전 key 로 캐시된 presigned URL 무효화"""
+    old_key = getattr(instance, "_loaded_audio_s3_key", None)
+    if old_key and old_key != instance.audio_s3_key:
+        invalidate_presigned_get_url(old_key)
+    instance._loaded_audio_s3_key = instance.audio_s3_key
+
+
+@receiver(post_save, sender=Track)
+def track_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """검색 문서 동기화 (삭제는 FK CASCADE + DB 트리거로 처리)"""
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    get_search_backend().index_tracks([instance])
+
+
+@receiver(post_delete, sender=Track)
+def track_deleted(sender, instance, **kwargs):
+    invalidate_presigned_get_url(instance.audio_s3_key)
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+def track_catalog_changed(sender, instance, **kwargs):
+    """카탈로그 응답 캐시 무효화 (replica 가 따라잡을 때까지 곡 조회는 primary 에서)"""
+    bump_catalog_version()
+    pin_catalog_reads()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """
+    User 캐시 무효화. 토큰 claim(is_staff/is_active)이 바뀌면 이전에 발급된 토큰을 모두 무효화해
+    JWT_STATELESS_AUTH 에서 오래된 권한이 남지 않게 한다 (다시 로그인/갱신하면 새 claim).
+    """
+    invalidate_cached_user(instance.pk)
+    claims = (instance.is_staff, instance.is_active)
+    loaded = getattr(instance, "_loaded_claims", None)
+    if not created and loaded is not None and None not in loaded and loaded != claims:
+        revoke_user_tokens(instance.pk)
+    instance._loaded_claims = claims
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    revoke_user_tokens(instance.pk)
@@ -0,0 +1,314 @@
+# core/similarity.py
+"""
+곡-곡 유사도 오프라인 계산 (`manage.py build_similar_tracks`, 조회는 core/recommendations.py).
+
+사용자×곡 희소 행렬
+    R = PLAY_WEIGHT·log1p(재생 수) + FAVORITE_WEIGHT·즐겨찾기 + PLAYLIST_WEIGHT·플레이리스트에 담음
+의 곡 열끼리 cosine 유사도를 구해 곡마다 상위 K 개를 SimilarTrack 에 저장한다.
+
+- 재생 수 행렬은 PlayHistory 를 id 구간(chunk)별로 DB 에서 (user, track) 집계해 읽는다. 집계가 끝난(rollup watermark 이하)
+  행까지만 읽고, 행렬은 watermark 와 함께 저장소(SIMILARITY_STATE_KEY)에 저장해 다음 실행에서는 그 이후 행만 더한다
+  (compact_history 로 지워진 오래된 기록도 행렬에는 남는다)
+- 즐겨찾기/플레이리스트는 현재 상태 테이블이라 매번 pk chunk 로 다시 읽고, 저장해 둔 이전 행렬과 달라진 열만 변경으로 본다
+- 유사도는 변경된 곡(새 재생·즐겨찾기·플레이리스트 변화, 새 곡)의 행만 block 단위(Xᵀ[block] @ X)로 계산해
+  메모리를 block 크기 × 곡 수 이하로 제한한다. 변경되지 않은 곡의 목록에 남은 이전 점수는 all_tracks=True 로 주기적으로 갱신
+- 곡 id ↔ 열 번호는 state 에 저장해 실행 간 유지 (새 곡은 뒤에 붙는다). 사용자 행 번호는 user id 그대로 (희소 행렬이라 빈 행 비용은 작다)
+
+동시에 두 번 실행하지 않는다 (cron 등에서 겹치지 않게).
+"""
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Favorite, PlayHistory, PlaylistTrack, SimilarTrack, Track, Watermark
+from .recommendations import SIMILARITY_WATERMARK
+from .rollups import PLAY_ROLLUP_WATERMARK
+from .storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+PLAY_WEIGHT = 1.0
+FAVORITE_WEIGHT = 3.0
+PLAYLIST_WEIGHT = 2.0
+STATE_VERSION = 1
+_MATRICES = ("plays", "favorites", "playlists")
+
+
+class TrackColumns:
+    """곡 id ↔ 행렬 열 번호. 처음 보는 곡은 뒤에 붙인다."""
+
+    def __init__(self, track_ids=()):
+        self.ids = list(track_ids)
+        self.index = {track_id: i for i, track_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, track_id) -> int:
+        i = self.index.get(track_id)
+        if i is None:
+            i = self.index[track_id] = len(self.ids)
+            self.ids.append(track_id)
+        return i
+
+    def extend(self, track_ids):
+        for track_id in track_ids:
+            self[track_id]
+
+
+# -------------------------------------------------------------------
+# state (행렬 + 열 번호 + watermark) 저장/불러오기
+# -------------------------------------------------------------------
+def load_state(key: str | None = None) -> dict | None:
+    key = key or settings.SIMILARITY_STATE_KEY
+    storage = get_storage()
+    if storage.head(key) is None:
+        return None
+    with storage.local_path(key) as path, np.load(path) as f:
+        version, last_play_id = (int(v) for v in f["meta"])
+        if version != STATE_VERSION:
+            logger.warning("similarity state %s has version %s, rebuilding", key, version)
+            return None
+        state = {
+            "columns": TrackColumns(_read_track_ids(f["track_ids"])),
+            "last_play_id": last_play_id,
+        }
+        for name in _MATRICES:
+            state[name] = sp.csr_matrix(
+                (f[f"{name}_data"], f[f"{name}_indices"], f[f"{name}_indptr"]), shape=tuple(f[f"{name}_shape"])
+            )
+    return state
+
+
+def _read_track_ids(arr):
+    if arr.dtype.kind == "S":
+        # 이전 형식("S16") 으로 저장된 state: 잘린 NUL 바이트를 복원
+        return [uuid.UUID(bytes=bytes(b).ljust(16, b"\0")) for b in arr]
+    return [uuid.UUID(bytes=row.tobytes()) for row in arr]
+
+
+def save_state(state: dict, key: str | None = None):
+    key = key or settings.SIMILARITY_STATE_KEY
+    arrays = {
+        "meta": np.array([STATE_VERSION, state["last_play_id"]], dtype=np.int64),
+        # (n, 16) uint8: "S16" 은 끝의 NUL 바이트를 잘라내 uuid 를 복원하지 못한다
+        "track_ids": np.frombuffer(b"".join(t.bytes for t in state["columns"].ids), dtype=np.uint8).reshape(-1, 16),
+    }
+    for name in _MATRICES:
+        m = state[name]
+        arrays.update({
+            f"{name}_data": m.data, f"{name}_indices": m.indices, f"{name}_indptr": m.indptr,
+            f"{name}_shape": np.array(m.shape, dtype=np.int64),
+        })
+    fd, path = tempfile.mkstemp(suffix=".npz")
+    os.close(fd)
+    try:
+        np.savez_compressed(path, **arrays)
+        get_storage().upload(path, key, "application/octet-stream")
+    finally:
+        os.remove(path)
+
+
+# -------------------------------------------------------------------
+# 행렬 읽기 (chunk 단위)
+# -------------------------------------------------------------------
+def _resized(m, shape):
+    if m.shape != shape:
+        m = m.copy()
+        m.resize(shape)
+    return m
+
+
+def _sum(parts, n_tracks: int):
+    """chunk 행렬들을 한 번에 합친다 (chunk 마다 누적하면 chunk 수 × nnz 만큼 복사). 없으면 None."""
+    if not parts:
+        return None
+    coo = [p.tocoo() for p in parts]
+    data = np.concatenate([c.data for c in coo])
+    users = np.concatenate([c.row for c in coo])
+    cols = np.concatenate([c.col for c in coo])
+    return sp.csr_matrix((data, (users, cols)), shape=(max(p.shape[0] for p in parts), n_tracks))
+
+
+def _chunk_matrix(rows, columns: TrackColumns, values=None):
+    """rows: [(user_id, track_id[, value]), ...] → 중복 (user, track) 을 합친 csr 행렬."""
+    users = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    cols = np.fromiter((columns[r[1]] for r in rows), dtype=np.int64, count=len(rows))
+    data = np.ones(len(rows), dtype=np.float32) if values is None else np.asarray(values, dtype=np.float32)
+    return sp.csr_matrix((data, (users, cols)), shape=(int(users.max()) + 1, len(columns)))
+
+
+def read_plays(columns: TrackColumns, after_id: int, chunk_size: int = 200_000, progress=None):
+    """
+    after_id 이후 ~ rollup watermark 까지의 PlayHistory 를 (user, track) 재생 수 행렬로. (행렬 또는 None, 마지막 id)
+    id 구간마다 DB 에서 GROUP BY 하므로 전송/메모리는 chunk 안의 서로 다른 (user, track) 수에 비례한다.
+    """
+    upto = Watermark.objects.filter(name=PLAY_ROLLUP_WATERMARK).values_list("last_id", flat=True).first() or 0
+    parts = []
+    last = after_id
+    while last < upto:
+        # compact_history 로 지워진 구간은 건너뛴다
+        start = (
+            PlayHistory.objects.filter(id__gt=last, id__lte=upto).order_by("id").values_list("id", flat=True).first()
+        )
+        if start is None:
+            break
+        end = min(start + chunk_size - 1, upto)
+        rows = list(
+            PlayHistory.objects.filter(id__gte=start, id__lte=end)
+            .order_by()
+            .values("user_id", "track_id")
+            .annotate(n=Count("id"))
+            .values_list("user_id", "track_id", "n")
+        )
+        if rows:
+            parts.append(_chunk_matrix(rows, columns, [r[2] for r in rows]))
+        last = end
+        if progress:
+            progress(f"plays: id <= {end}")
+    return _sum(parts, len(columns)), last
+
+
+def read_pairs(queryset, user_field: str, columns: TrackColumns, chunk_size: int = 200_000):
+    """현재 (user, track) 관계 전체를 0/1 행렬로 (pk keyset chunk)."""
+    parts = []
+    last = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last).order_by("pk").values_list("pk", user_field, "track_id")[:chunk_size]
+        )
+        if not rows:
+            break
+        last = rows[-1][0]
+        parts.append(_chunk_matrix([r[1:] for r in rows], columns))
+    matrix = _sum(parts, len(columns))
+    if matrix is None:
+        return sp.csr_matrix((1, len(columns)), dtype=np.float32)
+    # 같은 곡을 여러 플레이리스트에 담아도 1
+    matrix.data[:] = 1
+    return matrix
+
+
+def _changed_columns(new, old) -> np.ndarray:
+    diff = new - _resized(old, new.shape)
+    diff.eliminate_zeros()
+    return np.unique(diff.indices)
+
+
+# -------------------------------------------------------------------
+# 유사도
+# -------------------------------------------------------------------
+def normalized_matrix(plays, favorites, playlists, live: np.ndarray):
+    """열(곡)별 L2 정규화한 R (users × tracks, csr). 삭제된 곡의 열은 0 이라 이웃으로 나오지 않는다."""
+    r = PLAY_WEIGHT * plays.log1p() + FAVORITE_WEIGHT * favorites + PLAYLIST_WEIGHT * playlists
+    r = sp.csr_matrix(r, dtype=np.float32)
+    norms = np.sqrt(np.asarray(r.multiply(r).sum(axis=0)).ravel())
+    inv = np.zeros_like(norms)
+    np.divide(1.0, norms, out=inv, where=(norms > 0) & live)
+    r = (r @ sp.diags(inv.astype(np.float32))).tocsr()
+    r.eliminate_zeros()
+    return r
+
+
+def top_neighbours(x, xt, block: np.ndarray, top_k: int):
+    """block 곡들의 이웃: [(열, 이웃 열 배열, 점수 배열), ...] (점수 내림차순, 자기 자신 제외)."""
+    sims = (xt[block] @ x).tocsr()
+    result = []
+    for i, col in enumerate(block):
+        lo, hi = sims.indptr[i], sims.indptr[i + 1]
+        cols, scores = sims.indices[lo:hi], sims.data[lo:hi]
+        keep = (cols != col) & (scores > 0)
+        cols, scores = cols[keep], scores[keep]
+        if len(scores) > top_k:
+            part = np.argpartition(-scores, top_k)[:top_k]
+            cols, scores = cols[part], scores[part]
+        order = np.lexsort((cols, -scores))
+        result.append((int(col), cols[order], scores[order]))
+    return result
+
+
+def write_neighbours(columns: TrackColumns, result):
+    track_ids = [columns.ids[col] for col, _, _ in result]
+    rows = [
+        SimilarTrack(track_id=columns.ids[col], neighbor_id=columns.ids[n], rank=rank, score=min(float(s), 1.0))
+        for col, cols, scores in result
+        for rank, (n, s) in enumerate(zip(cols, scores))
+    ]
+    with transaction.atomic():
+        SimilarTrack.objects.filter(track_id__in=track_ids).delete()
+        SimilarTrack.objects.bulk_create(rows, batch_size=1000)
+
+
+def build_similar_tracks(
+    top_k: int | None = None,
+    chunk_size: int = 200_000,
+    block_size: int = 256,
+    all_tracks: bool = False,
+    reset: bool = False,
+    progress=None,
+) -> dict:
+    """
+    state 를 불러와 새 기록을 반영하고 변경된 곡의 SimilarTrack 을 다시 계산. 통계 dict 를 반환.
+    all_tracks: 모든 곡을 다시 계산 / reset: 저장된 state 없이 현재 테이블로 처음부터 (지워진 재생 기록은 빠진다)
+    """
+    top_k = top_k or settings.SIMILAR_TRACKS_TOP_K
+    started = time.perf_counter()
+    state = None if reset else load_state()
+    columns = state["columns"] if state else TrackColumns()
+    known = len(columns)
+    live_ids = list(Track.objects.order_by("created_at", "id").values_list("pk", flat=True))
+    columns.extend(live_ids)
+
+    new_plays, last_play_id = read_plays(columns, state["last_play_id"] if state else 0, chunk_size, progress)
+    favorites = read_pairs(Favorite.objects, "user_id", columns, chunk_size)
+    playlists = read_pairs(PlaylistTrack.objects, "playlist__user_id", columns, chunk_size)
+    plays = _sum([m for m in (state["plays"] if state else None, new_plays) if m is not None], len(columns))
+    if plays is None:
+        plays = sp.csr_matrix((1, len(columns)), dtype=np.float32)
+    previous = [state["favorites"], state["playlists"]] if state else []
+    shape = (max(m.shape[0] for m in (plays, favorites, playlists, *previous)), len(columns))
+    plays, favorites, playlists = (_resized(m, shape) for m in (plays, favorites, playlists))
+    if progress:
+        progress(f"matrix: {shape[0]} users × {shape[1]} tracks, {plays.nnz + favorites.nnz + playlists.nnz} nonzeros")
+
+    live = np.zeros(len(columns), dtype=bool)
+    live[[columns.index[t] for t in live_ids]] = True
+    if state is None or all_tracks:
+        dirty = np.arange(len(columns))
+    else:
+        dirty = np.unique(np.concatenate([
+            new_plays.indices if new_plays is not None else np.empty(0, dtype=np.int64),
+            _changed_columns(favorites, state["favorites"]),
+            _changed_columns(playlists, state["playlists"]),
+            np.arange(known, len(columns)),
+        ]).astype(np.int64))
+    dirty = dirty[live[dirty]]
+
+    x = normalized_matrix(plays, favorites, playlists, live)
+    xt = x.T.tocsr()
+    for start in range(0, len(dirty), block_size):
+        write_neighbours(columns, top_neighbours(x, xt, dirty[start:start + block_size], top_k))
+        if progress:
+            progress(f"neighbours: {min(start + block_size, len(dirty))}/{len(dirty)} tracks")
+
+    # 이웃을 다 쓴 뒤에 state 저장: 중간에 실패하면 다음 실행이 같은 변경분을 다시 계산
+    save_state({
+        "columns": columns, "last_play_id": last_play_id,
+        "plays": plays, "favorites": favorites, "playlists": playlists,
+    })
+    Watermark.objects.update_or_create(name=SIMILARITY_WATERMARK, defaults={"last_id": last_play_id})
+    return {
+        "users": shape[0],
+        "tracks": int(live.sum()),
+        "updated_tracks": len(dirty),
+        "last_play_id": last_play_id,
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,314 @@
+# core/smart_playlists.py
+"""
+자동 생성 플레이리스트 (Playlist.kind != user, `manage.py refresh_smart_playlists`).
+
+- 이번 달 많이 들은 곡 (most_played)  : UserTrackPlayCount(이번 달) 상위 SMART_PLAYLIST_SIZE 곡
+- 최근 즐겨찾기 (recent_favorites)     : 최근 즐겨찾기한 SMART_PLAYLIST_SIZE 곡
+- 장르 믹스 (genre_mix)                : 이번 달 많이 들은 장르 SMART_PLAYLIST_GENRES 개마다
+                                         그 장르에서 자주 들은 곡과 아직 안 들은 인기곡을 번갈아
+
+일반 Playlist/PlaylistTrack 행으로 저장하므로 조회는 PlaylistViewSet 그대로 (추가 쿼리 없음).
+
+갱신은 증분이다.
+1. PlayHistory 는 watermark 이후 ~ rollup watermark(집계가 끝난 행)까지 읽어 UserTrackPlayCount 에 더하고,
+   Favorite 는 watermark 이후 새 행만 읽는다 (rollup 과 같이 watermark 행을 잠근 트랜잭션 안에서 처리)
+2. 새 기록이 있는 사용자(+ 월이 바뀐 뒤 아직 갱신되지 않은 사용자)의 플레이리스트만 다시 계산하고,
+   기존 PlaylistTrack 과 비교해 바뀐 행만 추가/삭제/순서 변경
+3. 사용자 단위 작업은 user id 로 shard 를 나눠 스레드 풀에서 실행 (한 사용자는 항상 한 스레드에서만 처리)
+
+즐겨찾기 해제는 watermark 로 알 수 없으므로 core/favorites.py 가 해제하는 트랜잭션에서 drop_unfavorited() 로 바로 뺀다.
+watermark 를 옮긴 뒤 사용자 갱신 전에 실패하면 그 사용자들은 다음 새 기록이 생길 때 갱신된다.
+"""
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from itertools import zip_longest
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .counters import adjust_playlist_totals
+from .models import Favorite, PlayHistory, Playlist, PlaylistTrack, Track, UserTrackPlayCount, Watermark
+from .playlist_order import GAP
+from .rollups import PLAY_ROLLUP_WATERMARK
+
+logger = logging.getLogger(__name__)
+
+SMART_PLAYS_WATERMARK = "smart_playlists:plays"
+SMART_FAVORITES_WATERMARK = "smart_playlists:favorites"
+MOST_PLAYED_NAME = "이번 달 많이 들은 곡"
+RECENT_FAVORITES_NAME = "최근 즐겨찾기"
+
+
+def genre_mix_name(genre: str) -> str:
+    return f"{genre} 믹스"
+
+
+def month_bucket(dt):
+    """TIME_ZONE 기준 그 달 1일 (date)."""
+    return timezone.localtime(dt).date().replace(day=1)
+
+
+def _locked_watermark(name):
+    mark, _ = Watermark.objects.get_or_create(name=name)
+    return Watermark.objects.select_for_update().get(pk=mark.pk)
+
+
+# -------------------------------------------------------------------
+# 1. 새 기록 읽기
+# -------------------------------------------------------------------
+def apply_new_plays(batch_size: int = 5000) -> set:
+    """watermark 이후 집계가 끝난 PlayHistory 를 이번 달 UserTrackPlayCount 에 더한다. 재생한 사용자 id 집합을 반환."""
+    users = set()
+    month = month_bucket(timezone.now())
+    while True:
+        with transaction.atomic():
+            mark = _locked_watermark(SMART_PLAYS_WATERMARK)
+            upto = Watermark.objects.filter(name=PLAY_ROLLUP_WATERMARK).values_list("last_id", flat=True).first() or 0
+            rows = list(
+                PlayHistory.objects.filter(id__gt=mark.last_id, id__lte=upto)
+                .order_by("id")
+                .values_list("id", "user_id", "track_id", "played_at")[:batch_size]
+            )
+            if not rows:
+                break
+            # 지난달 재생은 이번 달 목록에 영향이 없으므로 건너뛴다
+            counts = Counter(
+                (user_id, track_id) for _, user_id, track_id, played_at in rows if month_bucket(played_at) == month
+            )
+            _add_monthly_counts(month, counts)
+            mark.last_id = rows[-1][0]
+            mark.save(update_fields=["last_id", "updated_at"])
+        users.update(user_id for user_id, _ in counts)
+    return users
+
+
+def _add_monthly_counts(month, counts):
+    if not counts:
+        return
+    existing = {
+        (obj.user_id, obj.track_id): obj
+        for obj in UserTrackPlayCount.objects.filter(
+            month=month,
+            user_id__in={user_id for user_id, _ in counts},
+            track_id__in={track_id for _, track_id in counts},
+        )
+    }
+    to_update, to_create = [], []
+    for key, plays in counts.items():
+        obj = existing.get(key)
+        if obj is None:
+            to_create.append(UserTrackPlayCount(user_id=key[0], track_id=key[1], month=month, plays=plays))
+        else:
+            obj.plays += plays
+            to_update.append(obj)
+    UserTrackPlayCount.objects.bulk_create(to_create, batch_size=1000)
+    UserTrackPlayCount.objects.bulk_update(to_update, ["plays"], batch_size=1000)
+
+
+def new_favorite_users(batch_size: int = 5000, settle_seconds: int | None = None) -> set:
+    """watermark 이후 즐겨찾기를 추가한 사용자 id 집합 (막 추가된 행은 rollup 과 같이 다음 실행으로 미룬다)."""
+    if settle_seconds is None:
+        settle_seconds = getattr(settings, "PLAY_ROLLUP_SETTLE_SECONDS", 5)
+    users = set()
+    while True:
+        cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+        with transaction.atomic():
+            mark = _locked_watermark(SMART_FAVORITES_WATERMARK)
+            rows = list(
+                Favorite.objects.filter(id__gt=mark.last_id)
+                .order_by("id")
+                .values_list("id", "user_id", "created_at")[:batch_size]
+            )
+            for i, row in enumerate(rows):
+                if row[2] >= cutoff:
+                    rows = rows[:i]
+                    break
+            if not rows:
+                break
+            mark.last_id = rows[-1][0]
+            mark.save(update_fields=["last_id", "updated_at"])
+        users.update(user_id for _, user_id, _ in rows)
+    return users
+
+
+# -------------------------------------------------------------------
+# 2. 사용자별 플레이리스트 계산/반영
+# -------------------------------------------------------------------
+def materialize(user_id, kind: str, name: str, track_ids, genre: str = "") -> bool:
+    """
+    (user, kind, name) 플레이리스트를 track_ids 순서로 맞춘다 (바뀐 PlaylistTrack 행만 쓴다). 곡이 없으면 삭제.
+    한 사용자는 한 스레드에서만 처리하므로 get_or_create 가 경합하지 않는다.
+    """
+    with transaction.atomic():
+        if not track_ids:
+            Playlist.objects.filter(user_id=user_id, kind=kind, name=name).delete()
+            return False
+        playlist, _ = Playlist.objects.get_or_create(user_id=user_id, kind=kind, name=name, defaults={"genre": genre})
+        desired = {track_id: GAP * (i + 1) for i, track_id in enumerate(track_ids)}
+        items = PlaylistTrack.objects.filter(playlist=playlist).values_list("pk", "track_id", "order")
+        existing = {track_id: (pk, order) for pk, track_id, order in items}
+        stale = [pk for track_id, (pk, _) in existing.items() if track_id not in desired]
+        moved = [
+            PlaylistTrack(pk=pk, order=desired[track_id])
+            for track_id, (pk, order) in existing.items()
+            if track_id in desired and desired[track_id] != order
+        ]
+        added = [
+            PlaylistTrack(playlist=playlist, track_id=track_id, order=order)
+            for track_id, order in desired.items()
+            if track_id not in existing
+        ]
+        if stale:
+            PlaylistTrack.objects.filter(pk__in=stale).delete()
+        PlaylistTrack.objects.bulk_update(moved, ["order"], batch_size=500)
+        PlaylistTrack.objects.bulk_create(added, batch_size=500)
+        duration = Track.objects.filter(pk__in=desired).aggregate(total=Sum("duration_sec"))["total"] or 0
+        # updated_at: 월이 바뀐 뒤 아직 갱신되지 않은 most_played 를 찾는 기준
+        Playlist.objects.filter(pk=playlist.pk).update(
+            track_count=len(desired), total_duration_sec=duration, updated_at=timezone.now()
+        )
+    return True
+
+
+def refresh_most_played(user_id, month) -> bool:
+    ranked = list(
+        UserTrackPlayCount.objects.filter(user_id=user_id, month=month, track__is_published=True)
+        .order_by("-plays", "track_id")
+        .values_list("track_id", flat=True)[: settings.SMART_PLAYLIST_SIZE]
+    )
+    return materialize(user_id, Playlist.KIND_MOST_PLAYED, MOST_PLAYED_NAME, ranked)
+
+
+def refresh_recent_favorites(user_id) -> bool:
+    recent = list(
+        Favorite.objects.filter(user_id=user_id, track__is_published=True)
+        .order_by("-created_at", "-id")
+        .values_list("track_id", flat=True)[: settings.SMART_PLAYLIST_SIZE]
+    )
+    return materialize(user_id, Playlist.KIND_RECENT_FAVORITES, RECENT_FAVORITES_NAME, recent)
+
+
+def popular_in_genre(genre: str) -> list:
+    """장르 인기곡 (장르 믹스의 새 곡 후보). refresh 한 번 동안 lru_cache 로 장르당 한 번만 조회."""
+    return list(
+        Track.objects.filter(genre=genre, is_published=True)
+        .order_by("-play_count", "id")
+        .values_list("pk", flat=True)[: settings.SMART_PLAYLIST_SIZE * 2]
+    )
+
+
+def _interleave(first, second, size: int):
+    return [x for pair in zip_longest(first, second) for x in pair if x is not None][:size]
+
+
+def refresh_genre_mixes(user_id, month, popular=popular_in_genre) -> int:
+    """이번 달 많이 들은 장르별 믹스. 상위에서 빠진 장르의 믹스는 삭제. 만든 믹스 수를 반환."""
+    size = settings.SMART_PLAYLIST_SIZE
+    played = UserTrackPlayCount.objects.filter(user_id=user_id, month=month)
+    genres = list(
+        played.exclude(track__genre="")
+        .values("track__genre")
+        .annotate(total=Sum("plays"))
+        .order_by("-total", "track__genre")
+        .values_list("track__genre", flat=True)[: settings.SMART_PLAYLIST_GENRES]
+    )
+    for genre in genres:
+        own = list(
+            played.filter(track__genre=genre, track__is_published=True)
+            .order_by("-plays", "track_id")
+            .values_list("track_id", flat=True)[: size // 2]
+        )
+        heard = set(played.filter(track__genre=genre).values_list("track_id", flat=True))
+        fresh = [track_id for track_id in popular(genre) if track_id not in heard]
+        materialize(user_id, Playlist.KIND_GENRE_MIX, genre_mix_name(genre), _interleave(own, fresh, size), genre=genre)
+    Playlist.objects.filter(user_id=user_id, kind=Playlist.KIND_GENRE_MIX).exclude(genre__in=genres).delete()
+    return len(genres)
+
+
+def drop_unfavorited(user_id, track_ids):
+    """즐겨찾기 해제 시 (core/favorites.py, 같은 트랜잭션) "최근 즐겨찾기" 에서 바로 뺀다."""
+    items = list(
+        PlaylistTrack.objects.filter(
+            playlist__user_id=user_id, playlist__kind=Playlist.KIND_RECENT_FAVORITES, track_id__in=track_ids
+        ).values_list("pk", "playlist_id", "track__duration_sec")
+    )
+    if items:
+        PlaylistTrack.objects.filter(pk__in=[pk for pk, _, _ in items]).delete()
+        adjust_playlist_totals(items[0][1], -len(items), -sum(duration for _, _, duration in items))
+
+
+# -------------------------------------------------------------------
+# 3. 사용자 shard 병렬 실행
+# -------------------------------------------------------------------
+def _refresh_shard(tasks, month, popular):
+    """
+    tasks: [(user_id, {갱신할 kind}), ...]. 재생 기록이 바뀌면 most_played 와 genre_mix 를 함께 갱신.
+    (갱신한 수 Counter, 실패한 tasks) 반환
+    """
+    done, failed = Counter(), []
+    try:
+        for user_id, kinds in tasks:
+            try:
+                if Playlist.KIND_MOST_PLAYED in kinds:
+                    refresh_most_played(user_id, month)
+                    done[Playlist.KIND_MOST_PLAYED] += 1
+                    done[Playlist.KIND_GENRE_MIX] += refresh_genre_mixes(user_id, month, popular)
+                if Playlist.KIND_RECENT_FAVORITES in kinds:
+                    refresh_recent_favorites(user_id)
+                    done[Playlist.KIND_RECENT_FAVORITES] += 1
+            except Exception:
+                logger.exception("smart playlist refresh failed for user %s", user_id)
+                failed.append((user_id, kinds))
+    finally:
+        # 스레드별 DB 연결 정리
+        connections.close_all()
+    return done, failed
+
+
+def refresh_smart_playlists(workers: int | None = None, batch_size: int = 5000, user_ids=(), progress=None) -> Counter:
+    """
+    새 기록이 있는 사용자의 자동 생성 플레이리스트 갱신. {kind: 갱신한 수, "users": 사용자 수, "failed": 실패 수} 반환.
+    user_ids: 새 기록과 관계없이 전부 다시 계산할 사용자
+    """
+    workers = workers or settings.SMART_PLAYLIST_WORKERS
+    now = timezone.now()
+    month = month_bucket(now)
+    tasks = {}
+    for user_id in apply_new_plays(batch_size):
+        tasks.setdefault(user_id, set()).add(Playlist.KIND_MOST_PLAYED)
+    for user_id in new_favorite_users(batch_size):
+        tasks.setdefault(user_id, set()).add(Playlist.KIND_RECENT_FAVORITES)
+    month_start = timezone.make_aware(datetime.combine(month, time.min))
+    rolled_over = Playlist.objects.filter(kind=Playlist.KIND_MOST_PLAYED, updated_at__lt=month_start)
+    for user_id in rolled_over.values_list("user_id", flat=True):
+        tasks.setdefault(user_id, set()).add(Playlist.KIND_MOST_PLAYED)
+    for user_id in user_ids:
+        tasks[user_id] = {Playlist.KIND_MOST_PLAYED, Playlist.KIND_RECENT_FAVORITES}
+    # 이번 달 목록만 쓰므로 지난 집계는 정리
+    UserTrackPlayCount.objects.filter(month__lt=month).delete()
+    if progress:
+        progress(f"{len(tasks)} users to refresh")
+
+    shards = [[] for _ in range(max(workers, 1))]
+    for user_id, kinds in sorted(tasks.items()):
+        shards[user_id % len(shards)].append((user_id, kinds))
+    popular = lru_cache(maxsize=None)(popular_in_genre)
+    result, failed = Counter(users=len(tasks)), []
+    with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="smart-playlists") as pool:
+        for done, shard_failed in pool.map(_refresh_shard, shards, [month] * len(shards), [popular] * len(shards)):
+            result.update(done)
+            failed += shard_failed
+    if failed:
+        # watermark 는 이미 넘어갔으므로 (잠금 대기/교착 등) 실패한 사용자는 한 번 더, 순서대로
+        if progress:
+            progress(f"retrying {len(failed)} failed users")
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="smart-playlists") as pool:
+            done, failed = pool.submit(_refresh_shard, failed, month, popular).result()
+        result.update(done)
+        result["failed"] = len(failed)
+    return result
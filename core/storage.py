@@ -0,0 +1,392 @@
+# core/storage.py
+"""
+오디오 파일 저장소 (settings.STORAGE_BACKEND).
+
+- S3Storage   : 기존 core/s3.py 의 클라이언트/서명/presigned URL 캐시를 그대로 사용
+- LocalStorage: STORAGE_LOCAL_ROOT 아래 파일로 저장 (개발/온프레미스, AWS 불필요).
+  presigned URL 대신 같은 방식의 서명 URL(만료 시각 + HMAC)을 발급하고, `local_file` view 가 제공한다:
+  - GET/HEAD: Range 요청(206) 지원, FileResponse 로 전송 (gunicorn 등은 wsgi.file_wrapper → sendfile)
+  - STORAGE_LOCAL_ACCEL_REDIRECT 지정 시 X-Accel-Redirect 로 전송 자체를 nginx 에 넘긴다 (Range 도 nginx 가 처리)
+  - PUT: presigned PUT 과 같은 업로드 (본문을 chunk 단위로 파일에 기록)
+
+스트림 URL 발급(stream/stream_batch), 업로드 URL 발급(presigned_upload/bulk_import),
+트랜스코딩(core/transcode.py)은 모두 이 인터페이스만 사용한다.
+"""
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from email.utils import formatdate
+from urllib.parse import quote, urlencode
+
+from asgiref.sync import sync_to_async
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+
+from . import metrics, s3
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _content_type(key: str, content_type: str | None) -> str:
+    return content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class BaseStorage:
+    def sign_get(self, key: str, expires: int | None = None) -> str:
+        """클라이언트가 직접 받아갈 수 있는 GET URL (expires 초 동안 유효)."""
+        raise NotImplementedError
+
+    async def asign_get(self, key: str, expires: int | None = None) -> str:
+        """sign_get 의 async 버전 (기본: 스레드 풀에서 실행)."""
+        return await sync_to_async(self.sign_get, thread_sensitive=False)(key, expires)
+
+    def sign_put(self, key: str, content_type: str | None = None, expires: int | None = None) -> str:
+        """클라이언트가 직접 업로드할 PUT URL (요청의 Content-Type 이 content_type 과 같아야 한다)."""
+        raise NotImplementedError
+
+    def head(self, key: str) -> dict | None:
+        """{"size", "content_type"}, 없으면 None."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """삭제 (없는 key 는 무시)."""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str):
+        """prefix(예: hls/<id>/<version>/) 아래 전체 삭제."""
+        raise NotImplementedError
+
+    def download(self, key: str, path: str):
+        """key 의 내용을 로컬 파일 path 로 저장."""
+        raise NotImplementedError
+
+    def upload(self, path: str, key: str, content_type: str | None = None):
+        """로컬 파일 path 를 key 로 저장 (같은 key 가 있으면 덮어쓴다)."""
+        raise NotImplementedError
+
+    def read(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    @contextmanager
+    def local_path(self, key: str):
+        """key 를 로컬 파일 경로로 (기본: 임시 파일로 내려받고 블록이 끝나면 삭제)."""
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            self.download(key, path)
+            yield path
+        finally:
+            os.unlink(path)
+
+
+class S3Storage(BaseStorage):
+    def sign_get(self, key, expires=None):
+        return s3.create_presigned_get_url(key, expires)
+
+    async def asign_get(self, key, expires=None):
+        # 캐시 hit 은 이벤트 루프에서 바로 반환
+        return await s3.acreate_presigned_get_url(key, expires)
+
+    def sign_put(self, key, content_type=None, expires=None):
+        return s3.create_presigned_put_url(key, content_type, expires)
+
+    def head(self, key):
+        try:
+            obj = s3._s3().head_object(Bucket=s3.AWS_S3_BUCKET, Key=s3._full_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {"size": obj["ContentLength"], "content_type": obj.get("ContentType", "")}
+
+    def delete(self, key):
+        s3._s3().delete_object(Bucket=s3.AWS_S3_BUCKET, Key=s3._full_key(key))
+        s3.invalidate_presigned_get_url(key)
+
+    def delete_prefix(self, prefix):
+        client = s3._s3()
+        pages = client.get_paginator("list_objects_v2").paginate(Bucket=s3.AWS_S3_BUCKET, Prefix=s3._full_key(prefix))
+        for page in pages:
+            # 한 페이지는 최대 1000 개 = delete_objects 한 번의 한도
+            objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if objects:
+                client.delete_objects(Bucket=s3.AWS_S3_BUCKET, Delete={"Objects": objects, "Quiet": True})
+
+    def download(self, key, path):
+        s3._s3().download_file(s3.AWS_S3_BUCKET, s3._full_key(key), path)
+
+    def upload(self, path, key, content_type=None):
+        s3._s3().upload_file(
+            path, s3.AWS_S3_BUCKET, s3._full_key(key), ExtraArgs={"ContentType": _content_type(key, content_type)}
+        )
+
+    def read(self, key):
+        return s3._s3().get_object(Bucket=s3.AWS_S3_BUCKET, Key=s3._full_key(key))["Body"].read()
+
+
+class LocalStorage(BaseStorage):
+    SALT = "core.storage.local"
+
+    def __init__(self, root: str | None = None):
+        self.root = os.path.abspath(root or settings.STORAGE_LOCAL_ROOT)
+        self.signer = signing.Signer(salt=self.SALT)
+
+    def path(self, key: str) -> str:
+        # safe_join: '../' 등으로 root 밖을 가리키는 key 는 SuspiciousFileOperation
+        return safe_join(self.root, key.lstrip("/"))
+
+    # ---------------------------------------------------------------
+    # 서명 URL (S3 presigned URL 과 같은 형태: 만료 시각 + 서명)
+    # ---------------------------------------------------------------
+    @staticmethod
+    def _payload(method: str, key: str, expires_at: int, content_type: str = "") -> str:
+        return f"{method}\n{key}\n{expires_at}\n{content_type}"
+
+    def _signed_url(self, method: str, key: str, expires: int | None, content_type: str = "") -> str:
+        expires_at = int(time.time()) + int(expires or settings.AWS_PRESIGNED_EXPIRE_SECONDS)
+        with metrics.timer("s3"):
+            signature = self.signer.signature(self._payload(method, key, expires_at, content_type))
+        path = reverse("storage-file", kwargs={"key": key})
+        query = urlencode({"expires": expires_at, "signature": signature})
+        return f"{settings.SITE_URL.rstrip('/')}{path}?{query}"
+
+    def verify(self, method: str, key: str, expires_at: str, signature: str, content_type: str = "") -> bool:
+        if not expires_at.isdigit() or int(expires_at) < time.time():
+            return False
+        expected = self.signer.signature(self._payload(method, key, int(expires_at), content_type))
+        return constant_time_compare(expected, signature)
+
+    def sign_get(self, key, expires=None):
+        return self._signed_url("GET", key, expires)
+
+    async def asign_get(self, key, expires=None):
+        # HMAC 하나라 스레드로 넘기는 비용이 더 크다
+        return self.sign_get(key, expires)
+
+    def sign_put(self, key, content_type=None, expires=None):
+        return self._signed_url("PUT", key, expires, _content_type(key, content_type))
+
+    # ---------------------------------------------------------------
+    # 파일
+    # ---------------------------------------------------------------
+    def head(self, key):
+        try:
+            size = os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+        return {"size": size, "content_type": _content_type(key, None)}
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_prefix(self, prefix):
+        shutil.rmtree(self.path(prefix), ignore_errors=True)
+
+    def download(self, key, path):
+        shutil.copyfile(self.path(key), path)
+
+    def _write(self, key: str, write):
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # 같은 디렉터리의 임시 파일에 쓴 뒤 rename: 읽는 쪽이 쓰다 만 파일을 보지 않도록
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                write(out)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def upload(self, path, key, content_type=None):
+        def write(out):
+            with open(path, "rb") as src:
+                shutil.copyfileobj(src, out, CHUNK_SIZE)
+
+        self._write(key, write)
+
+    def read(self, key):
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    @contextmanager
+    def local_path(self, key):
+        # 이미 로컬 파일이므로 복사하지 않는다
+        yield self.path(key)
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> BaseStorage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = import_string(getattr(settings, "STORAGE_BACKEND", "core.storage.S3Storage"))()
+    return _storage
+
+
+def new_audio_key(filename: str) -> str:
+    """새 오디오 파일의 저장소 key (원본 확장자 유지)."""
+    return f"{settings.AWS_S3_AUDIO_PREFIX}{uuid.uuid4().hex}{os.path.splitext(filename)[1]}"
+
+
+def new_audio_upload(filename: str, content_type: str | None = None, expires: int | None = None) -> dict:
+    """
+    새 오디오 파일 업로드용 key 생성 + PUT URL 발급.
+    (TrackViewSet.presigned_upload / 곡 일괄 등록에서 공용)
+    """
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "audio/mpeg"
+    key = new_audio_key(filename)
+    url = get_storage().sign_put(key, content_type, expires)
+    return {"key": key, "url": url, "content_type": content_type}
+
+
+# -------------------------------------------------------------------
+# LocalStorage 파일 제공 view (GET/HEAD/PUT /api/storage/<key>?expires=&signature=)
+# -------------------------------------------------------------------
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _RangeFile:
+    """파일의 [start, start+length) 구간만 읽히는 file-like (FileResponse / wsgi.file_wrapper 용)."""
+
+    def __init__(self, f, length: int):
+        self._f = f
+        self._remaining = length
+        self.name = f.name
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+    # gunicorn 등의 sendfile 은 fileno/tell + Content-Length 만큼만 보낸다
+    def fileno(self):
+        return self._f.fileno()
+
+    def tell(self):
+        return self._f.tell()
+
+    def close(self):
+        self._f.close()
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    단일 'bytes=' Range 의 (start, end) (end 포함). 형식이 다르거나 여러 구간이면 None (전체 전송).
+    만족할 수 없는 구간이면 ValueError.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 'bytes=-N': 마지막 N 바이트
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _serve(storage: LocalStorage, request, key: str, path: str):
+    size = os.path.getsize(path)
+    content_type = _content_type(key, None)
+    try:
+        byte_range = parse_range(request.headers.get("Range", ""), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+
+    accel = getattr(settings, "STORAGE_LOCAL_ACCEL_REDIRECT", "")
+    if accel:
+        # nginx 가 internal location 에서 파일을 보낸다 (Range 처리 포함)
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = f"{accel.rstrip('/')}/{quote(key.lstrip('/'))}"
+    elif request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+        response["Content-Length"] = length
+    else:
+        f = open(path, "rb")
+        f.seek(start)
+        response = FileResponse(_RangeFile(f, length), content_type=content_type)
+        # FileResponse 는 파일 끝까지를 길이로 잡으므로 구간 길이로 덮어쓴다
+        response["Content-Length"] = length
+    if byte_range and not accel:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = formatdate(os.path.getmtime(path), usegmt=True)
+    # 서명 URL 이 만료되기 전까지만 (같은 URL 의 seek 요청은 브라우저 캐시 사용)
+    max_age = max(int(request.GET["expires"]) - int(time.time()), 0)
+    response["Cache-Control"] = f"private, max-age={max_age}"
+    return response
+
+
+def _receive(storage: LocalStorage, request, key: str):
+    def write(out):
+        while True:
+            chunk = request.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            out.write(chunk)
+
+    storage._write(key, write)
+    return HttpResponse(status=200)
+
+
+@csrf_exempt
+def local_file(request, key):
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        return HttpResponse(status=404)
+    if request.method not in ("GET", "HEAD", "PUT"):
+        return HttpResponseNotAllowed(["GET", "HEAD", "PUT"])
+    # HEAD 는 같은 GET URL 로 (S3 presigned GET 과 동일)
+    method = "PUT" if request.method == "PUT" else "GET"
+    content_type = request.content_type if method == "PUT" else ""
+    if not storage.verify(
+        method, key, request.GET.get("expires", ""), request.GET.get("signature", ""), content_type
+    ):
+        return HttpResponse("invalid or expired signature", status=403, content_type="text/plain")
+    try:
+        path = storage.path(key)
+    except SuspiciousFileOperation:
+        return HttpResponse(status=404)
+    if method == "PUT":
+        return _receive(storage, request, key)
+    if not os.path.isfile(path):
+        return HttpResponse(status=404)
+    return _serve(storage, request, key, path)
@@ -0,0 +1,130 @@
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient, APITestCase
+
+from .management.commands.check_query_plans import plan_problems, plan_queries
+from .models import Favorite, Playlist, Track, User
+from .playlist_order import add_tracks
+
+
+class ListQueryCountTests(APITestCase):
+    """목록 API 의 쿼리 수는 페이지 크기와 무관하게 고정 (N+1 회귀 방지)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("listener", password="pw")
+        tracks = [
+            Track.objects.create(title=f"track {i}", artist="artist", genre="pop", audio_s3_key=f"audio/{i}.mp3")
+            for i in range(12)
+        ]
+        for track in tracks:
+            Favorite.objects.create(user=cls.user, track=track)
+        for i in range(12):
+            playlist = Playlist.objects.create(user=cls.user, name=f"playlist {i}")
+            add_tracks(playlist.pk, [t.pk for t in tracks[: i + 1]])
+
+    def setUp(self):
+        # 곡 목록 응답 캐시(core/cache.py)가 쿼리를 가리지 않도록
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertListQueries(self, url, expected, params=None, sizes=(2, 10)):
+        """page_size 를 바꿔도 쿼리 수가 expected 로 같은지 (sizes=None 이면 기본 페이지 한 번)."""
+        for page_size in sizes or (None,):
+            cache.clear()
+            query = {**(params or {}), **({"page_size": page_size} if page_size else {})}
+            with self.assertNumQueries(expected):
+                response = self.client.get(url, query)
+            self.assertEqual(response.status_code, 200)
+            if page_size:
+                self.assertEqual(len(response.json()["results"]), page_size)
+
+    def test_track_list(self):
+        # is_favorited 는 같은 쿼리의 서브쿼리로
+        self.assertListQueries("/api/tracks/", 1)
+
+    def test_track_list_anonymous(self):
+        self.client.force_authenticate(None)
+        self.assertListQueries("/api/tracks/", 1)
+
+    def test_track_list_filtered(self):
+        self.assertListQueries("/api/tracks/", 1, {"genre": "pop", "ordering": "-play_count"})
+
+    def test_playlist_list(self):
+        # PageNumberPagination 의 COUNT + 목록 + items(곡 포함) prefetch, 곡 수가 다른 12 개가 한 페이지
+        self.assertListQueries("/api/playlists/", 3, sizes=None)
+
+    def test_playlist_list_compact(self):
+        self.assertListQueries("/api/playlists/", 3, {"view": "compact"}, sizes=None)
+
+    def test_favorite_list(self):
+        self.assertListQueries("/api/favorites/", 1)
+
+
+class PlaylistQueryCountTests(APITestCase):
+    """플레이리스트 상세·곡 추가/제거의 쿼리 수는 플레이리스트의 곡 수나 한 번에 다루는 곡 수와 무관하게 고정."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.tracks = [
+            Track.objects.create(title=f"track {i}", artist="artist", genre="pop", audio_s3_key=f"audio/{i}.mp3")
+            for i in range(12)
+        ]
+        cls.small = Playlist.objects.create(user=cls.user, name="small")
+        add_tracks(cls.small.pk, [t.pk for t in cls.tracks[:2]])
+        cls.large = Playlist.objects.create(user=cls.user, name="large")
+        add_tracks(cls.large.pk, [t.pk for t in cls.tracks[:10]])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertPlaylistQueries(self, expected, method, path, cases):
+        """cases 의 (playlist, data) 마다 같은 쿼리 수 expected 인지."""
+        for playlist, data in cases:
+            url = f"/api/playlists/{playlist.pk}/{path}"
+            with self.subTest(playlist=playlist.name, data=data), self.assertNumQueries(expected):
+                response = getattr(self.client, method)(url, data)
+            self.assertEqual(response.status_code, 200, response.content)
+
+    def test_retrieve(self):
+        # 플레이리스트 + items(곡 포함) prefetch
+        self.assertPlaylistQueries(2, "get", "", [(self.small, None), (self.large, None)])
+
+    def test_retrieve_compact(self):
+        self.assertPlaylistQueries(2, "get", "", [(self.small, {"view": "compact"}), (self.large, {"view": "compact"})])
+
+    def test_add(self):
+        # 조회 + 트랜잭션(SAVEPOINT/RELEASE, 잠금, 중복 곡, 곡 길이, 마지막 순서, bulk insert, 합계 갱신) + 응답용 재조회 2
+        self.assertPlaylistQueries(11, "post", "add/", [
+            (self.small, {"track_ids": [str(self.tracks[11].pk)]}),
+            (self.large, {"track_ids": [str(t.pk) for t in self.tracks[10:12]]}),
+        ])
+
+    def test_remove(self):
+        # 조회 + 트랜잭션(SAVEPOINT/RELEASE, 잠금, 대상 행, DELETE, 합계 갱신) + 응답용 재조회 2
+        self.assertPlaylistQueries(9, "post", "remove/", [
+            (self.small, {"track_ids": [str(self.tracks[0].pk)]}),
+            (self.large, {"track_ids": [str(t.pk) for t in self.tracks[:5]]}),
+        ])
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN 형식은 SQLite 기준")
+class QueryPlanTests(TestCase):
+    """`manage.py check_query_plans` 와 같은 검사: 목록/다음 페이지 조회가 의도한 인덱스를 쓰고 전체 스캔·임시 정렬이 없다."""
+
+    def test_list_query_plans(self):
+        for name, queryset in plan_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertEqual(plan_problems(plan, name), [], plan)
+
+    def test_missing_index_is_reported(self):
+        plan = "SEARCH core_track USING INDEX core_track_title_19d564_idx (title>?)"
+        self.assertEqual(len(plan_problems(plan, "track-list genre")), 1)
+        self.assertEqual(plan_problems("SCAN core_track", None), ["SCAN core_track"])
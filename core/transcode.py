@@ -0,0 +1,342 @@
+# core/transcode.py
+"""
+업로드된 원본 오디오 → 여러 비트레이트 HLS (stream 응답의 manifest_url 로 적응형 재생).
+
+흐름 (곡 하나):
+1. 저장소(core/storage.py)에서 원본을 로컬 파일로 (LocalStorage 는 복사 없이 원본 경로 그대로)
+2. TRANSCODE_BITRATES 의 variant 마다 작업 하나를 프로세스 풀에 제출 (core/codecs.py, ffmpeg 또는 stub)
+3. master.m3u8 작성 후 결과물을 hls/<track id>/<version>/ 아래에 업로드
+4. 원본 key 가 그사이 바뀌지 않았을 때만 Track 에 manifest key / variant 목록 기록 (transcode_status=ready)
+   후 이전 버전 prefix 를 삭제. 실패하거나 결과를 버리면(stale) 이번에 올린 prefix 를 삭제
+5. 같은 원본으로 분석 작업(core/audio.py: 길이·비트레이트·샘플레이트 + 파형)도 풀에서 함께 실행해
+   TrackAnalysis 에 저장하고 Track.duration_sec 를 실제 길이로 맞춘다 (분석 실패는 변환 결과에 영향 없음)
+
+- 프로세스 풀은 TRANSCODE_WORKERS 개로 고정, spawn 으로 띄운다 (웹 워커의 DB 연결/스레드를 fork 하지 않도록)
+- 동시에 처리 중인 곡 수는 TRANSCODE_MAX_PENDING 개까지: 넘치면 enqueue 가 TranscodeQueueFull
+- 새 곡이나 audio_s3_key 가 바뀐 곡은 transcode_status=pending (core/signals.py).
+  `manage.py transcode_tracks` 가 처리하고, 관리자는 POST /api/tracks/{id}/transcode/ 로 바로 요청할 수 있다
+- 워커가 죽어 TRANSCODE_STALE_SECONDS 넘게 processing 으로 남은 곡은 `transcode_tracks` 가 다시 pending 으로
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .audio import analyze
+from .cache import bump_catalog_version
+from .codecs import PLAYLIST_NAME, transcode_variant
+from .counters import set_track_duration
+from .db_router import pin_catalog_reads
+from .models import Track, TrackAnalysis
+from .storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+HLS_PREFIX = "hls/"
+MASTER_NAME = "master.m3u8"
+AAC_LC = "mp4a.40.2"
+TOKEN_SALT = "hls-playlist"
+# 저장된 playlist 는 버전 경로라 내용이 바뀌지 않는다 (재서명만 요청마다)
+PLAYLIST_CACHE_TIMEOUT = 3600
+# 길이를 모르는 곡의 playlist 토큰/세그먼트 URL 유효 시간 계산용 (초)
+UNKNOWN_DURATION_SECONDS = 3 * 3600
+
+
+class TranscodeQueueFull(Exception):
+    pass
+
+
+def variant_name(bitrate: int) -> str:
+    return f"{bitrate}k"
+
+
+# -------------------------------------------------------------------
+# 풀
+# -------------------------------------------------------------------
+class TranscodePool:
+    """
+    variant/분석 작업용 프로세스 풀 + 곡 단위 작업(다운로드/업로드/DB 갱신)용 스레드 풀.
+    곡 단위 작업 수를 semaphore 로 제한해 프로세스 풀 내부 큐가 끝없이 쌓이지 않게 한다.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.processes = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.threads = ThreadPoolExecutor(max_workers=max_pending, thread_name_prefix="transcode")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args):
+        return self.processes.submit(fn, *args)
+
+    def enqueue(self, track_id, block: bool = False, timeout: float | None = None, **kwargs):
+        """곡 하나를 백그라운드에서 처리. 자리가 없으면 (block=False) TranscodeQueueFull."""
+        if not self._slots.acquire(blocking=block, timeout=timeout if block else None):
+            raise TranscodeQueueFull()
+        try:
+            future = self.threads.submit(_run_in_thread, track_id, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True):
+        self.threads.shutdown(wait=wait)
+        self.processes.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> TranscodePool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TranscodePool(settings.TRANSCODE_WORKERS, settings.TRANSCODE_MAX_PENDING)
+    return _pool
+
+
+@atexit.register
+def shutdown_pool(wait: bool = True):
+    """진행 중인 곡을 마치고 풀 종료 (다음 get_pool 은 새 풀을 만든다)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+def enqueue(track_id, block: bool = False, timeout: float | None = None, **kwargs):
+    return get_pool().enqueue(track_id, block=block, timeout=timeout, **kwargs)
+
+
+def _run_in_thread(track_id, kwargs):
+    try:
+        return transcode_track(track_id, **kwargs)
+    finally:
+        # 스레드별 DB 연결 정리
+        connections.close_all()
+
+
+# -------------------------------------------------------------------
+# 곡 단위 처리
+# -------------------------------------------------------------------
+def master_playlist(variants: list[dict]) -> str:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for v in variants:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={v["bandwidth"]},CODECS="{AAC_LC}"')
+        lines.append(f'{variant_name(v["bitrate"])}.m3u8')
+    return "\n".join(lines) + "\n"
+
+
+def transcode_track(track_id, codec: str | None = None) -> str:
+    """
+    곡 하나를 HLS 로 변환. 최종 transcode_status 를 반환
+    (작업 중 원본이 바뀌었으면 결과를 버리고 'stale' — 바뀐 원본은 다시 pending 상태).
+    """
+    codec = codec or settings.TRANSCODE_CODEC
+    track = Track.objects.only("id", "audio_s3_key", "hls_manifest_key").get(pk=track_id)
+    source_key = track.audio_s3_key
+    current = Track.objects.filter(pk=track.pk, audio_s3_key=source_key)
+    current.update(transcode_status=Track.TRANSCODE_PROCESSING, transcode_started_at=timezone.now())
+
+    storage = get_storage()
+    pool = get_pool()
+    prefix = f"{HLS_PREFIX}{track.pk.hex}/{uuid.uuid4().hex[:8]}/"
+    try:
+        with tempfile.TemporaryDirectory(prefix="transcode-") as tmp, storage.local_path(source_key) as source:
+            analysis = pool.submit(
+                analyze, source, settings.WAVEFORM_POINTS, codec, settings.TRANSCODE_FFMPEG, settings.TRANSCODE_TIMEOUT
+            )
+            futures = [
+                pool.submit(
+                    transcode_variant, codec, source, os.path.join(tmp, variant_name(bitrate)), bitrate,
+                    settings.TRANSCODE_SEGMENT_SECONDS, settings.TRANSCODE_FFMPEG, settings.TRANSCODE_TIMEOUT,
+                )
+                for bitrate in settings.TRANSCODE_BITRATES
+            ]
+            results = [f.result(timeout=settings.TRANSCODE_TIMEOUT) for f in futures]
+            try:
+                info = analysis.result(timeout=settings.TRANSCODE_TIMEOUT)
+            except Exception:
+                logger.warning("audio analysis failed for track %s (%s)", track.pk, source_key, exc_info=True)
+                info = None
+
+            variants = []
+            for r in results:
+                name = variant_name(r["bitrate"])
+                for filename in r["segments"]:
+                    storage.upload(os.path.join(tmp, name, filename), f"{prefix}{name}/{filename}", "video/mp2t")
+                storage.upload(
+                    os.path.join(tmp, name, PLAYLIST_NAME), f"{prefix}{name}/{PLAYLIST_NAME}",
+                    "application/vnd.apple.mpegurl",
+                )
+                # 컨테이너 오버헤드를 감안해 선언 대역폭을 약간 높게
+                variants.append({"bitrate": r["bitrate"], "bandwidth": int(r["bitrate"] * 1000 * 1.1)})
+            master_path = os.path.join(tmp, MASTER_NAME)
+            with open(master_path, "w") as f:
+                f.write(master_playlist(variants))
+            storage.upload(master_path, f"{prefix}{MASTER_NAME}", "application/vnd.apple.mpegurl")
+    except Exception:
+        logger.exception("transcode failed for track %s (%s)", track.pk, source_key)
+        current.update(transcode_status=Track.TRANSCODE_FAILED)
+        _delete_hls(storage, prefix)
+        return Track.TRANSCODE_FAILED
+
+    # 그사이 같은 원본의 다른 변환이 먼저 끝났으면(manifest 가 바뀜) 그쪽 결과를 유지하고 이번 결과를 버린다
+    updated = current.filter(hls_manifest_key=track.hls_manifest_key).update(
+        transcode_status=Track.TRANSCODE_READY, hls_manifest_key=f"{prefix}{MASTER_NAME}", hls_variants=variants
+    )
+    if not updated:
+        _delete_hls(storage, prefix)
+        return "stale"
+    if track.hls_manifest_key:
+        # 같은 원본을 다시 변환한 경우의 이전 버전 (원본이 바뀌면 signal 이 manifest 를 비운다).
+        # 이전 버전을 재생 중이던 클라이언트는 stream 을 다시 요청하면 새 버전을 받는다
+        _delete_hls(storage, track.hls_manifest_key.rsplit("/", 1)[0] + "/")
+    if info is not None:
+        save_analysis(track.pk, source_key, info)
+    return Track.TRANSCODE_READY
+
+
+def _delete_hls(storage, prefix: str):
+    """변환 결과 prefix 삭제. 실패해도 변환 결과에는 영향 없이 로그만 (남은 파일은 참조되지 않는다)."""
+    if not prefix.startswith(HLS_PREFIX):
+        return
+    try:
+        storage.delete_prefix(prefix)
+    except Exception:
+        logger.warning("could not delete %s", prefix, exc_info=True)
+
+
+def stale_processing():
+    """TRANSCODE_STALE_SECONDS 넘게 processing 인 곡 (변환 중 워커가 죽은 경우)."""
+    cutoff = timezone.now() - timedelta(seconds=settings.TRANSCODE_STALE_SECONDS)
+    return Track.objects.filter(transcode_status=Track.TRANSCODE_PROCESSING).filter(
+        Q(transcode_started_at__lt=cutoff) | Q(transcode_started_at__isnull=True)
+    )
+
+
+def reset_stale_processing() -> int:
+    """멈춘 processing 곡을 pending 으로 되돌린다. 되돌린 곡 수를 반환."""
+    return stale_processing().update(transcode_status=Track.TRANSCODE_PENDING)
+
+
+def save_analysis(track_id, source_key: str, info: dict) -> bool:
+    """분석 결과 저장 + Track.duration_sec 갱신 (그사이 원본이 바뀌었으면 버리고 False)."""
+    with transaction.atomic():
+        if not Track.objects.filter(pk=track_id, audio_s3_key=source_key).exists():
+            return False
+        TrackAnalysis.objects.update_or_create(
+            track_id=track_id,
+            defaults={
+                "source_key": source_key,
+                **{f: info[f] for f in ("format", "duration_ms", "bitrate", "sample_rate", "channels", "waveform")},
+            },
+        )
+        duration_changed = set_track_duration(track_id, round(info["duration_ms"] / 1000))
+    if duration_changed:
+        # .update() 는 signal 을 보내지 않으므로 Track 저장 시와 같은 캐시 무효화 (core/signals.py)
+        bump_catalog_version()
+        pin_catalog_reads()
+    return True
+
+
+# -------------------------------------------------------------------
+# 재생 (stream 응답 / playlist view)
+# -------------------------------------------------------------------
+def playlist_token(track) -> str:
+    """
+    playlist view 용 서명 토큰: manifest 위치와 variant, 곡 길이를 담아 playlist 요청은 DB 조회 없이 처리한다.
+    """
+    bitrates = [v["bitrate"] for v in track.hls_variants]
+    return signing.dumps(
+        {"t": track.pk.hex, "m": track.hls_manifest_key, "v": bitrates, "d": track.duration_sec}, salt=TOKEN_SALT
+    )
+
+
+def url_lifetime(duration_sec, expires: int) -> int:
+    """
+    playlist 토큰/세그먼트 URL 유효 시간: expires + 곡 길이.
+    플레이어는 variant playlist 를 재생 시작 때 한 번만 받으므로 마지막 세그먼트까지 서명이 유효해야 한다.
+    """
+    return expires + (duration_sec or UNKNOWN_DURATION_SECONDS)
+
+
+def load_playlist_token(token: str, track_id, expires: int) -> tuple[str, list[int], int]:
+    """
+    토큰의 (manifest key, variant 비트레이트, URL 유효 시간).
+    발급 후 url_lifetime 이 지났거나 다른 곡의 토큰/위조면 signing.BadSignature (만료는 SignatureExpired).
+    """
+    signer = signing.TimestampSigner(salt=TOKEN_SALT)
+    data = signer.unsign_object(token)
+    lifetime = url_lifetime(data.get("d"), expires)
+    signer.unsign(token, max_age=lifetime)
+    if data.get("t") != track_id.hex:
+        raise signing.BadSignature("track mismatch")
+    return data["m"], data["v"], lifetime
+
+
+def hls_payload(request, track) -> dict:
+    """stream 응답에 붙일 HLS 정보 (변환 전이면 빈 dict: 클라이언트는 원본 url 로 재생)."""
+    if not track.hls_manifest_key:
+        return {}
+    token = playlist_token(track)
+
+    def url(name):
+        path = reverse("track-hls", kwargs={"pk": track.pk, "name": name})
+        return request.build_absolute_uri(f"{path}?token={token}")
+
+    return {
+        "manifest_url": url("master"),
+        "variants": [
+            {"bitrate": v["bitrate"], "bandwidth": v["bandwidth"], "url": url(variant_name(v["bitrate"]))}
+            for v in track.hls_variants
+        ],
+    }
+
+
+def _stored_playlist(key: str) -> str:
+    cache_key = f"hls:playlist:{key}"
+    text = cache.get(cache_key)
+    if text is None:
+        text = get_storage().read(key).decode()
+        cache.set(cache_key, text, PLAYLIST_CACHE_TIMEOUT)
+    return text
+
+
+def render_playlist(manifest_key: str, bitrates: list[int], name: str, token: str, expires: int) -> str:
+    """
+    master: variant playlist 경로에 토큰을 붙인다.
+    variant: 세그먼트 파일명을 저장소 GET URL(S3 presigned 는 서명 캐시 사용)로 바꾼다.
+    없는 variant 면 KeyError.
+    """
+    prefix = manifest_key.rsplit("/", 1)[0] + "/"
+    if name == "master":
+        text = _stored_playlist(manifest_key)
+        return "".join(
+            line if line.startswith("#") or not line.strip() else f"{line.rstrip()}?token={token}\n"
+            for line in text.splitlines(keepends=True)
+        )
+    if name not in {variant_name(b) for b in bitrates}:
+        raise KeyError(name)
+    storage = get_storage()
+    text = _stored_playlist(f"{prefix}{name}/{PLAYLIST_NAME}")
+    return "".join(
+        line if line.startswith("#") or not line.strip() else storage.sign_get(f"{prefix}{name}/{line.strip()}", expires) + "\n"
+        for line in text.splitlines(keepends=True)
+    )
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from . import async_views
+from .async_views import play_events
+from .storage import local_file
 from .views import (
     RegisterView,
     MeView,
+    RecommendationsView,
     TrackViewSet,
     FavoriteViewSet,
     PlayHistoryViewSet,
@@ -12,6 +17,9 @@ from .views import (
     SendVerificationEmailView,
     VerifyEmailView,
     PasswordChangeView,
+    LogoutView,
+    MetricsView,
+    HlsPlaylistView,
 )
 
 router = DefaultRouter()
@@ -28,10 +36,33 @@ urlpatterns = [
     path("auth/verify/send/", SendVerificationEmailView.as_view(), name="verify_send"),
     path("auth/verify/", VerifyEmailView.as_view(), name="verify"),
     path("auth/password/change/", PasswordChangeView.as_view(), name="password_change"),
+    path("auth/logout/", LogoutView.as_view(), name="logout"),
 
     # Me
     path("me/", MeView.as_view(), name="me"),
+    path("me/recommendations/", RecommendationsView.as_view(), name="me-recommendations"),
+
+    # 운영 계측 (관리자)
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+
+    # Events (SSE, ASGI 권장)
+    path("events/plays/", play_events, name="play_events"),
+
+    # HLS playlist (stream 응답의 manifest_url, 서명 토큰 인증)
+    path("tracks/<uuid:pk>/hls/<str:name>.m3u8", HlsPlaylistView.as_view(), name="track-hls"),
+
+    # STORAGE_BACKEND=LocalStorage 의 파일 GET(Range)/PUT (서명 URL)
+    path("storage/<path:key>", local_file, name="storage-file"),
 
     # Routers
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_API_VIEWS:
+    # 트래픽이 많은 조회 경로는 async 뷰로 (같은 URL/응답, router 보다 먼저 매칭)
+    urlpatterns[-1:-1] = [
+        path("tracks/", async_views.track_list, name="track-list"),
+        path("tracks/<uuid:pk>/", async_views.track_detail, name="track-detail"),
+        path("tracks/<uuid:pk>/stream/", async_views.track_stream, name="track-stream"),
+        path("history/", async_views.history_list, name="history-list"),
+    ]
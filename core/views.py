@@ -1,31 +1,96 @@
+import hashlib
 import os
-import mimetypes
 import uuid
 
 from django.conf import settings
 from django.core import signing
-from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.db.models import Exists, F, OuterRef, Prefetch, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.password_validation import validate_password
 
-from .models import Favorite, PlayHistory, Playlist, PlaylistTrack, Track, User
+from .audio import unpack_waveform
+from .auth import full_user, revoke_token
+from .cache import CatalogCacheMixin
+from .favorites import add_favorite, add_favorites, remove_favorite, remove_favorites, toggle_favorite
+from .history import recently_played_limit, save_position
+from . import metrics
+from .ingest import FORMATS as IMPORT_FORMATS, guess_format, import_tracks, iter_records
+from .models import Favorite, PlayHistory, Playlist, PlaylistTrack, RecentlyPlayed, Track, TrackAnalysis, User
+from .pagination import KeysetPagination
 from .permissions import IsAdminOrReadOnly, IsOwnerOrReadOnly
-from .s3 import create_presigned_get_url, create_presigned_put_url
+from .playlist_order import PlaylistOrderError, add_tracks, move_tracks, remove_tracks
+from .playevents import record_play, record_plays
+from .recommendations import recommended_track_ids, similar_tracks
+from .rollups import TRENDING_WINDOWS, trending_track_ids
+from .search import RankedOrderingFilter, TrackSearchFilter
 from .serializers import (
+    CatalogTrackSerializer,
+    CompactPlaylistSerializer,
+    FavoriteBulkSerializer,
     FavoriteSerializer,
+    PlaybackPositionSerializer,
     PlayHistorySerializer,
-    PlaylistItemSerializer,
+    PlaylistAddSerializer,
+    PlaylistRemoveSerializer,
+    PlaylistReorderSerializer,
     PlaylistSerializer,
+    RecentlyPlayedSerializer,
     RegisterSerializer,
     TrackSerializer,
     UserSerializer,
 )
+from .storage import get_storage, new_audio_upload
+from .transcode import (
+    TranscodeQueueFull,
+    enqueue as enqueue_transcode,
+    hls_payload,
+    load_playlist_token,
+    render_playlist,
+    stale_processing,
+)
+
+
+def parse_uuid_or_404(value):
+    """URL 의 곡 id 를 DB 조회 없이 검증 (잘못된 형식이면 404)."""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise NotFound()
+
+
+def limit_param(request, default: int = 20, maximum: int = 100) -> int:
+    """?limit= 를 1~maximum 으로 (정수가 아니면 400)."""
+    try:
+        return min(max(int(request.query_params.get("limit", default)), 1), maximum)
+    except ValueError:
+        raise ParseError("limit must be an integer")
+
+
+class WaveformBlobRenderer(BaseRenderer):
+    """GET /api/tracks/{id}/waveform/ 의 원본 blob (Accept: application/octet-stream, ?format=bin)"""
+    media_type = "application/octet-stream"
+    format = "bin"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
 
 # -------------------------------------------------------------------
 # Auth / Profile
@@ -40,7 +105,28 @@ class MeView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
 
     def get_object(self):
-        return self.request.user
+        # 수정 요청은 캐시가 아닌 DB 의 최신 인스턴스에 저장
+        return full_user(self.request, fresh=self.request.method not in SAFE_METHODS)
+
+
+class RecommendationsView(APIView):
+    """최근 재생/즐겨찾기 곡과 비슷한 곡 추천 (core/recommendations.py). 추천할 곡이 없으면 7일 트렌딩"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        limit = limit_param(request)
+        source = "similar"
+        ranked = recommended_track_ids(request.user.pk, limit)
+        if not ranked:
+            source = "trending"
+            ranked = trending_track_ids("7d", limit)
+        tracks = Track.objects.in_bulk([track_id for track_id, _ in ranked])
+        results = [
+            {"score": score, "track": TrackSerializer(tracks[track_id]).data}
+            for track_id, score in ranked
+            if track_id in tracks
+        ]
+        return Response({"source": source, "results": results})
 
 
 class SendVerificationEmailView(APIView):
@@ -48,7 +134,7 @@ class SendVerificationEmailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        user = request.user
+        user = full_user(request)
         if user.is_active:
             return Response({"detail": "이미 인증된 계정입니다."}, status=400)
         token = signing.dumps({"uid": user.pk}, salt="email-verify")
@@ -95,7 +181,7 @@ class PasswordChangeView(APIView):
         new_password = request.data.get("new_password")
         if not current_password or not new_password:
             return Response({"detail": "current_password, new_password 필요"}, status=400)
-        user = request.user
+        user = full_user(request, fresh=True)
         if not user.check_password(current_password):
             return Response({"detail": "현재 비밀번호 불일치"}, status=400)
         try:
@@ -107,57 +193,313 @@ class PasswordChangeView(APIView):
         return Response({"detail": "비밀번호가 변경되었습니다."})
 
 
+class LogoutView(APIView):
+    """현재 access token (+ body 의 refresh token) 을 만료 시각까지 무효화"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        refresh = request.data.get("refresh")
+        if refresh:
+            try:
+                refresh = RefreshToken(refresh)
+            except TokenError:
+                return Response({"detail": "잘못된 refresh token"}, status=400)
+            if refresh.get(jwt_settings.USER_ID_CLAIM) != request.user.pk:
+                return Response({"detail": "잘못된 refresh token"}, status=400)
+            revoke_token(refresh)
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    """이 워커의 요청 계측 (Prometheus text format, core/metrics.py)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # -------------------------------------------------------------------
 # Tracks
 # -------------------------------------------------------------------
-class TrackViewSet(viewsets.ModelViewSet):
+class HlsPlaylistView(APIView):
+    """
+    HLS playlist (stream 응답의 manifest_url / variants[].url).
+    플레이어는 Authorization 헤더를 붙일 수 없으므로 URL 의 서명 토큰으로 인증하고, DB 는 조회하지 않는다.
+    variant playlist 의 세그먼트는 요청마다 저장소 GET URL(presigned) 로 바꿔 준다.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk, name):
+        expires = int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600"))
+        token = request.query_params.get("token", "")
+        try:
+            manifest_key, bitrates, lifetime = load_playlist_token(token, pk, expires)
+        except signing.SignatureExpired:
+            raise PermissionDenied("token expired")
+        except signing.BadSignature:
+            raise PermissionDenied("invalid token")
+        try:
+            text = render_playlist(manifest_key, bitrates, name, token, lifetime)
+        except KeyError:
+            raise NotFound()
+        response = HttpResponse(text, content_type="application/vnd.apple.mpegurl")
+        response["Cache-Control"] = "private, no-store"
+        return response
+
+
+class TrackViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     queryset = Track.objects.all()
     serializer_class = TrackSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["genre", "artist", "is_published"]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, TrackSearchFilter, RankedOrderingFilter]
+    filterset_fields = {
+        "genre": ["exact"],
+        "artist": ["exact"],
+        "is_published": ["exact"],
+        "favorite_count": ["gte", "lte"],
+    }
     search_fields = ["title", "artist", "genre"]
-    ordering_fields = ["created_at", "title"]
+    ordering_fields = ["created_at", "title", "play_count", "favorite_count"]
     ordering = ["-created_at"]
+    catalog_cache_per_user = True
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = self.request.user
+        if self.action in ("list", "retrieve") and user.is_authenticated:
+            # 행마다 조회하지 않고 EXISTS 서브쿼리 하나로 즐겨찾기 여부 계산
+            qs = qs.annotate(
+                is_favorited=Exists(Favorite.objects.filter(user_id=user.pk, track_id=OuterRef("pk")))
+            )
+        return qs
+
+    def get_serializer_class(self):
+        if self.action in ("list", "retrieve"):
+            return CatalogTrackSerializer
+        return TrackSerializer
+
+    @action(methods=["get"], detail=False)
+    def trending(self, request):
+        """최근 24시간/7일 재생 수 상위 곡 (집계 테이블에서 조회)"""
+        window = request.query_params.get("window", "24h")
+        if window not in TRENDING_WINDOWS:
+            return Response({"detail": f"window must be one of {', '.join(TRENDING_WINDOWS)}"}, status=400)
+        ranked = trending_track_ids(window, limit_param(request))
+        tracks = Track.objects.in_bulk([track_id for track_id, _ in ranked])
+        results = [
+            {"plays": plays, "track": TrackSerializer(tracks[track_id]).data}
+            for track_id, plays in ranked
+            if track_id in tracks
+        ]
+        return Response({"window": window, "results": results})
+
+    @action(methods=["get"], detail=True)
+    def similar(self, request, pk=None):
+        """함께 듣는 곡 (build_similar_tracks 로 미리 계산). 로그인 사용자는 최근 재생한 곡 제외"""
+        user_id = request.user.pk if request.user.is_authenticated else None
+        tracks = similar_tracks(parse_uuid_or_404(pk), user_id, limit_param(request))
+        return Response({
+            "results": [{"score": t.similarity, "track": TrackSerializer(t).data} for t in tracks],
+        })
 
     @action(methods=["post"], detail=False, permission_classes=[IsAdminUser])
     def presigned_upload(self, request):
-        """관리자가 S3에 업로드하기 위한 PUT presigned URL 발급"""
+        """관리자가 저장소(S3 또는 로컬)에 업로드하기 위한 PUT presigned URL 발급"""
         filename = request.data.get("filename")
         if not filename:
             return Response({"detail": "filename required"}, status=400)
-        content_type = (
-            request.data.get("content_type")
-            or mimetypes.guess_type(filename)[0]
-            or "audio/mpeg"
-        )
-        prefix = os.getenv("AWS_S3_AUDIO_PREFIX", "audio/")
-        key = f"{prefix}{uuid.uuid4().hex}{os.path.splitext(filename)[1]}"
-        url = create_presigned_put_url(
-            key,
-            content_type,
+        upload = new_audio_upload(
+            filename,
+            request.data.get("content_type"),
             int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600")),
         )
-        return Response({"key": key, "url": url, "content_type": content_type})
+        return Response(upload)
+
+    @action(methods=["post"], detail=False, permission_classes=[IsAdminUser])
+    def bulk_import(self, request):
+        """
+        곡 메타데이터 일괄 등록 (JSONL/CSV).
+        - multipart 의 file 필드 또는 요청 본문 자체(application/x-ndjson, text/csv)를 한 줄씩 읽는다
+        - audio_s3_key 기준 upsert, filename 만 준 행은 presigned PUT URL 을 uploads 로 반환
+        """
+        if request.content_type.startswith("multipart/"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"detail": "file required"}, status=400)
+            stream, name, content_type = upload, upload.name, upload.content_type
+        else:
+            stream, name, content_type = request.stream, "", request.content_type
+            if stream is None:
+                return Response({"detail": "empty body"}, status=400)
+        fmt = request.query_params.get("format_type") or guess_format(name, content_type)
+        if fmt not in IMPORT_FORMATS:
+            return Response({"detail": f"format_type must be one of {', '.join(IMPORT_FORMATS)}"}, status=400)
+
+        uploads = []
+        result = import_tracks(
+            iter_records(stream, fmt),
+            dry_run=request.query_params.get("dry_run") in ("1", "true"),
+            on_upload=uploads.append,
+        )
+        return Response({**result.as_dict(), "uploads": uploads})
 
     @action(methods=["post"], detail=True, permission_classes=[IsAuthenticated])
     def stream(self, request, pk=None):
-        """인증 사용자에게 S3 GET presigned URL 발급 + 재생기록 저장"""
+        """인증 사용자에게 저장소 GET URL (+ HLS 변환이 끝났으면 manifest URL) 발급 + 재생기록 저장"""
+        track = self.get_object()
+        expires = int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600"))
+        url = get_storage().sign_get(track.audio_s3_key, expires)
+        record_play(request.user.pk, track.pk)
+        return Response({"url": url, "expires_in": expires, **hls_payload(request, track)})
+
+    @action(methods=["post"], detail=True, permission_classes=[IsAdminUser])
+    def transcode(self, request, pk=None):
+        """업로드(presigned_upload) 완료 후 HLS 변환을 바로 시작 (백그라운드, core/transcode.py)"""
         track = self.get_object()
+        if track.transcode_status == Track.TRANSCODE_PROCESSING and not stale_processing().filter(pk=track.pk).exists():
+            return Response({"status": track.transcode_status}, status=status.HTTP_409_CONFLICT)
+        Track.objects.filter(pk=track.pk).update(transcode_status=Track.TRANSCODE_PENDING)
+        try:
+            enqueue_transcode(track.pk)
+        except TranscodeQueueFull:
+            # pending 으로 남아 있으므로 `manage.py transcode_tracks` 가 나중에 처리
+            return Response(
+                {"status": Track.TRANSCODE_PENDING, "detail": "transcode queue is full"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "30"},
+            )
+        return Response({"status": Track.TRANSCODE_PENDING}, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        methods=["get"], detail=True,
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, WaveformBlobRenderer],
+    )
+    def waveform(self, request, pk=None):
+        """
+        스크러버용 파형 (core/audio.py). 현재 원본의 분석 결과가 없으면 404.
+        Accept: application/octet-stream(또는 ?format=bin)이면 저장된 blob 그대로, 아니면 {"points", "peaks": [0~255, ...]}.
+        """
+        row = (
+            TrackAnalysis.objects.filter(track_id=parse_uuid_or_404(pk), track__audio_s3_key=F("source_key"))
+            .values_list("waveform", "analyzed_at")
+            .first()
+        )
+        if row is None:
+            raise NotFound()
+        blob, analyzed_at = bytes(row[0]), row[1]
+        raw = isinstance(request.accepted_renderer, WaveformBlobRenderer)
+        etag = quote_etag(f"{hashlib.md5(blob).hexdigest()}{'-raw' if raw else ''}")
+        if etag in [t.strip() for t in request.headers.get("If-None-Match", "").split(",")]:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        elif raw:
+            response = Response(blob)
+        else:
+            peaks = unpack_waveform(blob)
+            response = Response({"points": len(peaks), "peaks": list(peaks)})
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(analyzed_at.timestamp())
+        response["Cache-Control"] = f"public, max-age={settings.WAVEFORM_CACHE_SECONDS}"
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+    @action(methods=["post"], detail=False, permission_classes=[IsAuthenticated])
+    def stream_batch(self, request):
+        """
+        여러 곡의 presigned GET URL 을 한 번에 발급 (앨범/플레이리스트 큐 미리 받기).
+        - track_ids 순서대로 결과를 반환, 없는 곡/잘못된 id 는 항목별 error
+        - prefetch=true 이면 재생 기록을 남기지 않음 (실제 재생 시 /played/ 로 보고)
+        """
+        track_ids = request.data.get("track_ids")
+        max_tracks = getattr(settings, "STREAM_BATCH_MAX_TRACKS", 50)
+        if not isinstance(track_ids, list) or not track_ids:
+            return Response({"detail": "track_ids (list) required"}, status=400)
+        if len(track_ids) > max_tracks:
+            return Response({"detail": f"at most {max_tracks} track_ids allowed"}, status=400)
+        prefetch = str(request.data.get("prefetch", "")).lower() in ("1", "true")
+
+        parsed = []
+        for raw in track_ids:
+            try:
+                parsed.append(uuid.UUID(str(raw)))
+            except ValueError:
+                parsed.append(None)
+        tracks = Track.objects.only("id", "audio_s3_key", "duration_sec", "hls_manifest_key", "hls_variants").in_bulk(
+            [p for p in parsed if p]
+        )
+
         expires = int(os.getenv("AWS_PRESIGNED_EXPIRE_SECONDS", "600"))
-        url = create_presigned_get_url(track.audio_s3_key, expires)
-        PlayHistory.objects.create(user=request.user, track=track)
-        return Response({"url": url, "expires_in": expires})
+        storage = get_storage()
+        results, played = [], []
+        for raw, track_id in zip(track_ids, parsed):
+            if track_id is None:
+                results.append({"id": raw, "error": "invalid id"})
+                continue
+            track = tracks.get(track_id)
+            if track is None:
+                results.append({"id": raw, "error": "not found"})
+                continue
+            url = storage.sign_get(track.audio_s3_key, expires)
+            results.append({"id": str(track_id), "url": url, "expires_in": expires, **hls_payload(request, track)})
+            played.append(track_id)
+        if played and not prefetch:
+            record_plays(request.user.pk, played)
+        return Response({"results": results, "prefetch": prefetch})
 
     @action(methods=["post"], detail=True, permission_classes=[IsAuthenticated])
-    def toggle_favorite(self, request, pk=None):
-        """즐겨찾기 on/off"""
+    def played(self, request, pk=None):
+        """prefetch 로 받아둔 곡을 실제로 재생했을 때 재생 기록 저장"""
         track = self.get_object()
-        fav, created = Favorite.objects.get_or_create(user=request.user, track=track)
-        if not created:
-            fav.delete()
-            return Response({"favorited": False})
-        return Response({"favorited": True})
+        record_play(request.user.pk, track.pk)
+        return Response(status=204)
+
+    @action(methods=["get", "put"], detail=True, permission_classes=[IsAuthenticated])
+    def position(self, request, pk=None):
+        """이어듣기 위치 조회(GET) / 저장(PUT {"position_sec": n})"""
+        track_id = parse_uuid_or_404(pk)
+        if request.method == "GET":
+            entry = (
+                RecentlyPlayed.objects.filter(user_id=request.user.pk, track_id=track_id)
+                .values("position_sec", "played_at")
+                .first()
+            )
+            if entry is None:
+                return Response({"position_sec": 0, "played_at": None})
+            return Response(entry)
+
+        serializer = PlaybackPositionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # 재생 중 주기적으로 호출되므로 곡 전체를 읽지 않고 길이만 확인
+        duration = Track.objects.filter(pk=track_id).values_list("duration_sec", flat=True).first()
+        if duration is None:
+            return Response({"detail": "Not found."}, status=404)
+        position = serializer.validated_data["position_sec"]
+        if duration:
+            position = min(position, duration)
+        entry = save_position(request.user.pk, track_id, position)
+        return Response({"position_sec": entry.position_sec})
+
+    @action(methods=["put", "delete"], detail=True, permission_classes=[IsAuthenticated])
+    def favorite(self, request, pk=None):
+        """즐겨찾기 설정(PUT)/해제(DELETE). 여러 번 호출해도 결과가 같다 (멱등)."""
+        track_id = parse_uuid_or_404(pk)
+        if request.method == "DELETE":
+            changed = remove_favorite(request.user.pk, track_id)
+            return Response({"favorited": False, "changed": changed})
+        added = add_favorite(request.user.pk, track_id)
+        if added is None:
+            return Response({"detail": "Not found."}, status=404)
+        return Response({"favorited": True, "changed": added})
+
+    @action(methods=["post"], detail=True, permission_classes=[IsAuthenticated])
+    def toggle_favorite(self, request, pk=None):
+        """즐겨찾기 on/off (조건부 DELETE → 없으면 INSERT)"""
+        favorited = toggle_favorite(request.user.pk, parse_uuid_or_404(pk))
+        if favorited is None:
+            return Response({"detail": "Not found."}, status=404)
+        return Response({"favorited": favorited})
 
 
 # -------------------------------------------------------------------
@@ -171,9 +513,25 @@ class FavoriteViewSet(
 ):
     permission_classes = [IsAuthenticated]
     serializer_class = FavoriteSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["created_at"]
+    ordering = ["-created_at"]
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user).select_related("track")
+        return Favorite.objects.filter(user_id=self.request.user.pk).select_related("track")
+
+    def perform_destroy(self, instance):
+        remove_favorite(instance.user_id, instance.track_id)
+
+    @action(methods=["post"], detail=False)
+    def bulk(self, request):
+        """여러 곡 즐겨찾기 설정/해제: {"add": [track_id, ...], "remove": [track_id, ...]}"""
+        serializer = FavoriteBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        added, missing = add_favorites(request.user.pk, serializer.validated_data["add"])
+        removed = remove_favorites(request.user.pk, serializer.validated_data["remove"])
+        return Response({"added": added, "removed": removed, "not_found": missing})
 
 
 # -------------------------------------------------------------------
@@ -182,9 +540,23 @@ class FavoriteViewSet(
 class PlayHistoryViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = PlayHistorySerializer
+    pagination_class = KeysetPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["played_at"]
+    ordering = ["-played_at"]
 
     def get_queryset(self):
-        return PlayHistory.objects.filter(user=self.request.user).select_related("track")
+        return PlayHistory.objects.filter(user_id=self.request.user.pk).select_related("track")
+
+    @action(methods=["get"], detail=False)
+    def recent(self, request):
+        """최근 재생 곡 (곡당 1개, 최대 RECENTLY_PLAYED_LIMIT 개) + 이어듣기 위치"""
+        entries = (
+            RecentlyPlayed.objects.filter(user_id=request.user.pk)
+            .select_related("track")
+            .order_by("-played_at", "-id")[:recently_played_limit()]
+        )
+        return Response({"results": RecentlyPlayedSerializer(entries, many=True).data})
 
 
 # -------------------------------------------------------------------
@@ -194,47 +566,101 @@ class PlaylistViewSet(viewsets.ModelViewSet):
     serializer_class = PlaylistSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = {
+        "is_public": ["exact"],
+        "kind": ["exact"],
+        "track_count": ["gte", "lte"],
+        "total_duration_sec": ["gte", "lte"],
+    }
     search_fields = ["name"]
-    ordering_fields = ["created_at", "name"]
+    ordering_fields = ["created_at", "name", "track_count", "total_duration_sec"]
     ordering = ["-created_at"]
 
+    def is_compact(self):
+        return self.request.query_params.get("view") == "compact"
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return CompactPlaylistSerializer
+        return PlaylistSerializer
+
+    def with_items(self, qs):
+        """응답 직렬화에 필요한 items 를 한 번에 가져온다 (플레이리스트 수와 무관하게 쿼리 수 고정)."""
+        if self.is_compact():
+            return qs.prefetch_related(
+                Prefetch("items", queryset=PlaylistTrack.objects.only("playlist_id", "track_id", "order", "added_at"))
+            )
+        return qs.prefetch_related(
+            Prefetch("items", queryset=PlaylistTrack.objects.select_related("track"))
+        )
+
     def get_queryset(self):
-        qs = Playlist.objects.all().prefetch_related("items__track")
-        user = self.request.user
+        qs = Playlist.objects.all()
+        # add/remove/reorder 는 변경 후 다시 읽어서 응답하므로 미리 prefetch 하지 않는다
+        if self.action not in ("add", "remove", "reorder"):
+            qs = self.with_items(qs)
+        user_id = self.request.user.pk
         if self.action in ["list", "create"]:
-            return qs.filter(user=user)
+            return qs.filter(user_id=user_id)
         # retrieve/update 등: 소유자 또는 공개
-        return qs.filter(Q(user=user) | Q(is_public=True))
+        return qs.filter(Q(user_id=user_id) | Q(is_public=True))
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.pk)
+
+    def check_object_permissions(self, request, obj):
+        super().check_object_permissions(request, obj)
+        # 자동 생성 플레이리스트(core/smart_playlists.py)는 조회만
+        if request.method not in SAFE_METHODS and obj.kind != Playlist.KIND_USER:
+            raise PermissionDenied("자동 생성 플레이리스트는 수정할 수 없습니다.")
+
+    def playlist_response(self, playlist):
+        playlist = self.with_items(Playlist.objects.filter(pk=playlist.pk)).get()
+        return Response(self.get_serializer(playlist).data)
+
+    def get_owned_playlist(self):
+        playlist = self.get_object()
+        if playlist.user_id != self.request.user.pk and not self.request.user.is_staff:
+            raise PermissionDenied("권한이 없습니다.")
+        return playlist
 
     @action(methods=["post"], detail=True, permission_classes=[IsAuthenticated])
     def add(self, request, pk=None):
-        """플레이리스트에 곡 추가/순서 지정"""
-        playlist = self.get_object()
-        if playlist.user != request.user and not request.user.is_staff:
-            return Response({"detail": "권한이 없습니다."}, status=403)
-        serializer = PlaylistItemSerializer(data=request.data, context={"request": request})
+        """
+        플레이리스트에 곡 추가: {"track_id": ...} 또는 {"track_ids": [...]}
+        after/before(기준 곡 id)로 위치 지정, 없으면 맨 뒤. 이미 있는 곡은 건너뜀.
+        """
+        playlist = self.get_owned_playlist()
+        serializer = PlaylistAddSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        track = Track.objects.get(pk=serializer.validated_data["track_id"])
-        order = serializer.validated_data.get("order", 0)
-        item, created = PlaylistTrack.objects.get_or_create(
-            playlist=playlist, track=track, defaults={"order": order}
-        )
-        if not created:
-            item.order = order
-            item.save(update_fields=["order"])
-        return Response(PlaylistSerializer(playlist).data)
+        data = serializer.validated_data
+        try:
+            add_tracks(playlist.pk, data["track_ids"], data.get("after"), data.get("before"))
+        except PlaylistOrderError as e:
+            return Response({"detail": str(e)}, status=400)
+        return self.playlist_response(playlist)
 
     @action(methods=["post"], detail=True, permission_classes=[IsAuthenticated])
     def remove(self, request, pk=None):
-        """플레이리스트에서 곡 제거"""
-        playlist = self.get_object()
-        if playlist.user != request.user and not request.user.is_staff:
-            return Response({"detail": "권한이 없습니다."}, status=403)
-        track_id = request.data.get("track_id")
-        if not track_id:
-            return Response({"detail": "track_id required"}, status=400)
-        PlaylistTrack.objects.filter(playlist=playlist, track_id=track_id).delete()
-        return Response(PlaylistSerializer(playlist).data)
+        """플레이리스트에서 곡 제거: {"track_id": ...} 또는 {"track_ids": [...]}"""
+        playlist = self.get_owned_playlist()
+        serializer = PlaylistRemoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        remove_tracks(playlist.pk, serializer.validated_data["track_ids"])
+        return self.playlist_response(playlist)
+
+    @action(methods=["post"], detail=True, permission_classes=[IsAuthenticated])
+    def reorder(self, request, pk=None):
+        """
+        곡 이동 묶음을 한 트랜잭션으로 적용:
+        {"moves": [{"track_id": ..., "after": ...}, {"track_id": ..., "before": ...}, ...]}
+        이동마다 해당 행 하나만 갱신한다.
+        """
+        playlist = self.get_owned_playlist()
+        serializer = PlaylistReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            move_tracks(playlist.pk, serializer.validated_data["moves"])
+        except PlaylistOrderError as e:
+            return Response({"detail": str(e)}, status=400)
+        return self.playlist_response(playlist)